@@ -0,0 +1,69 @@
+"""Overhead benchmark for load_data(clean=True).
+
+Writes a synthetic log, streams it with chunksize with and without the
+validation/cleaning pass (src/cleaning.py), and fails if cleaning adds
+more than the budget to the load time. Both loads parse timestamps with
+cleaning.parse_timestamps(), so the difference is the cost of the checks.
+Each variant runs --repeat times and the fastest run counts, since single
+runs are noisy.
+
+Usage:
+    python benchmarks/bench_cleaning.py [--rows 10000000] [--chunksize 1000000]
+                                        [--budget 0.10]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analyzer import LearningPathAnalyzer
+from src.synthetic import write_lms_dataset
+
+
+def load_seconds(path: Path, chunksize: int, **options) -> tuple:
+    """Time one streamed load; return (seconds, cleaning report)."""
+    analyzer = LearningPathAnalyzer()
+    start = time.perf_counter()
+    analyzer.load_data(str(path), chunksize=chunksize, **options)
+    return time.perf_counter() - start, analyzer.cleaning_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--chunksize', type=int, default=1_000_000)
+    parser.add_argument('--budget', type=float, default=0.10,
+                        help='Allowed relative overhead')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--compact', action='store_true')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = Path(workdir) / 'lms_logs.csv'
+        print(f"Writing {args.rows} synthetic rows...")
+        write_lms_dataset(str(path), args.rows, seed=0)
+        plain = clean = float('inf')
+        for _ in range(args.repeat):
+            plain = min(plain, load_seconds(path, args.chunksize,
+                                            compact=args.compact)[0])
+            seconds, report = load_seconds(path, args.chunksize, compact=args.compact,
+                                           clean=True)
+            clean = min(clean, seconds)
+
+    overhead = clean / plain - 1
+    print(f"load:           {plain:>8.2f} s")
+    print(f"load + cleaning: {clean:>7.2f} s  ({overhead:+.1%})")
+    print(f"kept {report['kept']} of {report['rows']} rows, "
+          f"dropped {report['dropped']} ({report['duplicate']} duplicates)")
+    if overhead > args.budget:
+        print(f"FAIL: over budget of {args.budget:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Import-time benchmark for the analyzer package.
+
+Runs `python -X importtime -c "import src.analyzer"` in a fresh interpreter
+a few times, prints the slowest top-level imports of the best run and fails
+if the total exceeds the budget or a plotting/ML library is imported eagerly.
+
+Usage:
+    python benchmarks/bench_import_time.py [--budget-ms 1500] [--repeat 5]
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+LAZY_MODULES = ('matplotlib', 'seaborn', 'sklearn')
+
+
+def import_times(module: str) -> tuple:
+    """Import module in a fresh interpreter under -X importtime.
+
+    Returns:
+        Tuple of the module's cumulative import time in microseconds and a
+        dictionary of cumulative time per imported module
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    total = 0
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times.setdefault(name.strip(), int(cumulative))
+        if name == f' {module}':  # top-level entry, includes everything nested
+            total = int(cumulative)
+    return total, times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default='src.analyzer')
+    parser.add_argument('--budget-ms', type=float, default=1500.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    total, best = min((import_times(args.module) for _ in range(args.repeat)),
+                      key=lambda run: run[0])
+    total_ms = total / 1000
+
+    print(f"import {args.module}: {total_ms:.1f} ms (best of {args.repeat})")
+    packages = {name: micros for name, micros in best.items() if '.' not in name}
+    for name, micros in sorted(packages.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {micros / 1000:>8.1f} ms  {name}")
+
+    eager = sorted(name for name in best if name.split('.')[0] in LAZY_MODULES)
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+        return 1
+    if total_ms > args.budget_ms:
+        print(f"FAIL: over budget of {args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Scaling benchmark for multi-file ingestion (LearningPathAnalyzer.load_files).
+
+Writes a directory of small per-course, per-day CSV files and loads it with
+1, 2, 4, ... workers up to the number of cores, for the thread and the
+process pool, printing the speedup over a single worker.
+
+Usage:
+    python benchmarks/bench_ingest.py [--courses 20] [--days 50] [--rows-per-file 2000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analyzer import LearningPathAnalyzer
+from src.utils import create_sample_lms_data
+
+
+def write_files(root: Path, courses: int, days: int, rows: int) -> int:
+    """Write <course>/<course>_<day>.csv files; return how many."""
+    for course in range(courses):
+        name = f'C{course:03d}'
+        (root / name).mkdir()
+        for day in range(days):
+            data = create_sample_lms_data(num_students=max(rows // 20, 1),
+                                          num_records=rows,
+                                          seed=course * days + day)
+            data.to_csv(root / name / f'{name}_{day:03d}.csv', index=False)
+    return courses * days
+
+
+def run(root: Path, workers: int, executor: str) -> float:
+    """Time one load_files() call."""
+    analyzer = LearningPathAnalyzer()
+    start = time.perf_counter()
+    analyzer.load_files(str(root), workers=workers, executor=executor)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--courses', type=int, default=20)
+    parser.add_argument('--days', type=int, default=50)
+    parser.add_argument('--rows-per-file', type=int, default=2000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    workers = [1]
+    while workers[-1] * 2 <= args.max_workers:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != args.max_workers:
+        workers.append(args.max_workers)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        root = Path(workdir)
+        files = write_files(root, args.courses, args.days, args.rows_per_file)
+        print(f"{files} files x {args.rows_per_file} rows")
+        print(f"{'executor':>8} {'workers':>7} {'seconds':>10} {'speedup':>8}")
+        for executor in ('thread', 'process'):
+            baseline = None
+            for count in workers:
+                seconds = run(root, count, executor)
+                baseline = baseline or seconds
+                print(f"{executor:>8} {count:>7} {seconds:>10.3f} "
+                      f"{baseline / seconds:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
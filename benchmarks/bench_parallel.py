@@ -0,0 +1,55 @@
+"""Speedup benchmark for LearningPathAnalyzer(n_jobs=...).
+
+Profiles and recommends a synthetic log with 1, 2, 4, ... worker processes
+up to the number of cores and prints the speedup over the serial path.
+
+Usage:
+    python benchmarks/bench_parallel.py [--rows 5000000] [--max-jobs N]
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_profile_students import make_log
+from src.analyzer import LearningPathAnalyzer
+
+
+def run(df, n_jobs: int) -> float:
+    """Time profiling plus recommendations with n_jobs workers."""
+    analyzer = LearningPathAnalyzer(n_jobs=n_jobs)
+    analyzer.df = df
+    start = time.perf_counter()
+    analyzer.profile_students()
+    analyzer.generate_recommendations()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--max-jobs', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    df = make_log(args.rows)
+    jobs = [1]
+    while jobs[-1] * 2 <= args.max_jobs:
+        jobs.append(jobs[-1] * 2)
+    if jobs[-1] != args.max_jobs:
+        jobs.append(args.max_jobs)
+
+    baseline = None
+    print(f"{'n_jobs':>6} {'seconds':>10} {'speedup':>8}")
+    for n_jobs in jobs:
+        seconds = run(df, n_jobs)
+        baseline = baseline or seconds
+        print(f"{n_jobs:>6} {seconds:>10.3f} {baseline / seconds:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
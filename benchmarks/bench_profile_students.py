@@ -0,0 +1,66 @@
+"""Scaling benchmark for LearningPathAnalyzer.profile_students().
+
+Profiles synthetic logs from 10k to 10M rows (about 50 rows per student) and
+prints the time per row at each size. A flat ns/row column means the engine
+scales linearly with the size of the log.
+
+Usage:
+    python benchmarks/bench_profile_students.py [--max-rows 10000000]
+"""
+
+import argparse
+import time
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analyzer import LearningPathAnalyzer
+
+ACTIVITY_TYPES = ['quiz', 'assignment', 'forum_post', 'video_watch', 'reading']
+
+
+def make_log(num_rows: int, rows_per_student: int = 50, seed: int = 0) -> pd.DataFrame:
+    """Build a synthetic activity log with a parsed timestamp column."""
+    rng = np.random.default_rng(seed)
+    num_students = max(1, num_rows // rows_per_student)
+    student_ids = np.array([f'STU{i:07d}' for i in range(num_students)], dtype=object)
+    return pd.DataFrame({
+        'student_id': student_ids[rng.integers(0, num_students, num_rows)],
+        'activity_type': np.array(ACTIVITY_TYPES, dtype=object)[
+            rng.integers(0, 5, num_rows)],
+        'timestamp': pd.Timestamp('2024-01-01') + pd.to_timedelta(
+            rng.integers(0, 90 * 86400, num_rows), unit='s'),
+        'grade': rng.uniform(40, 100, num_rows).round(1),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-rows', type=int, default=10_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    analyzer = LearningPathAnalyzer()
+    sizes = [n for n in (10_000, 100_000, 1_000_000, 10_000_000) if n <= args.max_rows]
+
+    print(f"{'rows':>12} {'students':>10} {'seconds':>10} {'ns/row':>10}")
+    for num_rows in sizes:
+        analyzer.df = make_log(num_rows)
+        timings = []
+        for _ in range(args.repeat):
+            # Drop cached profiles so every repeat times a full computation
+            analyzer.cache.invalidate()
+            start = time.perf_counter()
+            profiles = analyzer.profile_students()
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(f"{num_rows:>12,} {len(profiles):>10,} {best:>10.3f} "
+              f"{best / num_rows * 1e9:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""Latency load test for the analysis service (src/service.py).
+
+Sends a mix of requests (student profiles, recommendations, top/bottom-N,
+summary) from several client threads and reports p50/p99 latency per
+endpoint and overall, plus throughput. With --reload-every, a background
+reload is triggered periodically during the run to show that readers are
+not blocked by it.
+
+Without --url, a service is started in-process on a free port over a
+synthetic log.
+
+Usage:
+    python benchmarks/load_test.py [--rows 200000] [--requests 5000] [--clients 8]
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --students STU00001
+"""
+
+import argparse
+import http.client
+import json
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.service import AnalysisService, make_server
+from src.synthetic import write_lms_dataset
+
+
+def start_local_service(rows: int, workdir: str):
+    """Serve a synthetic log from a background thread; return (url, service, server)."""
+    path = Path(workdir) / 'lms_logs.csv'
+    write_lms_dataset(str(path), rows, seed=0)
+    service = AnalysisService(str(path))
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return f'http://{host}:{port}', service, server
+
+
+def request_mix(students, n: int, seed: int):
+    """Return n (endpoint name, method, path) requests."""
+    rng = random.Random(seed)
+    choices = []
+    for _ in range(n):
+        student = quote(rng.choice(students), safe='')
+        kind = rng.choices(['student', 'recommendations', 'top', 'bottom', 'summary'],
+                           weights=[50, 20, 10, 10, 10])[0]
+        path = {
+            'student': f'/students/{student}',
+            'recommendations': f'/students/{student}/recommendations',
+            'top': '/top?n=10',
+            'bottom': '/bottom?n=10',
+            'summary': '/summary',
+        }[kind]
+        choices.append((kind, 'GET', path))
+    return choices
+
+
+def run_client(url: str, requests, results, errors) -> None:
+    """Send requests over one keep-alive connection, recording latencies."""
+    target = urlsplit(url)
+    connection = http.client.HTTPConnection(target.hostname, target.port, timeout=30)
+    for kind, method, path in requests:
+        start = time.perf_counter()
+        connection.request(method, path)
+        response = connection.getresponse()
+        response.read()
+        results[kind].append(time.perf_counter() - start)
+        if response.status >= 400:
+            errors.append((path, response.status))
+    connection.close()
+
+
+def percentiles(latencies) -> dict:
+    """p50/p99/max in milliseconds."""
+    values = np.asarray(latencies) * 1000
+    return {'count': len(values), 'p50_ms': float(np.percentile(values, 50)),
+            'p99_ms': float(np.percentile(values, 99)), 'max_ms': float(values.max())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='Running service (default: start one in-process)')
+    parser.add_argument('--students',
+                        help='Comma-separated ids to query (default: from the service)')
+    parser.add_argument('--rows', type=int, default=200_000,
+                        help='Synthetic rows for the local service')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--reload-every', type=float, default=0.0,
+                        help='Trigger POST /reload every N seconds during the run')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Also write the results as JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        service = server = None
+        url = args.url
+        if url is None:
+            print(f"Starting a local service over {args.rows} synthetic rows...")
+            url, service, server = start_local_service(args.rows, workdir)
+        if args.students:
+            students = args.students.split(',')
+        elif service is not None:
+            students = list(service.state.profiles)
+        else:
+            target = urlsplit(url)
+            connection = http.client.HTTPConnection(target.hostname, target.port)
+            connection.request('GET', '/top?n=1000')
+            students = [sid for sid, _ in json.loads(connection.getresponse().read())]
+            connection.close()
+
+        requests = request_mix(students, args.requests, args.seed)
+        per_client = [requests[i::args.clients] for i in range(args.clients)]
+        results, errors = defaultdict(list), []
+        reloads = 0
+        threads = [threading.Thread(target=run_client,
+                                    args=(url, chunk, results, errors))
+                   for chunk in per_client]
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        if args.reload_every > 0:
+            target = urlsplit(url)
+            while any(thread.is_alive() for thread in threads):
+                connection = http.client.HTTPConnection(target.hostname, target.port)
+                connection.request('POST', '/reload')
+                connection.getresponse().read()
+                connection.close()
+                reloads += 1
+                time.sleep(args.reload_every)
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    everything = [value for values in results.values() for value in values]
+    report = {
+        'requests': len(everything),
+        'clients': args.clients,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(everything) / elapsed, 1),
+        'reloads': reloads,
+        'errors': len(errors),
+        'overall': percentiles(everything),
+        'endpoints': {kind: percentiles(values)
+                      for kind, values in sorted(results.items())},
+    }
+
+    print(f"{'endpoint':<16} {'count':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    endpoints = list(report['endpoints'].items()) + [('overall', report['overall'])]
+    for kind, stats in endpoints:
+        print(f"{kind:<16} {stats['count']:>7} {stats['p50_ms']:>8.2f} "
+              f"{stats['p99_ms']:>8.2f} {stats['max_ms']:>8.2f}")
+    print(f"{report['requests_per_second']} requests/s with {args.clients} clients, "
+          f"{reloads} reloads, {len(errors)} errors")
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
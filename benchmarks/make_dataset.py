@@ -0,0 +1,43 @@
+"""Create reproducible synthetic benchmark datasets.
+
+Usage:
+    python benchmarks/make_dataset.py data/bench_1M.parquet --rows 1000000
+    python benchmarks/make_dataset.py data/bench_10M.csv --rows 10000000 --seed 7
+
+See src/synthetic.py for the meaning of the knobs.
+"""
+
+import argparse
+import time
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.synthetic import write_lms_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help='Output .csv or .parquet file')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--students', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000)
+    parser.add_argument('--activity-skew', type=float, default=1.0)
+    parser.add_argument('--session-length', type=float, default=4.0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    path = write_lms_dataset(
+        args.path, args.rows, num_students=args.students, seed=args.seed,
+        chunk_rows=args.chunk_rows, activity_skew=args.activity_skew,
+        session_length=args.session_length
+    )
+    seconds = time.perf_counter() - start
+    print(f"Wrote {args.rows:,} rows to {path} in {seconds:.1f}s "
+          f"({args.rows / seconds:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
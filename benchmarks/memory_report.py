@@ -0,0 +1,66 @@
+"""Memory report for the default and compact in-memory log layouts.
+
+Scales the bundled sample (data/sample_lms_data.csv) up to the requested
+number of rows by repeating it with fresh student ids, writes it to a
+temporary CSV and loads it twice: once with the default layout and once with
+load_data(compact=True). Prints the bytes per row of each column and in
+total.
+
+Usage:
+    python benchmarks/memory_report.py [--rows 2000000]
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analyzer import LearningPathAnalyzer
+
+SAMPLE = Path(__file__).parent.parent / 'data' / 'sample_lms_data.csv'
+
+
+def scale_sample(num_rows: int) -> pd.DataFrame:
+    """Repeat the bundled sample, giving each copy its own students."""
+    sample = pd.read_csv(SAMPLE)
+    copies = -(-num_rows // len(sample))
+    scaled = pd.concat([sample] * copies, ignore_index=True).iloc[:num_rows]
+    copy_number = np.arange(len(scaled)) // len(sample)
+    suffix = '-' + pd.Series(copy_number).astype(str)
+    scaled['student_id'] = scaled['student_id'] + suffix
+    return scaled
+
+
+def bytes_per_row(df: pd.DataFrame) -> pd.Series:
+    """Deep memory usage per row of every column."""
+    return df.memory_usage(deep=True, index=False) / len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / 'scaled_lms_data.csv'
+        scale_sample(args.rows).to_csv(csv_path, index=False)
+
+        analyzer = LearningPathAnalyzer()
+        default = bytes_per_row(analyzer.load_data(str(csv_path)))
+        compact = bytes_per_row(analyzer.load_data(str(csv_path), compact=True))
+
+    print(f"Bytes per row at {args.rows:,} rows")
+    print(f"{'column':<15} {'default':>10} {'compact':>10}")
+    for column in default.index:
+        print(f"{column:<15} {default[column]:>10.1f} {compact[column]:>10.1f}")
+    print(f"{'total':<15} {default.sum():>10.1f} {compact.sum():>10.1f}")
+    print(f"reduction: {default.sum() / compact.sum():.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""Benchmark suite covering every analyzer stage.
+
+For each dataset shape and size, a synthetic log is written to a temporary
+CSV and the full pipeline is run on a fresh analyzer: load_data,
+analyze_activity_patterns, profile_students, generate_recommendations,
+get_summary_report, save_report, export_recommendations and every
+visualize_* method. Wall time and tracemalloc peak are recorded per stage.
+
+Results are written as JSON. With --baseline, each stage is compared to the
+stored result for the same shape and size and the run fails if it got slower
+by more than --tolerance (ignoring differences below --noise-floor seconds).
+
+Usage:
+    python benchmarks/run_suite.py --sizes 10000,100000 --output bench.json
+    python benchmarks/run_suite.py --baseline benchmarks/baseline.json
+    python benchmarks/run_suite.py --save-baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analyzer import LearningPathAnalyzer
+from src.synthetic import write_lms_dataset
+from src.utils import save_report, export_recommendations
+
+# shape name -> function of row count returning write_lms_dataset() options
+SHAPES = {
+    'balanced': lambda rows: {'num_students': max(1, rows // 50)},
+    'many_students': lambda rows: {'num_students': max(1, rows // 3)},
+    'few_students': lambda rows: {'num_students': max(5, rows // 5000)},
+    'many_activities': lambda rows: {
+        'num_students': max(1, rows // 50),
+        'activities': {f'activity_{i:03d}': (1.0, 75.0, 10.0) for i in range(200)},
+    },
+}
+
+
+def measure(stage: str, func, track_memory: bool) -> dict:
+    """Run func once and record wall time and tracemalloc peak."""
+    if track_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    peak_mb = None
+    if track_memory:
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return {'stage': stage, 'seconds': round(seconds, 6),
+            'peak_mb': None if peak_mb is None else round(peak_mb, 3)}
+
+
+def run_pipeline(csv_path: Path, workdir: Path, track_memory: bool) -> list:
+    """Time every analyzer stage on one dataset."""
+    analyzer = LearningPathAnalyzer()
+    state = {}
+    stages = [
+        ('load_data', lambda: analyzer.load_data(str(csv_path))),
+        ('analyze_activity_patterns', analyzer.analyze_activity_patterns),
+        ('profile_students', analyzer.profile_students),
+        ('generate_recommendations', analyzer.generate_recommendations),
+        ('get_summary_report',
+         lambda: state.update(report=analyzer.get_summary_report())),
+        ('save_report',
+         lambda: save_report(state['report'], str(workdir / 'report.json'))),
+        ('export_recommendations', lambda: export_recommendations(
+            analyzer.recommendations, str(workdir / 'recommendations.txt'))),
+        ('visualize_activity_distribution',
+         lambda: analyzer.visualize_activity_distribution(force=True)),
+        ('visualize_average_grades',
+         lambda: analyzer.visualize_average_grades(force=True)),
+        ('visualize_engagement_distribution',
+         lambda: analyzer.visualize_engagement_distribution(force=True)),
+        ('visualize_weekly_activity',
+         lambda: analyzer.visualize_weekly_activity(force=True)),
+    ]
+    return [measure(stage, func, track_memory) for stage, func in stages]
+
+
+def run_suite(sizes, shapes, track_memory: bool = True, seed: int = 0) -> dict:
+    """Run the pipeline over every (shape, size) combination."""
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        os.chdir(workdir)  # visualizations are written to ./reports
+        try:
+            for shape in shapes:
+                for rows in sizes:
+                    csv_path = workdir / f'{shape}_{rows}.csv'
+                    write_lms_dataset(csv_path, rows, seed=seed, **SHAPES[shape](rows))
+                    for result in run_pipeline(csv_path, workdir, track_memory):
+                        results.append({'shape': shape, 'rows': rows, **result})
+                        memory = (f" {result['peak_mb']:>9.1f} MB"
+                                  if track_memory else '')
+                        print(f"{shape:>16} {rows:>10,} {result['stage']:<34} "
+                              f"{result['seconds']:>9.4f}s" + memory)
+                    csv_path.unlink()
+        finally:
+            os.chdir(cwd)
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'tracemalloc': track_memory,
+        },
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float,
+            noise_floor: float) -> list:
+    """Return the stages that got slower than the baseline allows."""
+    expected = {(r['shape'], r['rows'], r['stage']): r['seconds']
+                for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        key = (result['shape'], result['rows'], result['stage'])
+        if key not in expected:
+            continue
+        before, after = expected[key], result['seconds']
+        if after > before * (1 + tolerance) and after - before > noise_floor:
+            regressions.append({'shape': key[0], 'rows': key[1], 'stage': key[2],
+                                'baseline': before, 'seconds': after,
+                                'ratio': round(after / before, 2) if before else None})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000',
+                        help='Comma-separated row counts (e.g. 10000,100000,1000000)')
+    parser.add_argument('--shapes', default=','.join(SHAPES),
+                        help=f"Comma-separated shapes out of {', '.join(SHAPES)}")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip tracemalloc (faster, timing only)')
+    parser.add_argument('--output', help='Write results JSON here')
+    parser.add_argument('--baseline', help='Compare against this results JSON')
+    parser.add_argument('--save-baseline',
+                        help='Write results JSON as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed relative slowdown')
+    parser.add_argument('--noise-floor', type=float, default=0.005,
+                        help='Ignore slowdowns below this many seconds')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    shapes = args.shapes.split(',')
+    unknown = set(shapes) - set(SHAPES)
+    if unknown:
+        parser.error(f"unknown shapes: {', '.join(sorted(unknown))}")
+
+    current = run_suite(sizes, shapes, track_memory=not args.no_memory, seed=args.seed)
+    for path in (args.output, args.save_baseline):
+        if path:
+            Path(path).write_text(json.dumps(current, indent=2))
+
+    if args.baseline:
+        regressions = compare(current, json.loads(Path(args.baseline).read_text()),
+                              args.tolerance, args.noise_floor)
+        for r in regressions:
+            print(f"REGRESSION {r['shape']} {r['rows']:,} {r['stage']}: "
+                  f"{r['baseline']:.4f}s -> {r['seconds']:.4f}s ({r['ratio']}x)")
+        if regressions:
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
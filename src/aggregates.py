@@ -0,0 +1,967 @@
+"""Aggregation engine for Learning Path Analyzer.
+
+Every per-student and per-activity metric is derived from two small tables
+built in a single grouped pass over the activity log:
+
+- the *pair table*: one row per (student_id, activity_type) with the number of
+  activities and the grade sum/sum of squares/count for that combination
+- the *day table*: the distinct (student_id, day) combinations
+
+Both tables are far smaller than the log itself, so everything computed from
+them is independent of the number of rows.
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict
+
+try:
+    from .lookup import StudentIndex
+    from .sketches import day_numbers
+    from .utils import grade_values
+except ImportError:  # running as a script from src/ (see main.py)
+    from lookup import StudentIndex
+    from sketches import day_numbers
+    from utils import grade_values
+
+AGGREGATE_STATE_VERSION = 2
+
+# Grades are summed exactly as a whole part and fraction limbs of this size
+LIMB_BITS = 31
+LIMB_COUNT = 3
+
+# Pair table columns holding the exact grade and squared grade sums, one
+# per limb (see grade_limbs())
+SUM_COLUMNS = [f'{name}_{i}' for name in ('grade_sum', 'grade_sumsq')
+               for i in range(LIMB_COUNT)]
+
+PROFILE_FIELDS = [
+    'total_activities',
+    'average_grade',
+    'activity_diversity',
+    'days_active',
+    'preferred_activity',
+    'engagement_level',
+]
+
+
+def build_pair_table(df: pd.DataFrame, row_offset: int = 0) -> pd.DataFrame:
+    """Aggregate the log by (student_id, activity_type).
+
+    Args:
+        df: Activity log with student_id, activity_type and grade columns
+        row_offset: Position of the first row of df in the full log, used when
+            df is one chunk of a larger file
+
+    Returns:
+        DataFrame with student_id, activity_type, count, grade_sum_0..2 and
+        grade_sumsq_0..2 (the grade and squared grade sums as
+        grade_limbs(), so they add up exactly), grade_count and first_row
+        columns, in order of first appearance in the log. Rows without an
+        activity_type form a pair of their own, so they count towards
+        total_activities and (like a missing value in unique())
+        activity_diversity; rows without a student_id are left out.
+    """
+    values = grade_values(df['grade'])
+    limbs = np.hstack((grade_limbs(values), grade_limbs(values * values)))
+    frame = pd.DataFrame({
+        'student_id': df['student_id'],
+        'activity_type': df['activity_type'],
+        **dict(zip(SUM_COLUMNS, limbs.T)),
+        'graded': ~np.isnan(values),
+        'row': np.arange(row_offset, row_offset + len(df), dtype='int64'),
+    })
+    pairs = frame.groupby(
+        ['student_id', 'activity_type'], sort=False, observed=True, dropna=False
+    ).agg(
+        count=('graded', 'size'),
+        **{column: (column, 'sum') for column in SUM_COLUMNS},
+        grade_count=('graded', 'sum'),
+        first_row=('row', 'min'),
+    )
+    pairs['grade_count'] = pairs['grade_count'].astype('int64')
+    pairs = pairs.reset_index()
+    return pairs[pairs['student_id'].notna()].reset_index(drop=True)
+
+
+def build_day_table(df: pd.DataFrame) -> pd.DataFrame:
+    """Collect the distinct days each student was active.
+
+    Args:
+        df: Activity log with student_id and datetime timestamp columns
+
+    Returns:
+        DataFrame with one row per distinct (student_id, day)
+    """
+    days = pd.DataFrame({
+        'student_id': df['student_id'],
+        'day': df['timestamp'].dt.normalize(),
+    })
+    return days.drop_duplicates(ignore_index=True)
+
+
+def column_sums(table: pd.DataFrame, name: str) -> np.ndarray:
+    """Return a table's exact 'grade_sum' or 'grade_sumsq' as float64 values.
+
+    Args:
+        table: Pair table, or a table of its column sums
+        name: 'grade_sum' or 'grade_sumsq'
+
+    Returns:
+        float64 array with one value per row of the table
+    """
+    return limb_totals(table[[f'{name}_{i}' for i in range(LIMB_COUNT)]].to_numpy())
+
+
+def grade_limbs(values: np.ndarray) -> np.ndarray:
+    """Split grades into integer limbs whose sums are exact.
+
+    Each value becomes its whole part and two 31-bit fraction limbs (bits
+    below 2**-62 are dropped), all with the sign of the value. Integers
+    add up without rounding, so a sum of limbs does not depend on the order
+    or grouping of the rows: chunks, shards and appended batches give the
+    same total as one pass.
+
+    Args:
+        values: float64 array; NaN counts as 0
+
+    Returns:
+        int64 array with one row of limbs per value
+    """
+    values = np.asarray(values, dtype='float64')
+    # Splitting the magnitude keeps every step exact
+    magnitude = np.abs(values)
+    magnitude[np.isnan(magnitude)] = 0.0
+    limbs = np.empty((LIMB_COUNT, len(values)), dtype='int64')
+    fraction, whole = np.modf(magnitude)
+    limbs[0] = whole
+    for i in range(1, LIMB_COUNT):
+        fraction, whole = np.modf(np.ldexp(fraction, LIMB_BITS))
+        limbs[i] = whole
+    negative = values < 0
+    if negative.any():
+        limbs[:, negative] *= -1
+    # Limb-major storage keeps each limb contiguous for the group sums
+    return limbs.T
+
+
+def limb_totals(limbs: np.ndarray) -> np.ndarray:
+    """Turn summed grade_limbs() back into float64 values.
+
+    Carries are propagated first, so the result depends only on the exact
+    total, not on how it was added up.
+
+    Args:
+        limbs: int64 array with one row of summed limbs per total
+
+    Returns:
+        float64 array with one value per row
+    """
+    limbs = _carry(np.array(limbs, dtype='int64', ndmin=2))
+    # Negative totals are converted as their magnitude, so the whole part
+    # and the fraction never cancel
+    negative = limbs[:, 0] < 0
+    limbs[negative] = _carry(-limbs[negative])
+    totals = limbs[:, -1].astype('float64')
+    for i in range(LIMB_COUNT - 2, -1, -1):
+        totals = limbs[:, i] + np.ldexp(totals, -LIMB_BITS)
+    return np.where(negative, -totals, totals)
+
+
+def _carry(limbs: np.ndarray) -> np.ndarray:
+    """Bring every fraction limb into [0, 2**31) by carrying into the next one."""
+    for i in range(LIMB_COUNT - 1, 0, -1):
+        carry = limbs[:, i] >> LIMB_BITS
+        limbs[:, i] -= carry << LIMB_BITS
+        limbs[:, i - 1] += carry
+    return limbs
+
+
+def grouped_grade_sums(codes: np.ndarray, grades: np.ndarray, groups: int,
+                       squares: bool = False) -> tuple:
+    """Exact grade sums and graded-row counts per group code.
+
+    Grades are stably sorted by code and each group's grade_limbs() are
+    added with np.add.reduceat().
+
+    Args:
+        codes: Group code of each row (0 <= code < groups)
+        grades: float64 grades of the rows (NaN where ungraded)
+        groups: Number of groups
+        squares: Also sum the squared grades
+
+    Returns:
+        (counts, limbs): the number of graded rows per group, and an int64
+        array with a row of summed limbs per group, the limbs of the
+        squares following those of the grades
+    """
+    counts = np.bincount(codes[~np.isnan(grades)], minlength=groups)
+    sizes = np.bincount(codes, minlength=groups)
+    # The smallest code type lets numpy radix-sort up to 65536 groups
+    order = np.argsort(codes.astype(np.min_scalar_type(max(groups - 1, 0))),
+                       kind='stable')
+    grades = grades[order]
+    parts = [grade_limbs(grades)]
+    if squares:
+        parts.append(grade_limbs(grades * grades))
+    sums = np.zeros((groups, LIMB_COUNT * len(parts)), dtype='int64')
+    present = np.flatnonzero(sizes)
+    if len(present):
+        starts = (np.cumsum(sizes) - sizes)[present]
+        for i, limbs in enumerate(parts):
+            columns = slice(i * LIMB_COUNT, (i + 1) * LIMB_COUNT)
+            sums[present, columns] = np.add.reduceat(limbs, starts, axis=0)
+    return counts, sums
+
+
+def moments_from_sums(counts: np.ndarray, sums: np.ndarray,
+                      sumsq: np.ndarray = None) -> pd.DataFrame:
+    """Grade mean (and sample variance) per group from its sums.
+
+    Args:
+        counts: Number of graded rows per group
+        sums: Sum of the grades per group
+        sumsq: Optional sum of the squared grades per group
+
+    Returns:
+        DataFrame with an unrounded 'mean' column and, with sumsq, a
+        'variance' column (ddof=1); NaN where there are too few grades
+    """
+    counts = np.asarray(counts, dtype='float64')
+    means = np.divide(sums, counts, out=np.full(len(counts), np.nan),
+                      where=counts > 0)
+    result = pd.DataFrame({'mean': means})
+    if sumsq is not None:
+        squares = np.maximum(sumsq - np.where(counts > 0, sums * means, 0.0), 0.0)
+        result['variance'] = np.divide(squares, counts - 1,
+                                       out=np.full(len(counts), np.nan),
+                                       where=counts > 1)
+    return result
+
+
+def _limb_moments(counts: np.ndarray, sums: np.ndarray,
+                  variance: bool) -> pd.DataFrame:
+    """moments_from_sums() over the limbs of grouped_grade_sums()."""
+    sumsq = limb_totals(sums[:, LIMB_COUNT:]) if variance else None
+    return moments_from_sums(counts, limb_totals(sums[:, :LIMB_COUNT]), sumsq)
+
+
+def chunked_grade_moments(read_grades, sizes: np.ndarray,
+                          variance: bool = False) -> pd.DataFrame:
+    """grade_moments() over grades read in chunks, group after group.
+
+    Args:
+        read_grades: Function returning an iterator of float64 arrays (NaN
+            where ungraded); concatenated, they hold each group's rows, the
+            groups one after the other
+        sizes: Number of rows in each group
+        variance: Also compute the sample variance (ddof=1)
+
+    Returns:
+        DataFrame with a row per group and 'mean' (and 'variance') columns,
+        equal to grade_moments() on the same rows
+    """
+    sizes = np.asarray(sizes, dtype='int64')
+    ends = np.cumsum(sizes)
+    counts = np.zeros(len(sizes), dtype='int64')
+    width = 2 * LIMB_COUNT if variance else LIMB_COUNT
+    sums = np.zeros((len(sizes), width), dtype='int64')
+    position = 0
+    for grades in read_grades():
+        groups = np.searchsorted(ends, np.arange(position, position + len(grades)),
+                                 side='right')
+        position += len(grades)
+        chunk_counts, chunk_sums = grouped_grade_sums(groups, grades, len(sizes),
+                                                      squares=variance)
+        counts += chunk_counts
+        sums += chunk_sums
+    return _limb_moments(counts, sums, variance)
+
+
+def grade_moments(df: pd.DataFrame, key: str, variance: bool = False) -> pd.DataFrame:
+    """Grade mean (and variance) per value of key.
+
+    Grades and their squares are summed exactly per group (see
+    grade_limbs()), so the result does not depend on the order of the rows
+    and streamed or appended aggregates reach the same values. It agrees
+    with pandas' mean()/var() per group to about 1e-15 relative.
+
+    Args:
+        df: Activity log with the key and grade columns
+        key: Column to group by, e.g. 'student_id' or 'activity_type'
+        variance: Also compute the sample variance (ddof=1)
+
+    Returns:
+        DataFrame indexed by key (first-appearance order) with an unrounded
+        'mean' column and, if requested, a 'variance' column; rows with a
+        missing key are left out
+    """
+    codes, groups = pd.factorize(df[key], sort=False)
+    grades = grade_values(df['grade'])
+    # Rows with a missing key (code -1) belong to no group
+    keyed = codes >= 0
+    if not keyed.all():
+        codes, grades = codes[keyed], grades[keyed]
+
+    counts, sums = grouped_grade_sums(codes, grades, len(groups), squares=variance)
+    result = _limb_moments(counts, sums, variance)
+    result.index = pd.Index(groups, name=key)
+    return result
+
+
+def student_grade_means(df: pd.DataFrame) -> pd.Series:
+    """Average grade per student, see grade_moments().
+
+    Args:
+        df: Activity log with student_id and grade columns
+
+    Returns:
+        Series of unrounded average grades indexed by student_id
+    """
+    return grade_moments(df, 'student_id')['mean']
+
+
+def pair_student_grades(pairs: pd.DataFrame) -> pd.Series:
+    """Average grade per student, rebuilt from the pair table grade sums.
+
+    The sums are exact, so this equals student_grade_means() on the log.
+
+    Args:
+        pairs: Output of build_pair_table()
+
+    Returns:
+        Series of unrounded average grades indexed by student_id
+    """
+    totals = pairs.groupby('student_id', sort=False, observed=True)[
+        SUM_COLUMNS[:LIMB_COUNT] + ['grade_count']
+    ].sum()
+    counts = totals['grade_count'].where(totals['grade_count'] > 0)
+    return column_sums(totals, 'grade_sum') / counts
+
+
+def pair_class_average(pairs: pd.DataFrame) -> float:
+    """Average grade over every graded row, from the pair table grade sums.
+
+    Args:
+        pairs: Output of build_pair_table()
+
+    Returns:
+        Unrounded average grade (NaN if nothing is graded)
+    """
+    count = int(pairs['grade_count'].sum())
+    total = limb_totals(pairs[SUM_COLUMNS[:LIMB_COUNT]].to_numpy().sum(axis=0))
+    return float(total[0] / count) if count else float('nan')
+
+
+def engagement_levels(total_activities: pd.Series,
+                      average_grade: pd.Series) -> pd.Series:
+    """Classify engagement for many students at once.
+
+    Args:
+        total_activities: Number of activities per student
+        average_grade: Unrounded average grade per student
+
+    Returns:
+        Series of 'high', 'medium' or 'low' aligned with the inputs
+    """
+    high = (total_activities > 15) & (average_grade > 70)
+    medium = (total_activities > 5) | (average_grade > 60)
+    levels = np.select([high, medium], ['high', 'medium'], default='low')
+    return pd.Series(levels, index=total_activities.index, dtype=object)
+
+
+def build_profile_table(pairs: pd.DataFrame, days: pd.DataFrame,
+                        grade_means: pd.Series = None) -> pd.DataFrame:
+    """Derive per-student profile columns from the pair and day tables.
+
+    Args:
+        pairs: Output of build_pair_table()
+        days: Output of build_day_table(), or a Series of active-day counts
+            per student (e.g. from a sketch, see sketches.py)
+        grade_means: Optional averages from student_grade_means();
+            computed from the pair table grade sums (to the same values)
+            when omitted
+
+    Returns:
+        DataFrame indexed by student_id with one column per profile field,
+        students ordered by first appearance in the log
+    """
+    by_student = pairs.groupby('student_id', sort=False, observed=True)
+    table = by_student.agg(
+        total_activities=('count', 'sum'),
+        **{column: (column, 'sum') for column in SUM_COLUMNS[:LIMB_COUNT]},
+        grade_count=('grade_count', 'sum'),
+        activity_diversity=('activity_type', 'size'),
+    )
+    if grade_means is None:
+        graded = table['grade_count'].where(table['grade_count'] > 0)
+        average_grade = column_sums(table, 'grade_sum') / graded
+    else:
+        average_grade = grade_means.reindex(table.index)
+
+    # Most frequent activity; ties go to the activity the student did first,
+    # matching value_counts() on the student's rows (which skips missing
+    # activity types).
+    preferred = (
+        pairs[pairs['activity_type'].notna()]
+        .sort_values('count', ascending=False, kind='stable')
+        .drop_duplicates('student_id')
+        .set_index('student_id')['activity_type']
+    )
+    if isinstance(days, pd.Series):
+        days_active = days
+    else:
+        days_active = days.groupby('student_id', sort=False, observed=True).size()
+
+    profile = pd.DataFrame(index=table.index)
+    profile['total_activities'] = table['total_activities']
+    profile['average_grade'] = average_grade.round(2)
+    profile['activity_diversity'] = table['activity_diversity']
+    profile['days_active'] = days_active.reindex(table.index, fill_value=0)
+    profile['preferred_activity'] = preferred.reindex(table.index)
+    profile['engagement_level'] = engagement_levels(table['total_activities'],
+                                                    average_grade)
+    return profile
+
+
+def effectiveness_sums(pairs: pd.DataFrame, student_grades: pd.Series,
+                       shift: float = None) -> tuple:
+    """Sums behind effectiveness_scores(), additive over disjoint students.
+
+    With x the share of a student's activities spent on an activity and y
+    the student's average grade minus `shift`, the sums run over graded
+    students: x, x*x and x*y per activity, and the count, y and y*y overall.
+    Sums over disjoint sets of students add up, so they can be kept current
+    by subtracting a student's old terms and adding the new ones.
+
+    Args:
+        pairs: Output of build_pair_table()
+        student_grades: Unrounded average grade per student
+        shift: Value subtracted from every grade to keep the sums well
+            conditioned; defaults to the mean grade
+
+    Returns:
+        (sums, totals): DataFrame indexed by activity_type with x, xx and xy
+        columns, and a Series with n, y, yy and shift
+    """
+    # Pairs are reduced over integer codes: one factorize per key column
+    student_codes, students = pd.factorize(pairs['student_id'], sort=False)
+    activity_codes, activities = pd.factorize(pairs['activity_type'], sort=False)
+    counts = pairs['count'].to_numpy(dtype='float64')
+    totals = np.bincount(student_codes, weights=counts, minlength=len(students))
+    grades = student_grades.reindex(students).to_numpy(dtype='float64', na_value=np.nan)
+    graded = ~np.isnan(grades)
+    if shift is None:
+        shift = float(grades[graded].mean()) if graded.any() else 0.0
+    centered = grades - shift
+
+    pair_grades = centered[student_codes]
+    share = np.where(np.isnan(pair_grades), 0.0, counts / totals[student_codes])
+    # Pairs without an activity_type are not an activity of their own
+    typed = activity_codes >= 0
+    sums = pd.DataFrame({
+        term: np.bincount(activity_codes[typed], weights=values[typed],
+                          minlength=len(activities))
+        for term, values in (('x', share), ('xx', share * share),
+                             ('xy', share * np.nan_to_num(pair_grades)))
+    }, index=pd.Index(activities, name='activity_type'))
+    y = centered[graded]
+    return sums, pd.Series({'n': float(len(y)), 'y': float(y.sum()),
+                            'yy': float((y * y).sum()), 'shift': shift})
+
+
+def effectiveness_from_sums(sums: pd.DataFrame, totals: pd.Series) -> pd.Series:
+    """Turn effectiveness_sums() into correlations scaled to -100..100.
+
+    Args:
+        sums: Per-activity x, xx and xy sums
+        totals: n, y and yy over graded students
+
+    Returns:
+        Series indexed by activity_type, see effectiveness_scores()
+    """
+    n = totals['n'] if totals['n'] > 0 else np.nan
+    mean_x = sums['x'] / n
+    mean_y = totals['y'] / n
+    var_x = (sums['xx'] / n - mean_x * mean_x).clip(lower=0.0)
+    var_y = max(totals['yy'] / n - mean_y * mean_y, 0.0)
+    covariance = sums['xy'] / n - mean_x * mean_y
+    denominator = np.sqrt(var_x * var_y)
+    corr = covariance / denominator.where(denominator > 1e-12)
+    return (corr.clip(-1.0, 1.0) * 100).rename('effectiveness')
+
+
+def effectiveness_scores(pairs: pd.DataFrame, student_grades: pd.Series) -> pd.Series:
+    """Correlate how much students use each activity with their grades.
+
+    For every activity this is the Pearson correlation, across all graded
+    students, between the share of a student's activities spent on it and
+    the student's average grade, scaled to -100..100. Students who never did
+    the activity count with a share of 0. Only per-pair sums are needed, so
+    the cost grows with the number of (student, activity) pairs rather than
+    students x activities.
+
+    Args:
+        pairs: Output of build_pair_table()
+        student_grades: Unrounded average grade per student
+
+    Returns:
+        Series indexed by activity_type; NaN where the correlation is
+        undefined (every student has the same share or the same grade)
+    """
+    return effectiveness_from_sums(*effectiveness_sums(pairs, student_grades))
+
+
+def activity_sums(pairs: pd.DataFrame) -> pd.DataFrame:
+    """Add up the pair table per activity_type.
+
+    Args:
+        pairs: Output of build_pair_table()
+
+    Returns:
+        DataFrame indexed by activity_type (first-appearance order) with
+        the count, grade sum limb and grade_count columns of the pair table
+    """
+    return pairs.groupby('activity_type', sort=False, observed=True).agg(
+        count=('count', 'sum'),
+        **{column: (column, 'sum') for column in SUM_COLUMNS},
+        grade_count=('grade_count', 'sum'),
+    )
+
+
+def activity_table_from_sums(table: pd.DataFrame, effectiveness: pd.Series,
+                             moments: pd.DataFrame = None) -> pd.DataFrame:
+    """Derive per-activity statistics from activity_sums().
+
+    Args:
+        table: Output of activity_sums()
+        effectiveness: Output of effectiveness_scores()
+        moments: Optional grade_moments(df, 'activity_type', variance=True);
+            computed from the grade sums (to the same values) when omitted
+
+    Returns:
+        DataFrame indexed by activity_type with count, avg_grade,
+        grade_variance and effectiveness columns
+    """
+    if moments is None:
+        moments = moments_from_sums(table['grade_count'].to_numpy(),
+                                    column_sums(table, 'grade_sum'),
+                                    column_sums(table, 'grade_sumsq'))
+        moments.index = table.index
+    mean = moments['mean'].reindex(table.index)
+    variance = moments['variance'].reindex(table.index)
+
+    stats = pd.DataFrame(index=table.index)
+    stats['count'] = table['count']
+    stats['avg_grade'] = mean.round(2)
+    stats['grade_variance'] = variance.round(2)
+    stats['effectiveness'] = effectiveness.reindex(table.index).round(2)
+    return stats
+
+
+def build_activity_table(pairs: pd.DataFrame, student_grades: pd.Series,
+                         moments: pd.DataFrame = None) -> pd.DataFrame:
+    """Derive per-activity statistics from the pair table.
+
+    Args:
+        pairs: Output of build_pair_table()
+        student_grades: Unrounded average grade per student
+        moments: Optional grade_moments(df, 'activity_type', variance=True);
+            computed from the pair table sums (to the same values) when
+            omitted
+
+    Returns:
+        DataFrame indexed by activity_type (first-appearance order) with
+        count, avg_grade, grade_variance and effectiveness columns
+    """
+    return activity_table_from_sums(
+        activity_sums(pairs), effectiveness_scores(pairs, student_grades), moments)
+
+
+def table_to_dict(table: pd.DataFrame) -> Dict:
+    """Convert a table indexed by key into a {key: {column: value}} dictionary.
+
+    Args:
+        table: DataFrame such as the output of build_activity_table()
+
+    Returns:
+        Dictionary mapping each index value to a dictionary of its row
+    """
+    fields = list(table.columns)
+    columns = [table[field].tolist() for field in fields]
+    return {
+        key: dict(zip(fields, values))
+        for key, *values in zip(table.index.tolist(), *columns)
+    }
+
+
+def profiles_to_dict(profile_table: pd.DataFrame) -> Dict:
+    """Convert a profile table into the student_profiles dictionary.
+
+    Args:
+        profile_table: Output of build_profile_table()
+
+    Returns:
+        Dictionary mapping student_id to its profile dictionary
+    """
+    return table_to_dict(profile_table[PROFILE_FIELDS])
+
+
+def merge_pair_tables(tables) -> pd.DataFrame:
+    """Combine pair tables built from different parts of the same log.
+
+    Args:
+        tables: Iterable of build_pair_table() outputs
+
+    Returns:
+        Single pair table, in order of first appearance in the combined log
+    """
+    combined = pd.concat(tables, ignore_index=True)
+    merged = combined.groupby(
+        ['student_id', 'activity_type'], sort=False, observed=True, dropna=False
+    ).agg(
+        count=('count', 'sum'),
+        **{column: (column, 'sum') for column in SUM_COLUMNS},
+        grade_count=('grade_count', 'sum'),
+        first_row=('first_row', 'min'),
+    )
+    return merged.reset_index().sort_values('first_row', kind='stable',
+                                            ignore_index=True)
+
+
+def merge_day_tables(tables) -> pd.DataFrame:
+    """Combine day tables built from different parts of the same log.
+
+    Args:
+        tables: Iterable of build_day_table() outputs
+
+    Returns:
+        Single day table with one row per distinct (student_id, day)
+    """
+    return pd.concat(tables, ignore_index=True).drop_duplicates(ignore_index=True)
+
+
+def _add_sums(total: pd.DataFrame, part: pd.DataFrame,
+              sign: float = 1.0) -> pd.DataFrame:
+    """Add two tables of sums indexed by key; new keys go last, in part's order."""
+    if sign != 1.0:
+        part = part * sign
+    index = total.index.append(part.index.difference(total.index, sort=False))
+    return total.reindex(index, fill_value=0) + part.reindex(index, fill_value=0)
+
+
+class _Level:
+    """One compacted pair or day table, with a student index built on first use."""
+
+    def __init__(self, table: pd.DataFrame):
+        self.table = table
+        self._index = None
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def rows(self, students) -> pd.DataFrame:
+        """Rows of the given students that occur in this table."""
+        if self._index is None:
+            self._index = StudentIndex(self.table)
+        return self._index.rows([student for student in students
+                                 if student in self._index])
+
+
+class LogAggregator:
+    """Running per-student and per-activity aggregates over a chunked log.
+
+    Chunks are reduced to pair and day tables as they arrive, so memory
+    depends on the number of students, activity types and active days, not
+    on the number of rows. Chunk tables are kept as up to `compact_every`
+    levels, older levels being larger, and merged only when there are more
+    (see _push()). Each level has a student index, so profiling a few
+    students reads only their rows, and the per-activity sums, class
+    average and student count are updated as chunks arrive. After a small
+    append, refreshing the touched students, activity statistics and
+    summary costs time proportional to the delta, not to the history.
+
+    Grade sums are kept exactly (see grade_limbs()), so averages and
+    variances, and the rankings and recommendations built on them, are
+    identical to the in-memory path's whatever the chunk size.
+
+    With a day_sketch (sketches.DayBitmap or HyperLogLog), active days are
+    folded into the sketch instead of the exact day table, so memory per
+    student stays fixed however long the history gets.
+    """
+
+    def __init__(self, compact_every: int = 16, day_sketch=None):
+        """Initialize an empty aggregator.
+
+        Args:
+            compact_every: Number of chunk tables to keep before merging
+                the newest ones
+            day_sketch: Optional empty sketch for days_active
+        """
+        self.compact_every = compact_every
+        self.day_sketch = day_sketch
+        self.total_rows = 0
+        self._pairs = []
+        self._days = []
+        self._grade_sum = np.zeros(LIMB_COUNT, dtype='int64')
+        self._grade_count = 0
+        # Computed from the merged tables on first use, then kept current
+        # by add(): the distinct students, activity_sums() and
+        # effectiveness_sums() of the whole log
+        self._students = None
+        self._activity_sums = None
+        self._effectiveness = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'LogAggregator':
+        """Build an aggregator over an already loaded, validated log.
+
+        Args:
+            df: Activity log with a datetime timestamp column
+
+        Returns:
+            New LogAggregator holding df's aggregates
+        """
+        aggregator = cls()
+        aggregator.add(df)
+        return aggregator
+
+    @classmethod
+    def from_tables(cls, total_rows: int, pairs: pd.DataFrame,
+                    days: pd.DataFrame = None,
+                    day_sketch=None) -> 'LogAggregator':
+        """Build an aggregator from already merged tables.
+
+        Args:
+            total_rows: Number of log rows the tables cover
+            pairs: Pair table of the whole log, see build_pair_table()
+            days: Day table of the whole log; None when day_sketch is given
+            day_sketch: Sketch holding the log's active days
+
+        Returns:
+            New LogAggregator holding the tables' aggregates
+        """
+        aggregator = cls(day_sketch=day_sketch)
+        if total_rows:
+            aggregator.total_rows = total_rows
+            aggregator._pairs = [_Level(pairs)]
+            if days is not None:
+                aggregator._days = [_Level(days)]
+            aggregator._count(pairs)
+        return aggregator
+
+    def save(self, path: str) -> None:
+        """Persist the running aggregates to a file.
+
+        Args:
+            path: Destination file (pickle format)
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        pd.to_pickle({
+            'version': AGGREGATE_STATE_VERSION,
+            'total_rows': self.total_rows,
+            'pairs': self.pair_table(),
+            'days': self.day_table() if self.day_sketch is None else None,
+            'day_sketch': self.day_sketch,
+        }, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'LogAggregator':
+        """Restore aggregates written by save().
+
+        Args:
+            path: File written by save()
+
+        Returns:
+            LogAggregator with the saved totals
+
+        Raises:
+            ValueError: If the file was written by an incompatible version
+        """
+        state = pd.read_pickle(path)
+        if state.get('version') != AGGREGATE_STATE_VERSION:
+            raise ValueError("Unsupported aggregate state version: "
+                             f"{state.get('version')}")
+        return cls.from_tables(state['total_rows'], state['pairs'], state['days'],
+                               day_sketch=state.get('day_sketch'))
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        """Fold one validated chunk into the running aggregates.
+
+        Args:
+            chunk: Activity log rows with a datetime timestamp column
+        """
+        if len(chunk) == 0:
+            return
+        pairs = build_pair_table(chunk, row_offset=self.total_rows)
+        if self._activity_sums is not None:
+            # Swap the touched students' terms for their updated ones
+            before = self._student_pairs(pairs['student_id'].unique())
+            self._update_effectiveness(before, merge_pair_tables([before, pairs]))
+        self._push(self._pairs, pairs, merge_pair_tables)
+        if self.day_sketch is None:
+            self._push(self._days, build_day_table(chunk), merge_day_tables)
+        else:
+            self.day_sketch.add(chunk['student_id'], day_numbers(chunk['timestamp']))
+        self.total_rows += len(chunk)
+        self._count(pairs)
+
+    def merge(self, other: 'LogAggregator') -> 'LogAggregator':
+        """Fold another aggregator's totals into this one.
+
+        The other aggregator is treated as covering the rows that follow
+        this one's.
+
+        Args:
+            other: Aggregator over a later part of the log
+
+        Returns:
+            This aggregator
+
+        Raises:
+            ValueError: If only one of the aggregators uses a day sketch
+        """
+        if (self.day_sketch is None) != (other.day_sketch is None):
+            raise ValueError("Cannot merge exact day tables with day sketches")
+        if other.total_rows:
+            shifted = other.pair_table().copy()
+            shifted['first_row'] += self.total_rows
+            self._push(self._pairs, shifted, merge_pair_tables)
+            if self.day_sketch is None:
+                self._push(self._days, other.day_table(), merge_day_tables)
+            else:
+                self.day_sketch.merge(other.day_sketch)
+            self.total_rows += other.total_rows
+            self._grade_sum += other._grade_sum
+            self._grade_count += other._grade_count
+            self._students = self._activity_sums = self._effectiveness = None
+        return self
+
+    def _push(self, levels: list, table: pd.DataFrame, merge) -> None:
+        """Add a table as the newest level, merging levels when there are too many.
+
+        The newest levels are merged together with every older level that is
+        no larger than what is merged so far, so level sizes shrink from old
+        to new and a row is re-merged only when the rows after it have
+        caught up with its level.
+        """
+        levels.append(_Level(table))
+        if len(levels) <= self.compact_every:
+            return
+        start = len(levels) - 2
+        size = len(levels[-1]) + len(levels[-2])
+        while start > 0 and len(levels[start - 1]) <= size:
+            start -= 1
+            size += len(levels[start])
+        levels[start:] = [_Level(merge([level.table for level in levels[start:]]))]
+
+    @staticmethod
+    def _collapse(levels: list, merge) -> None:
+        """Merge all levels into one."""
+        if len(levels) > 1:
+            levels[:] = [_Level(merge([level.table for level in levels]))]
+
+    def _count(self, pairs: pd.DataFrame) -> None:
+        """Fold a new pair table into the grade, student and activity totals."""
+        self._grade_sum += pairs[SUM_COLUMNS[:LIMB_COUNT]].to_numpy().sum(axis=0)
+        self._grade_count += int(pairs['grade_count'].sum())
+        if self._students is not None:
+            self._students.update(pairs['student_id'].unique().tolist())
+        if self._activity_sums is not None:
+            self._activity_sums = _add_sums(self._activity_sums, activity_sums(pairs))
+
+    def _student_pairs(self, students) -> pd.DataFrame:
+        """Merged pair table restricted to some students, read level by level."""
+        parts = [level.rows(students) for level in self._pairs]
+        return merge_pair_tables(parts) if parts else build_pair_table(_EMPTY_LOG)
+
+    def _update_effectiveness(self, before: pd.DataFrame, after: pd.DataFrame) -> None:
+        """Replace the effectiveness terms of the students in `before` by `after`."""
+        sums, totals = self._effectiveness
+        for pairs, sign in ((before, -1.0), (after, 1.0)):
+            part, part_totals = effectiveness_sums(pairs, pair_student_grades(pairs),
+                                                   shift=totals['shift'])
+            sums = _add_sums(sums, part, sign)
+            totals = totals.add(part_totals.drop('shift') * sign, fill_value=0.0)
+        self._effectiveness = sums, totals
+
+    def pair_table(self) -> pd.DataFrame:
+        """Return the merged pair table."""
+        self._collapse(self._pairs, merge_pair_tables)
+        return self._pairs[0].table if self._pairs else build_pair_table(_EMPTY_LOG)
+
+    def day_table(self) -> pd.DataFrame:
+        """Return the merged day table.
+
+        Raises:
+            ValueError: If days are kept in a day sketch
+        """
+        if self.day_sketch is not None:
+            raise ValueError("The exact day table is not kept "
+                             "when a day sketch is used")
+        self._collapse(self._days, merge_day_tables)
+        return self._days[0].table if self._days else build_day_table(_EMPTY_LOG)
+
+    def student_grades(self) -> pd.Series:
+        """Return the unrounded average grade per student."""
+        return pair_student_grades(self.pair_table())
+
+    def profile_table(self, students=None) -> pd.DataFrame:
+        """Return the per-student profile table.
+
+        Args:
+            students: Optional student ids to restrict the table to; only
+                their rows are read, so the cost depends on how many
+                students are profiled, not on the size of the tables
+
+        Returns:
+            Profile table, see build_profile_table()
+        """
+        if students is None:
+            pairs = self.pair_table()
+            days = self.day_table() if self.day_sketch is None else None
+        else:
+            students = pd.unique(np.asarray(students, dtype=object))
+            pairs = self._student_pairs(students)
+            if self.day_sketch is None:
+                parts = [level.rows(students) for level in self._days]
+                days = merge_day_tables(parts) if parts else build_day_table(_EMPTY_LOG)
+        if self.day_sketch is not None:
+            days = self.day_sketch.counts(pairs['student_id'].unique())
+        return build_profile_table(pairs, days)
+
+    def activity_table(self) -> pd.DataFrame:
+        """Return the per-activity statistics table.
+
+        The first call sums up the merged pair table; later chunks then only
+        update the activities and students they touch.
+        """
+        if self._activity_sums is None:
+            pairs = self.pair_table()
+            self._activity_sums = activity_sums(pairs)
+            self._effectiveness = effectiveness_sums(pairs, pair_student_grades(pairs))
+        return activity_table_from_sums(self._activity_sums,
+                                        effectiveness_from_sums(*self._effectiveness))
+
+    def student_count(self) -> int:
+        """Return the number of distinct students."""
+        if self._students is None:
+            self._students = set()
+            for level in self._pairs:
+                self._students.update(level.table['student_id'].unique().tolist())
+        return len(self._students)
+
+    def class_average(self) -> float:
+        """Return the unrounded average grade over every graded row."""
+        if not self._grade_count:
+            return float('nan')
+        return float(limb_totals(self._grade_sum)[0] / self._grade_count)
+
+
+_EMPTY_LOG = pd.DataFrame({
+    'student_id': pd.Series(dtype=object),
+    'activity_type': pd.Series(dtype=object),
+    'timestamp': pd.Series(dtype='datetime64[ns]'),
+    'grade': pd.Series(dtype='float64'),
+})
@@ -2,166 +2,906 @@
 
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.cluster import KMeans
+from contextlib import nullcontext
 from datetime import datetime
 from typing import Dict, List, Tuple
-import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
 
+try:
+    from .backends import BACKENDS, open_log
+    from .aggregates import (
+        build_pair_table, build_day_table, build_profile_table, build_activity_table,
+        pair_class_average, pair_student_grades, student_grade_means, profiles_to_dict,
+        table_to_dict, LogAggregator, PROFILE_FIELDS
+    )
+    from .charts import render_charts
+    from .cleaning import LogCleaner, check_columns, parse_timestamps
+    from .clustering import StudentClusters, feature_matrix
+    from .ingest import concat_files, is_multi_file, iter_files
+    from .lookup import StudentIndex
+    from .memo import ResultCache
+    from .parallel import resolve_n_jobs, run_sharded
+    from .ranking import GradeRanking
+    from .rules import Recommendations, RULES, TREND_RULES
+    from .sequences import ActivitySequences
+    from .snapshot import load_snapshot, save_snapshot
+    from .timeline import ActivityTimeline, TREND_FIELDS
+    from .utils import read_log
+except ImportError:  # running as a script from src/ (see main.py)
+    from backends import BACKENDS, open_log
+    from aggregates import (
+        build_pair_table, build_day_table, build_profile_table, build_activity_table,
+        pair_class_average, pair_student_grades, student_grade_means, profiles_to_dict,
+        table_to_dict, LogAggregator, PROFILE_FIELDS
+    )
+    from charts import render_charts
+    from cleaning import LogCleaner, check_columns, parse_timestamps
+    from clustering import StudentClusters, feature_matrix
+    from ingest import concat_files, is_multi_file, iter_files
+    from lookup import StudentIndex
+    from memo import ResultCache
+    from parallel import resolve_n_jobs, run_sharded
+    from ranking import GradeRanking
+    from rules import Recommendations, RULES, TREND_RULES
+    from sequences import ActivitySequences
+    from snapshot import load_snapshot, save_snapshot
+    from timeline import ActivityTimeline, TREND_FIELDS
+    from utils import read_log
+
 
 class LearningPathAnalyzer:
     """Analyzes student learning paths based on LMS activity logs."""
 
-    def __init__(self):
-        """Initialize the analyzer."""
+    def __init__(self, n_jobs: int = 1, profiler=None, backend: str = 'pandas'):
+        """Initialize the analyzer.
+
+        Args:
+            n_jobs: Worker processes for profiling and recommendations. With
+                more than one (or -1 for all cores), the loaded log is
+                hash-partitioned by student and the shards are processed in
+                a process pool (see parallel.py); results are identical to
+                the serial path.
+            profiler: Optional instrumentation.StageProfiler; load_data()
+                then records its read and validate steps as stages
+            backend: Execution backend for load_data(): 'pandas' or
+                'duckdb', which loads the file into an embedded DuckDB
+                (see backends.py)
+
+        Raises:
+            ValueError: If the backend is unknown
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend!r} "
+                             f"(expected one of {BACKENDS})")
+        self.backend = backend
+        self.n_jobs = n_jobs
+        self.profiler = profiler
+        # Derived results, reused until the data changes (see memo.py)
+        self.cache = ResultCache()
         self.df = None
-        self.activity_stats = {}
-        self.student_profiles = {}
-        self.recommendations = {}
+        self.aggregates = None
+        # Row counts of the last load_data(clean=True) (see cleaning.py)
+        self.cleaning_report = None
         
         # Ensure reports directory exists
         Path('reports').mkdir(exist_ok=True)
-        
-        # Set up matplotlib style
-        sns.set_style("whitegrid")
-        plt.rcParams['figure.figsize'] = (12, 6)
-        plt.rcParams['font.size'] = 10
 
-    def load_data(self, filepath: str) -> pd.DataFrame:
-        """Load LMS logs from CSV file.
+    @property
+    def df(self) -> pd.DataFrame:
+        """The loaded activity log (None in streaming/incremental mode).
+
+        Assigning a new log makes every cached result stale. After changing
+        the frame in place, call self.cache.invalidate().
+        """
+        return self._df
+
+    @df.setter
+    def df(self, df: pd.DataFrame) -> None:
+        self._df = df
+        self.cache.invalidate()
+
+    @property
+    def activity_stats(self) -> Dict:
+        """Activity statistics for the current data ({} until analyzed)."""
+        return self.cache.peek('activity_stats', {})
+
+    @activity_stats.setter
+    def activity_stats(self, stats: Dict) -> None:
+        self.cache.put('activity_stats', stats)
+
+    @property
+    def student_profiles(self) -> Dict:
+        """Student profiles for the current data ({} until profiled)."""
+        return self.cache.peek('student_profiles', {})
+
+    @student_profiles.setter
+    def student_profiles(self, profiles: Dict) -> None:
+        self.cache.put('student_profiles', profiles)
+
+    @property
+    def recommendations(self) -> Dict:
+        """Recommendations for the current profiles ({} until generated)."""
+        return self.cache.peek('recommendations', {})
+
+    @recommendations.setter
+    def recommendations(self, recommendations: Dict) -> None:
+        self.cache.put('recommendations', recommendations, ('student_profiles',))
+
+    @property
+    def ranking(self) -> GradeRanking:
+        """GradeRanking over the current profiles (None until profiled)."""
+        if not self.student_profiles:
+            return None
+        return self._grade_ranking()
+
+    def load_data(self, filepath: str, chunksize: int = None, compact: bool = False,
+                  cache: bool = False, day_sketch=None, clean: bool = False,
+                  quarantine: str = None, **backend_options):
+        """Load LMS logs from a CSV, Parquet or Feather file.
+
+        With chunksize, the file is streamed in chunks of that many rows and
+        each chunk is folded into running aggregates (self.aggregates)
+        instead of being kept in memory; self.df stays None and peak memory
+        no longer depends on the size of the file. Profiles, activity
+        statistics and the summary report are then computed from the
+        aggregates.
+
+        With compact, ids and activity types are read as categoricals,
+        grades as float32 and timestamps are parsed by the CSV reader, which
+        cuts memory per row several times over.
+
+        With cache, the validated frame is saved as a binary snapshot next
+        to the file on the first load, and later loads of the unchanged file
+        memory-map the snapshot instead of parsing it (see snapshot.py).
+        Streaming loads read an existing snapshot but never write one.
+
+        With a day_sketch (sketches.DayBitmap or HyperLogLog), streaming
+        mode counts active days in the sketch instead of keeping every
+        (student, day) pair, so memory per student stays fixed; days_active
+        is then exact for a DayBitmap and an estimate for a HyperLogLog.
+
+        With the duckdb backend, the file is copied into an embedded DuckDB
+        table instead: self.aggregates becomes a backends.DuckDBLog that
+        builds each analysis from queries over it, and self.df stays None.
+        chunksize, compact, cache and day_sketch only apply to the pandas
+        backend.
+
+        A directory or glob pattern loads every matching file with
+        load_files() (streamed into aggregates when chunksize is given).
+
+        With clean, every chunk is validated and cleaned as it is read (see
+        cleaning.py): rows with a missing id or activity, an unparseable
+        timestamp or an out-of-range grade, and repeated (student_id,
+        activity_type, timestamp) rows are dropped, optionally written to
+        a quarantine CSV, and counted in self.cleaning_report. The snapshot
+        cache is not used then.
 
         Args:
-            filepath: Path to CSV file with LMS logs
+            filepath: Path to LMS logs (.csv, .parquet/.pq, .feather/.arrow),
+                or a directory or glob pattern of such files
+            chunksize: Number of rows per chunk for streaming mode
+            compact: Use the compact typed layout (see utils.COMPACT_DTYPES)
+            cache: Read from and write to the snapshot cache
+            day_sketch: Optional empty sketch for days_active (streaming only)
+            clean: Drop and count invalid and duplicate rows
+            quarantine: Optional CSV file for the dropped rows (implies clean)
+            **backend_options: Options for a non-default backend, e.g.
+                memory_limit='4GB' for duckdb
 
         Returns:
-            Loaded DataFrame
+            Loaded DataFrame, the LogAggregator in streaming mode, or the
+            backend's log object
         """
-        self.df = pd.read_csv(filepath)
-        self._validate_data()
+        clean = clean or quarantine is not None
+        if is_multi_file(filepath) and self.backend == 'pandas':
+            return self.load_files(filepath, compact=compact,
+                                   stream=chunksize is not None,
+                                   day_sketch=day_sketch, clean=clean,
+                                   quarantine=quarantine)
+        self.cleaning_report = None
+        if self.backend != 'pandas':
+            log = open_log(self.backend, filepath, **backend_options)
+            self.df = None
+            self.aggregates = log
+            self.cache.invalidate()
+            return log
+
+        cleaner = LogCleaner(quarantine, compact=compact) if clean else None
+        # The cleaner parses the raw columns itself and applies the compact
+        # layout to the rows it keeps
+        compact_read = compact and cleaner is None
+        snapshot = (load_snapshot(filepath, compact, chunksize)
+                    if cache and not clean else None)
+
+        if chunksize is not None:
+            aggregator = LogAggregator(day_sketch=day_sketch)
+            if snapshot is not None:
+                for chunk in snapshot:
+                    aggregator.add(chunk)
+            else:
+                validate = (cleaner.clean if cleaner is not None
+                            else self._validate_frame)
+                for chunk in read_log(filepath, chunksize=chunksize,
+                                      compact=compact_read):
+                    aggregator.add(validate(chunk))
+            self.df = None
+            self.aggregates = aggregator
+            self.cache.invalidate()
+            self.cleaning_report = cleaner.report() if cleaner is not None else None
+            return aggregator
+
+        self.aggregates = None
+        if snapshot is not None:
+            self.df = snapshot
+            return self.df
+
+        with self._stage('read'):
+            df = read_log(filepath, compact=compact_read)
+        with self._stage('validate'):
+            validate = cleaner.clean if cleaner is not None else self._validate_frame
+            self.df = validate(df)
+        self.cleaning_report = cleaner.report() if cleaner is not None else None
+        if cache and not clean:
+            with self._stage('snapshot'):
+                save_snapshot(self.df, filepath, compact)
         return self.df
 
+    def load_files(self, source: str, workers: int = None, executor: str = 'thread',
+                   max_pending: int = None, course=None, compact: bool = False,
+                   stream: bool = False, day_sketch=None, clean: bool = False,
+                   quarantine: str = None):
+        """Load many log files at once, e.g. one CSV per course per day.
+
+        Files are parsed and validated concurrently by a thread or process
+        pool, with at most max_pending parsed files held at a time (see
+        ingest.py). Every row gets a course column, so results can be
+        sliced per course with for_course().
+
+        With stream, each file is folded into running aggregates as it
+        arrives instead of being kept, as with load_data(chunksize=...);
+        memory is then capped by max_pending files, but the course column
+        is not kept.
+
+        Args:
+            source: Directory (searched recursively) or glob pattern
+            workers: Pool size (default: number of cores)
+            executor: 'thread' or 'process'
+            max_pending: Parsed files held at once (default: 2 x workers)
+            course: Function (path, root) -> course name (default: the
+                top-level directory below the root, or the file name up to
+                the first '_')
+            compact: Use the compact typed layout
+            stream: Fold files into aggregates instead of keeping them
+            day_sketch: Optional sketch for days_active in stream mode
+            clean: Clean the files as they arrive, as load_data(clean=True);
+                duplicates are detected across files
+            quarantine: Optional CSV file for the dropped rows (implies clean)
+
+        Returns:
+            Combined DataFrame, or the LogAggregator with stream
+
+        Raises:
+            FileNotFoundError: If no files match
+        """
+        clean = clean or quarantine is not None
+        cleaner = LogCleaner(quarantine, compact=compact) if clean else None
+        # Cleaning needs one view of every file for deduplication, so it
+        # runs here as the files arrive instead of in the workers
+        validate = None if clean else LearningPathAnalyzer._validate_frame
+        files = iter_files(source, course=course, workers=workers, executor=executor,
+                           max_pending=max_pending, compact=compact and not clean,
+                           validate=validate)
+        if cleaner is not None:
+            files = map(cleaner.clean, files)
+        if stream:
+            aggregator = LogAggregator(day_sketch=day_sketch)
+            with self._stage('read'):
+                for frame in files:
+                    aggregator.add(frame)
+            self.df = None
+            self.aggregates = aggregator
+            self.cache.invalidate()
+            self.cleaning_report = cleaner.report() if cleaner is not None else None
+            return aggregator
+
+        self.aggregates = None
+        with self._stage('read'):
+            df = concat_files(files)
+        if compact:
+            df['course'] = df['course'].astype('category')
+        self.df = df
+        self.cleaning_report = cleaner.report() if cleaner is not None else None
+        return self.df
+
+    def courses(self) -> List:
+        """Return the courses of a log loaded with load_files(), in load order."""
+        if self.df is None or 'course' not in self.df.columns:
+            return []
+        return list(pd.unique(self.df['course']))
+
+    def for_course(self, course) -> 'LearningPathAnalyzer':
+        """Return an analyzer over one course's rows of the loaded log.
+
+        Args:
+            course: Course name (see courses())
+
+        Returns:
+            New LearningPathAnalyzer with the same settings
+
+        Raises:
+            ValueError: If no log with a course column is loaded
+        """
+        if self.df is None or 'course' not in self.df.columns:
+            raise ValueError("No per-course log loaded. Call load_files() first.")
+        analyzer = LearningPathAnalyzer(n_jobs=self.n_jobs, profiler=self.profiler)
+        analyzer.df = self.df[self.df['course'] == course].reset_index(drop=True)
+        return analyzer
+
+    def _stage(self, name: str):
+        """Measure a block as a profiler stage (no-op without a profiler)."""
+        return self.profiler.stage(name) if self.profiler is not None else nullcontext()
+
     def _validate_data(self) -> None:
         """Validate data structure."""
-        required_cols = {'student_id', 'activity_type', 'timestamp', 'grade'}
-        if not required_cols.issubset(set(self.df.columns)):
-            raise ValueError(f"Missing required columns: {required_cols}")
-        self.df['timestamp'] = pd.to_datetime(self.df['timestamp'])
+        self._validate_frame(self.df)
 
-    def analyze_activity_patterns(self) -> Dict:
+    @staticmethod
+    def _validate_frame(df: pd.DataFrame) -> pd.DataFrame:
+        """Check required columns and parse timestamps in place.
+
+        Args:
+            df: Full log or one chunk of it
+
+        Returns:
+            The same DataFrame
+        """
+        check_columns(df.columns)
+        # The parser cleaning uses, raising instead of quarantining
+        df['timestamp'] = parse_timestamps(df['timestamp'], errors='raise')
+        return df
+
+    def _require_data(self) -> None:
+        """Raise if neither a DataFrame nor streamed aggregates are loaded."""
+        if self.df is None and self.aggregates is None:
+            raise ValueError("No data loaded. Call load_data() first.")
+
+    def _sharded(self):
+        """Return the sharded run for the loaded log, or None if serial.
+
+        The run is done once per loaded dataset and shared by profiling,
+        recommendations and activity statistics.
+        """
+        if self.df is None or resolve_n_jobs(self.n_jobs) <= 1:
+            return None
+        return self.cache.get('shards', lambda: run_sharded(self.df, self.n_jobs))
+
+    def _class_average(self) -> float:
+        """Return the unrounded average grade over all activities."""
+        def compute():
+            if self.df is not None:
+                # From the exact pair table sums, as streamed aggregates do
+                return pair_class_average(self._pair_table())
+            return self.aggregates.class_average()
+        return self.cache.get('class_average', compute)
+
+    def analyze_activity_patterns(self, as_frame: bool = False):
         """Analyze activity patterns across all students.
 
+        Statistics for every activity type come from one grouped pass over
+        the data. Effectiveness is the correlation (x100) between the share
+        of a student's activities spent on an activity and the student's
+        average grade. The result is cached until the data changes.
+
+        Args:
+            as_frame: Return a DataFrame indexed by activity type instead of
+                a dictionary
+
         Returns:
-            Dictionary with activity statistics
+            Dictionary (or DataFrame) with count, avg_grade, grade_variance
+            and effectiveness per activity type
         """
+        self._require_data()
+        table = self.cache.get('activity_table', self._activity_table,
+                               self._log_tables())
+        stats = self.cache.get('activity_stats', lambda: table_to_dict(table),
+                               ('activity_table',))
+        return table.copy() if as_frame else stats
+
+    def _activity_table(self) -> pd.DataFrame:
+        """Compute the activity statistics table."""
         if self.df is None:
-            raise ValueError("No data loaded. Call load_data() first.")
+            return self.aggregates.activity_table()
+        # Everything comes from the shared pair table, whose exact grade
+        # sums give the same means and variances as a pass over the log
+        return build_activity_table(self._pair_table(), self._grade_means())
 
-        activity_stats = {}
+    def _log_tables(self) -> Tuple[str, ...]:
+        """Bring the tables shared by profiles and activity statistics up to date.
 
-        for activity_type in self.df['activity_type'].unique():
-            activity_data = self.df[self.df['activity_type'] == activity_type]
-            avg_grade = activity_data['grade'].mean()
-            count = len(activity_data)
-            correlation = activity_data['grade'].corr(activity_data['grade']) * 100
+        Returns:
+            Their cache names, to be used as dependencies (none in
+            streaming mode, where the aggregates hold them)
+        """
+        if self.df is None:
+            return ()
+        self._pair_table()
+        self._grade_means()
+        return ('pair_table', 'student_grade_means')
 
-            activity_stats[activity_type] = {
-                'count': count,
-                'avg_grade': round(avg_grade, 2),
-                'effectiveness': round(correlation, 2)
-            }
+    def _pair_table(self) -> pd.DataFrame:
+        """Return the (student_id, activity_type) pair table of the log (built once)."""
+        def compute():
+            shards = self._sharded()
+            return shards.pairs if shards is not None else build_pair_table(self.df)
+        return self.cache.get('pair_table', compute)
 
-        self.activity_stats = activity_stats
-        return activity_stats
+    def _grade_means(self) -> pd.Series:
+        """Return the exact average grade per student (computed once)."""
+        def compute():
+            shards = self._sharded()
+            if shards is not None:
+                return shards.grade_means
+            # The pair table's sums are exact, so no second pass is needed
+            return pair_student_grades(self._pair_table())
+        return self.cache.get('student_grade_means', compute)
 
     def profile_students(self) -> Dict:
         """Create student learning profiles.
 
+        All students are profiled together from one grouped pass over the
+        data (see aggregates.py) instead of filtering the log per student.
+        The result is cached until the data changes.
+
         Returns:
             Dictionary with student profiles
         """
+        self._require_data()
+        table = self.cache.get('profile_table', self._profile_table, self._log_tables())
+        return self.cache.get('student_profiles', lambda: profiles_to_dict(table),
+                              ('profile_table',))
+
+    def _profile_table(self) -> pd.DataFrame:
+        """Compute the profile table, one row per student."""
+        shards = self._sharded()
         if self.df is None:
-            raise ValueError("No data loaded. Call load_data() first.")
+            table = self.aggregates.profile_table()
+        elif shards is not None:
+            table = shards.profile_table
+        else:
+            table = build_profile_table(self._pair_table(), build_day_table(self.df),
+                                        self._grade_means())
+        return table
 
-        profiles = {}
-
-        for student_id in self.df['student_id'].unique():
-            student_data = self.df[self.df['student_id'] == student_id]
-            total_activities = len(student_data)
-            avg_grade = student_data['grade'].mean()
-            activity_diversity = len(student_data['activity_type'].unique())
-            days_active = len(student_data['timestamp'].dt.date.unique())
-
-            # Determine learning style
-            activity_pref = student_data['activity_type'].value_counts().index[0]
-
-            profiles[student_id] = {
-                'total_activities': total_activities,
-                'average_grade': round(avg_grade, 2),
-                'activity_diversity': activity_diversity,
-                'days_active': days_active,
-                'preferred_activity': activity_pref,
-                'engagement_level': self._calculate_engagement(student_data)
-            }
+    def _current_profile_table(self) -> pd.DataFrame:
+        """Return the profile table matching self.student_profiles.
+
+        That is the cached table when the profiles were derived from it,
+        otherwise (profiles assigned or refreshed by append()) a table
+        built from the dictionary.
+        """
+        if self.cache.derived_from('student_profiles', 'profile_table'):
+            return self.cache.peek('profile_table')
+        return self._profiles_frame(self.student_profiles)
+
+    def student_index(self) -> StudentIndex:
+        """Return the per-student row index over the loaded log (built once).
+
+        Returns:
+            StudentIndex over the loaded log (see lookup.py)
+
+        Raises:
+            ValueError: If only aggregates are loaded (streaming mode)
+        """
+        self._require_data()
+        if self.df is None:
+            raise ValueError("Student histories need the full log; "
+                             "load it without chunksize")
+        return self.cache.get('student_index', lambda: StudentIndex(self.df))
 
-        self.student_profiles = profiles
-        return profiles
+    def get_student_history(self, student_id) -> pd.DataFrame:
+        """Return one student's activity rows without scanning the log.
 
-    def _calculate_engagement(self, student_data: pd.DataFrame) -> str:
-        """Calculate engagement level based on activity data.
+        Args:
+            student_id: Student to look up
+
+        Returns:
+            The student's rows in log order, as a read-only view
+
+        Raises:
+            KeyError: If the student is not in the log
+        """
+        return self.student_index().history(student_id)
+
+    def get_student_histories(self, student_ids: List) -> Dict:
+        """Return the activity rows of several students.
 
         Args:
-            student_data: DataFrame with student's activities
+            student_ids: Students to look up
 
         Returns:
-            Engagement level: 'high', 'medium', or 'low'
+            {student_id: rows in log order}, as read-only views
+
+        Raises:
+            KeyError: If a student is not in the log
         """
-        total_activities = len(student_data)
-        avg_grade = student_data['grade'].mean()
+        return self.student_index().histories(student_ids)
 
-        if total_activities > 15 and avg_grade > 70:
-            return 'high'
-        elif total_activities > 5 or avg_grade > 60:
-            return 'medium'
-        else:
-            return 'low'
+    def get_profile(self, student_id) -> Dict:
+        """Return one student's profile.
+
+        Reads the cached profiles when they exist; otherwise profiles only
+        this student's rows (see student_index()), with the same result as
+        profile_students().
+
+        Args:
+            student_id: Student to look up
+
+        Returns:
+            Profile dictionary (see profile_students())
+
+        Raises:
+            KeyError: If the student is not in the log
+        """
+        return self.get_profiles([student_id])[student_id]
+
+    def get_profiles(self, student_ids: List) -> Dict:
+        """Return the profiles of several students (see get_profile()).
 
-    def generate_recommendations(self) -> Dict:
+        Args:
+            student_ids: Students to look up
+
+        Returns:
+            {student_id: profile}, in the order given
+
+        Raises:
+            KeyError: If a student is not in the log
+        """
+        profiles = self.student_profiles
+        if not profiles and self.df is None:
+            profiles = self.profile_students()
+        if profiles:
+            return {student_id: profiles[student_id] for student_id in student_ids}
+        return profiles_to_dict(self._student_profile_table(student_ids))
+
+    def get_recommendations(self, student_id) -> List[str]:
+        """Return one student's recommendations.
+
+        Reads the cached recommendations when they exist; otherwise the
+        rules are evaluated for this student's profile only.
+
+        Args:
+            student_id: Student to look up
+
+        Returns:
+            List of recommendation strings
+
+        Raises:
+            KeyError: If the student is not in the log
+        """
+        recommendations = self.recommendations
+        if recommendations:
+            return recommendations[student_id]
+        if self.student_profiles or self.df is None:
+            return self.generate_recommendations()[student_id]
+        table = self._student_profile_table([student_id])
+        return Recommendations.from_table(table)[student_id]
+
+    def _student_profile_table(self, student_ids: List) -> pd.DataFrame:
+        """Profile table of some students, built from their rows only."""
+        rows = self.student_index().rows(dict.fromkeys(student_ids))
+        return build_profile_table(build_pair_table(rows), build_day_table(rows),
+                                   student_grade_means(rows))
+
+    def generate_recommendations(self, trends: bool = False) -> Dict:
         """Generate recommendations for each student.
 
+        The rules in rules.py are evaluated over the whole profile table at
+        once; the result is a read-only mapping of student_id to the list of
+        recommendation strings, expanded when a student is looked up. It is
+        cached until the profiles change.
+
+        Args:
+            trends: Also apply rules.TREND_RULES to this week's engagement
+                trends (see engagement_trends()); needs the loaded log
+
         Returns:
-            Dictionary with recommendations
+            Recommendations mapping (student_id -> list of strings)
         """
         if not self.student_profiles:
             self.profile_students()
+        if not trends:
+            return self.cache.get(
+                'recommendations',
+                lambda: Recommendations.from_table(self._current_profile_table()),
+                ('student_profiles',),
+            )
+
+        trend_table = self.engagement_trends()
+
+        def compute():
+            table = self._current_profile_table().join(trend_table[TREND_FIELDS])
+            return Recommendations.from_table(table, RULES + TREND_RULES)
+        return self.cache.get('recommendations', compute,
+                              ('student_profiles', self._trends_name(None, 4)))
+
+    def timeline(self) -> ActivityTimeline:
+        """Return the log sorted by timestamp for time-windowed queries.
+
+        It is built once per dataset; window queries on it use binary search
+        and the student x week matrix is shared by trends, trend
+        recommendations and the weekly chart (see timeline.py).
+
+        Returns:
+            ActivityTimeline over the loaded log
+
+        Raises:
+            ValueError: If only aggregates are loaded (streaming mode)
+        """
+        self._require_data()
+        if self.df is None:
+            raise ValueError("Time-windowed analytics need the full log; "
+                             "load it without chunksize")
+        return self.cache.get('timeline', lambda: ActivityTimeline(self.df))
+
+    def weekly_activity(self, by: str = 'student_id',
+                        values: str = 'activities') -> pd.DataFrame:
+        """Return the student (or activity type) x week matrix.
+
+        Args:
+            by: 'student_id' or 'activity_type'
+            values: 'activities' or 'average_grade'
 
-        recommendations = {}
+        Returns:
+            DataFrame with one column per week, starting on Mondays
+        """
+        return self.timeline().weekly(by, values)
 
-        for student_id, profile in self.student_profiles.items():
-            recs = []
+    def rolling_engagement(self, days: int = 7, end=None,
+                           by: str = 'student_id') -> pd.DataFrame:
+        """Compare activity and grades in the last N days with the N before.
 
-            if profile['engagement_level'] == 'low':
-                recs.append("Increase participation in learning activities")
-                recs.append("Set a schedule for regular study sessions")
-            elif profile['engagement_level'] == 'medium':
-                recs.append("Explore diverse activity types to enhance learning")
-                recs.append("Aim to increase consistency in participation")
+        Args:
+            days: Window length in days
+            end: End of the current window, exclusive (default: just after
+                the last activity)
+            by: 'student_id' or 'activity_type'
+
+        Returns:
+            DataFrame per student or activity, see ActivityTimeline.rolling()
+        """
+        return self.timeline().rolling(days, end, by)
+
+    def engagement_trends(self, week=None, baseline_weeks: int = 4) -> pd.DataFrame:
+        """Compare each student's activity in a week with the weeks before.
+
+        Args:
+            week: Any timestamp in the week to look at (default: the last
+                week of the log)
+            baseline_weeks: Number of preceding weeks to average
+
+        Returns:
+            DataFrame indexed by student_id with timeline.TREND_FIELDS
+        """
+        timeline = self.timeline()
+        return self.cache.get(
+            self._trends_name(week, baseline_weeks),
+            lambda: timeline.trends(week, baseline_weeks),
+            ('timeline',),
+        )
+
+    def sequences(self) -> ActivitySequences:
+        """Return every student's activities in time order (built once).
+
+        Returns:
+            ActivitySequences derived from timeline() (see sequences.py)
+        """
+        timeline = self.timeline()
+        return self.cache.get('sequences',
+                              lambda: ActivitySequences.from_timeline(timeline),
+                              ('timeline',))
+
+    def transition_matrix(self, normalize: bool = False) -> pd.DataFrame:
+        """Count how often each activity is followed by each other one.
+
+        Args:
+            normalize: Return row probabilities instead of counts
+
+        Returns:
+            DataFrame indexed by activity ('from') with one column per next
+            activity ('to')
+        """
+        return self.sequences().transition_matrix(normalize)
+
+    def frequent_paths(self, n: int = 3, top: int = 10,
+                       min_count: int = 1) -> pd.DataFrame:
+        """Find the most common paths of n consecutive activities.
+
+        Each path is linked to the grade of the activity students did right
+        after it.
+
+        Args:
+            n: Path length
+            top: Number of paths to return (None for all)
+            min_count: Minimum number of occurrences
+
+        Returns:
+            DataFrame with path, count, students, next_grade, graded and
+            grade_lift columns (see ActivitySequences.ngrams())
+        """
+        return self.sequences().ngrams(n, min_count=min_count, top=top)
+
+    @staticmethod
+    def _trends_name(week, baseline_weeks: int) -> str:
+        """Cache name of an engagement_trends() result."""
+        return f'engagement_trends_{week}_{baseline_weeks}'
+
+    def activity_drops(self, threshold: float = 0.5, week=None,
+                       baseline_weeks: int = 4) -> List:
+        """Return the students whose activity dropped in a week.
+
+        Args:
+            threshold: Minimum relative drop versus the baseline average
+                (0.5 = at least 50% fewer activities)
+            week: Any timestamp in the week to look at (default: the last
+                week of the log)
+            baseline_weeks: Number of preceding weeks to average
+
+        Returns:
+            Student ids, largest drop first
+        """
+        trends = self.engagement_trends(week, baseline_weeks)
+        dropped = trends[trends['activity_change'] <= -threshold]
+        return dropped.sort_values('activity_change', kind='stable').index.tolist()
+
+    def cluster_students(self, n_clusters: int = 3, sample_size: int = None,
+                         random_state: int = 0, batch_size: int = 4096,
+                         as_frame: bool = False):
+        """Segment students with mini-batch k-means on their profiles.
+
+        The feature matrix (total_activities, average_grade,
+        activity_diversity, days_active) is built once per set of profiles
+        and min-max scaled; see clustering.py. Results are cached per set of
+        parameters until the profiles change.
+
+        Args:
+            n_clusters: Number of segments; 0 is the least engaged
+            sample_size: Fit on a random sample of this many students, then
+                assign everyone
+            random_state: Seed for reproducible clusters (None: random)
+            batch_size: Students per fitting and assignment batch
+            as_frame: Return the features with a cluster column
+
+        Returns:
+            Series of cluster numbers indexed by student_id (or DataFrame)
+        """
+        if not self.student_profiles:
+            self.profile_students()
+        features = self.cache.get(
+            'features', lambda: feature_matrix(self._current_profile_table()),
+            ('student_profiles',))
+        clusters = StudentClusters(n_clusters, batch_size=batch_size,
+                                   sample_size=sample_size,
+                                   random_state=random_state)
+        labels = self.cache.get(
+            f'clusters_{n_clusters}_{sample_size}_{random_state}_{batch_size}',
+            lambda: clusters.fit_predict(features),
+            ('features',),
+        )
+        return features.assign(cluster=labels) if as_frame else labels.copy()
+
+    @staticmethod
+    def _profiles_frame(profiles: Dict) -> pd.DataFrame:
+        """Build a profile table from a student_profiles dictionary."""
+        frame = pd.DataFrame.from_dict(profiles, orient='index')
+        return frame.reindex(columns=PROFILE_FIELDS)
+
+    def append(self, new_rows: pd.DataFrame) -> LogAggregator:
+        """Add new activity rows, e.g. one day's log, to the analysis.
+
+        The rows are folded into the running aggregates (self.aggregates; a
+        DataFrame loaded with load_data() is converted on the first call and
+        self.df is released). Results that were already computed are then
+        refreshed: profiles and recommendations only for the students in
+        new_rows, activity statistics from the per-activity aggregates. The
+        history is never rescanned. Refreshed profiles are returned in a new
+        dictionary, so an earlier profile_students() result is left as it
+        was.
+
+        Trend recommendations (generate_recommendations(trends=True)) need
+        the rows themselves: when they were generated, the new rows are
+        appended to self.df instead of releasing it, and the trends and
+        recommendations are recomputed from the whole log.
+
+        Args:
+            new_rows: Activity log rows with the usual columns
+
+        Returns:
+            The updated LogAggregator
+        """
+        # Results current before the append are refreshed afterwards
+        activity_stats = self.activity_stats
+        profiles = self.student_profiles
+        recommendations = self.recommendations
+        ranking = self.cache.peek('ranking')
+        with_trends = (isinstance(recommendations, Recommendations)
+                       and recommendations.rules == RULES + TREND_RULES)
+
+        if self.aggregates is None:
+            if self.df is None:
+                self.aggregates = LogAggregator()
             else:
-                recs.append("Maintain current level of engagement")
-                recs.append("Consider peer mentoring to help others")
+                self.aggregates = LogAggregator.from_frame(self.df)
+        elif not isinstance(self.aggregates, LogAggregator):
+            self.aggregates = self.aggregates.to_aggregator()
+
+        delta = self._validate_frame(new_rows.copy())
+        self.aggregates.add(delta)
+        self.df = concat_files([self.df, delta]) if with_trends else None
+        self.cache.invalidate()
+        students = delta['student_id'].unique()
+
+        if activity_stats:
+            self.analyze_activity_patterns()
+        if profiles:
+            refreshed = profiles_to_dict(self.aggregates.profile_table(students))
+            profiles = {**profiles, **refreshed}
+            self.student_profiles = profiles
+            if ranking is not None:
+                grades = [profile['average_grade'] for profile in refreshed.values()]
+                self.cache.put('ranking',
+                               ranking.updated(refreshed, grades, len(profiles)),
+                               ('student_profiles',))
+            if with_trends:
+                self.generate_recommendations(trends=True)
+            elif (isinstance(recommendations, Recommendations)
+                    and recommendations.rules == RULES):
+                self.recommendations = recommendations.updated(
+                    Recommendations.from_table(self._profiles_frame(refreshed)))
+            elif recommendations:
+                self.generate_recommendations()
+        return self.aggregates
+
+    def load_increment(self, filepath: str, compact: bool = False) -> LogAggregator:
+        """Read a new log file (e.g. today's export) and append() it.
+
+        Args:
+            filepath: Path to the new rows (.csv, .parquet or .feather)
+            compact: Use the compact typed layout while reading
+
+        Returns:
+            The updated LogAggregator
+        """
+        return self.append(read_log(filepath, compact=compact))
 
-            if profile['average_grade'] < 60:
-                recs.append("Focus on high-effectiveness activities")
-                recs.append("Seek help from instructors or tutoring services")
+    def save_aggregates(self, path: str) -> None:
+        """Persist the running aggregates so a later run can append to them.
+
+        Args:
+            path: Destination file
+        """
+        self._require_data()
+        if self.aggregates is None:
+            self.aggregates = LogAggregator.from_frame(self.df)
+        elif not isinstance(self.aggregates, LogAggregator):
+            self.aggregates = self.aggregates.to_aggregator()
+        self.aggregates.save(path)
 
-            if profile['activity_diversity'] < 3:
-                recs.append(f"Try different activities beyond {profile['preferred_activity']}")
+    def load_aggregates(self, path: str) -> LogAggregator:
+        """Restore aggregates saved by save_aggregates().
 
-            recommendations[student_id] = recs
+        Previously computed results are cleared; the analyzer works from the
+        aggregates as in streaming mode.
 
-        self.recommendations = recommendations
-        return recommendations
+        Args:
+            path: File written by save_aggregates()
+
+        Returns:
+            The restored LogAggregator
+        """
+        self.df = None
+        self.aggregates = LogAggregator.load(path)
+        self.cache.invalidate()
+        return self.aggregates
 
     def get_summary_report(self) -> Dict:
         """Generate a summary report of the analysis.
@@ -169,12 +909,14 @@ class LearningPathAnalyzer:
         Returns:
             Dictionary containing analysis summary
         """
-        if self.df is None:
-            raise ValueError("No data loaded. Call load_data() first.")
+        self._require_data()
 
-        total_students = len(self.df['student_id'].unique())
-        total_activities = len(self.df)
-        avg_class_grade = self.df['grade'].mean()
+        def totals():
+            if self.df is None:
+                return self.aggregates.student_count(), self.aggregates.total_rows
+            return len(self.df['student_id'].unique()), len(self.df)
+        total_students, total_activities = self.cache.get('totals', totals)
+        avg_class_grade = self._class_average()
 
         return {
             'total_students': total_students,
@@ -186,176 +928,167 @@ class LearningPathAnalyzer:
             'needs_support': self._get_struggling_students(5)
         }
 
-    def _get_top_performers(self, n: int = 5) -> List:
+    def _grade_ranking(self) -> GradeRanking:
+        """Return the ranking index, building it if the profiles changed."""
+        def compute():
+            if self.cache.derived_from('student_profiles', 'profile_table'):
+                return GradeRanking.from_table(self.cache.peek('profile_table'))
+            return GradeRanking.from_profiles(self.student_profiles)
+        return self.cache.get('ranking', compute, ('student_profiles',))
+
+    def _ranked(self, name: str, n: int, cohort) -> List:
+        """Return the n best ('top') or worst ('bottom') students."""
+        if not self.student_profiles:
+            return []
+        ranking = self._grade_ranking()
+        select = getattr(ranking, name)
+        if cohort is not None:
+            return select(n, cohort)
+        return list(self.cache.get(f'{name}_{n}', lambda: select(n), ('ranking',)))
+
+    def _get_top_performers(self, n: int = 5, cohort=None) -> List:
         """Get top performing students.
 
         Args:
             n: Number of students to return
+            cohort: Optional student ids to rank within
 
         Returns:
-            List of top performers with their scores
+            List of top performers with their scores; equal grades are
+            ordered by student_id
         """
-        if not self.student_profiles:
-            return []
-
-        sorted_students = sorted(
-            self.student_profiles.items(),
-            key=lambda x: x[1]['average_grade'],
-            reverse=True
-        )[:n]
-        return [(sid, p['average_grade']) for sid, p in sorted_students]
+        return self._ranked('top', n, cohort)
 
-    def _get_struggling_students(self, n: int = 5) -> List:
+    def _get_struggling_students(self, n: int = 5, cohort=None) -> List:
         """Get students who need support.
 
         Args:
             n: Number of students to return
+            cohort: Optional student ids to rank within
 
         Returns:
-            List of struggling students with their scores
+            List of struggling students with their scores; equal grades are
+            ordered by student_id
         """
-        if not self.student_profiles:
-            return []
+        return self._ranked('bottom', n, cohort)
 
-        sorted_students = sorted(
-            self.student_profiles.items(),
-            key=lambda x: x[1]['average_grade']
-        )[:n]
-        return [(sid, p['average_grade']) for sid, p in sorted_students]
+    def _chart_data(self, name: str) -> Dict:
+        """Collect the inputs of one chart from the analysis results.
 
-    def visualize_activity_distribution(self) -> str:
-        """Create histogram of activity distribution.
+        Args:
+            name: Chart name (see charts.CHARTS)
 
         Returns:
-            Path to saved visualization
+            Chart data dictionary
         """
+        if name == 'engagement_distribution':
+            if not self.student_profiles:
+                self.profile_students()
+
+            def count_levels():
+                engagement_counts = {'high': 0, 'medium': 0, 'low': 0}
+                for profile in self.student_profiles.values():
+                    engagement_counts[profile['engagement_level']] += 1
+                return engagement_counts
+            counts = self.cache.get('engagement_counts', count_levels,
+                                    ('student_profiles',))
+            return {'counts': dict(counts)}
+
+        if name == 'weekly_activity':
+            totals = self.timeline().weekly_totals()
+            return {
+                'weeks': [week.strftime('%Y-%m-%d') for week in totals.index],
+                'activities': totals['activities'].tolist(),
+                'active_students': totals['active_students'].tolist(),
+                'average_grade': [None if np.isnan(g) else round(float(g), 2)
+                                  for g in totals['average_grade']],
+            }
+
         if not self.activity_stats:
             self.analyze_activity_patterns()
-
         activities = list(self.activity_stats.keys())
-        counts = [self.activity_stats[a]['count'] for a in activities]
+        if name == 'activity_distribution':
+            return {
+                'activities': activities,
+                'counts': [int(self.activity_stats[a]['count']) for a in activities],
+            }
+        return {
+            'activities': activities,
+            'grades': [float(self.activity_stats[a]['avg_grade']) for a in activities],
+            'class_average': float(self._class_average()),
+        }
 
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bars = ax.bar(activities, counts, color='steelblue', edgecolor='navy', alpha=0.7)
-        
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{int(height)}',
-                   ha='center', va='bottom', fontweight='bold')
-        
-        ax.set_xlabel('Activity Type', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Number of Activities', fontsize=12, fontweight='bold')
-        ax.set_title('Distribution of Learning Activities', fontsize=14, fontweight='bold')
-        ax.grid(axis='y', alpha=0.3)
-        
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        
-        filepath = 'reports/activity_distribution.png'
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return filepath
+    def _visualize(self, names: List[str], **options) -> Dict[str, str]:
+        """Render the named charts into reports/ (see charts.render_charts())."""
+        charts = {name: self._chart_data(name) for name in names}
+        return render_charts(charts, output_dir='reports', **options)
 
-    def visualize_average_grades(self) -> str:
-        """Create bar chart of average grades by activity type.
+    def visualize_activity_distribution(self, **options) -> str:
+        """Create histogram of activity distribution.
+
+        Args:
+            **options: Render options of generate_all_visualizations()
 
         Returns:
             Path to saved visualization
         """
-        if not self.activity_stats:
-            self.analyze_activity_patterns()
+        paths = self._visualize(['activity_distribution'], **options)
+        return paths['activity_distribution']
 
-        activities = list(self.activity_stats.keys())
-        grades = [self.activity_stats[a]['avg_grade'] for a in activities]
+    def visualize_average_grades(self, **options) -> str:
+        """Create bar chart of average grades by activity type.
 
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bars = ax.bar(activities, grades, color='mediumseagreen', edgecolor='darkgreen', alpha=0.7)
-        
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{height:.1f}',
-                   ha='center', va='bottom', fontweight='bold')
-        
-        # Add a horizontal line for class average
-        class_avg = self.df['grade'].mean()
-        ax.axhline(y=class_avg, color='red', linestyle='--', linewidth=2, 
-                   label=f'Class Average: {class_avg:.1f}')
-        
-        ax.set_xlabel('Activity Type', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Average Grade', fontsize=12, fontweight='bold')
-        ax.set_title('Average Grade by Activity Type', fontsize=14, fontweight='bold')
-        ax.set_ylim(0, 100)
-        ax.grid(axis='y', alpha=0.3)
-        ax.legend(loc='upper right')
-        
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        
-        filepath = 'reports/average_grades.png'
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return filepath
+        Args:
+            **options: Render options of generate_all_visualizations()
+
+        Returns:
+            Path to saved visualization
+        """
+        return self._visualize(['average_grades'], **options)['average_grades']
 
-    def visualize_engagement_distribution(self) -> str:
+    def visualize_engagement_distribution(self, **options) -> str:
         """Create pie chart of student engagement levels.
 
+        Args:
+            **options: Render options of generate_all_visualizations()
+
         Returns:
             Path to saved visualization
         """
-        if not self.student_profiles:
-            self.profile_students()
+        paths = self._visualize(['engagement_distribution'], **options)
+        return paths['engagement_distribution']
 
-        engagement_counts = {'high': 0, 'medium': 0, 'low': 0}
-        for profile in self.student_profiles.values():
-            level = profile['engagement_level']
-            engagement_counts[level] += 1
+    def visualize_weekly_activity(self, **options) -> str:
+        """Create chart of weekly activities, active students and grades.
 
-        levels = list(engagement_counts.keys())
-        counts = list(engagement_counts.values())
-        colors = {'high': '#2ecc71', 'medium': '#f39c12', 'low': '#e74c3c'}
-        color_list = [colors[level] for level in levels]
+        Args:
+            **options: Render options of generate_all_visualizations()
 
-        fig, ax = plt.subplots(figsize=(10, 8))
-        wedges, texts, autotexts = ax.pie(counts, labels=levels, autopct='%1.1f%%',
-                                           colors=color_list, startangle=90,
-                                           textprops={'fontsize': 12, 'fontweight': 'bold'})
-        
-        # Enhance the percentage text
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontsize(11)
-            autotext.set_fontweight('bold')
-        
-        # Add count labels
-        legend_labels = [f'{level.capitalize()}: {counts[i]} students' 
-                        for i, level in enumerate(levels)]
-        ax.legend(legend_labels, loc='upper left', bbox_to_anchor=(0.85, 1))
-        
-        ax.set_title('Student Engagement Distribution', fontsize=14, fontweight='bold')
-        
-        plt.tight_layout()
-        
-        filepath = 'reports/engagement_distribution.png'
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return filepath
+        Returns:
+            Path to saved visualization
+        """
+        return self._visualize(['weekly_activity'], **options)['weekly_activity']
 
-    def generate_all_visualizations(self) -> Dict[str, str]:
+    def generate_all_visualizations(self, fmt: str = 'png', dpi: int = 300,
+                                    preview: bool = False, max_workers: int = None,
+                                    force: bool = False) -> Dict[str, str]:
         """Generate all visualizations.
 
+        Charts are rendered concurrently without pyplot, and a chart whose
+        data and options are unchanged since the last run is not rendered
+        again.
+
+        Args:
+            fmt: Output format, 'png' or 'svg'
+            dpi: Resolution for PNG output
+            preview: Fast low-resolution output for quick checks
+            max_workers: Number of rendering threads
+            force: Re-render even if nothing changed
+
         Returns:
             Dictionary with visualization file paths
         """
-        visualizations = {
-            'activity_distribution': self.visualize_activity_distribution(),
-            'average_grades': self.visualize_average_grades(),
-            'engagement_distribution': self.visualize_engagement_distribution()
-        }
-        return visualizations
+        return self._visualize(
+            ['activity_distribution', 'average_grades', 'engagement_distribution'],
+            fmt=fmt, dpi=dpi, preview=preview, max_workers=max_workers, force=force
+        )
@@ -0,0 +1,311 @@
+"""Execution backends for Learning Path Analyzer.
+
+- 'pandas' (default): the log is read into a DataFrame, or streamed through
+  a LogAggregator with chunksize (see aggregates.py).
+- 'duckdb': the log is copied once from the CSV/Parquet file into an
+  embedded DuckDB table (compressed and columnar, spilling to disk when its
+  memory limit is reached) instead of a DataFrame. Pair tables, group
+  sizes and active days are SQL aggregates; grades come back one chunk at
+  a time, sorted by group, to be summed exactly per group. Requires the
+  optional duckdb package.
+
+A backend exposes the same query interface as LogAggregator
+(profile_table(), activity_table(), class_average(), student_count(),
+total_rows). Profiles and activity statistics are built by the same
+functions and summations as the in-memory pandas path, so the results are
+identical.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .aggregates import (
+        build_activity_table, build_profile_table, chunked_grade_moments, LogAggregator,
+        LIMB_BITS, LIMB_COUNT
+    )
+    from .cleaning import check_columns
+    from .utils import COLUMNAR_FORMATS
+except ImportError:  # running as a script from src/ (see main.py)
+    from aggregates import (
+        build_activity_table, build_profile_table, chunked_grade_moments, LogAggregator,
+        LIMB_BITS, LIMB_COUNT
+    )
+    from cleaning import check_columns
+    from utils import COLUMNAR_FORMATS
+
+BACKENDS = ('pandas', 'duckdb')
+
+# DuckDB vectors (2048 rows each) per chunk of grades read back into numpy
+_VECTORS_PER_CHUNK = 256
+
+# The log is copied once into a table. DuckDB keeps insertion order, so
+# rowid is the row's position in the file: it orders students and
+# activities by first appearance and breaks preferred-activity ties.
+_LOAD = """
+CREATE TABLE log AS
+SELECT student_id, activity_type,
+       CAST("timestamp" AS TIMESTAMP) AS "timestamp",
+       CAST(grade AS DOUBLE) AS grade
+FROM {source}
+"""
+
+
+def _limb_sums(value: str, name: str) -> str:
+    """SQL summing value exactly, one column per limb as aggregates.grade_limbs().
+
+    Every step (truncating, subtracting the whole part, scaling by a power
+    of two) is exact in IEEE doubles, so the limbs equal numpy's.
+    """
+    fraction = f"abs({value})"
+    columns = []
+    for i in range(LIMB_COUNT):
+        limb = f"CAST(sign({value}) * trunc({fraction}) AS BIGINT)"
+        columns.append(f"coalesce(CAST(sum({limb}) AS BIGINT), 0) AS {name}_{i}")
+        fraction = f"({fraction} - trunc({fraction})) * {float(2 ** LIMB_BITS)!r}"
+    return ",\n       ".join(columns)
+
+
+_PAIRS = f"""
+SELECT student_id, activity_type,
+       count(*) AS "count",
+       {_limb_sums('grade', 'grade_sum')},
+       {_limb_sums('grade * grade', 'grade_sumsq')},
+       count(grade) AS grade_count,
+       min(rowid) AS first_row
+FROM log
+WHERE student_id IS NOT NULL
+GROUP BY student_id, activity_type
+ORDER BY first_row
+"""
+
+# Groups and their grades come back sorted by key, so each chunk of grades
+# covers consecutive groups
+_GROUPS = """
+SELECT {key}, count(*) AS size{columns}
+FROM log
+WHERE {key} IS NOT NULL
+GROUP BY {key}
+ORDER BY {key}
+"""
+
+_GROUP_GRADES = """
+SELECT grade FROM log WHERE {key} IS NOT NULL ORDER BY {key}, rowid
+"""
+
+_DAYS = """
+SELECT DISTINCT student_id, CAST(CAST("timestamp" AS DATE) AS TIMESTAMP) AS day
+FROM log
+"""
+
+
+def _duckdb():
+    """Return the duckdb module, or None if it is not installed."""
+    try:
+        import duckdb
+    except ImportError:
+        return None
+    return duckdb
+
+
+def _sql_string(value: str) -> str:
+    """Quote a value as an SQL string literal."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class DuckDBLog:
+    """An activity log loaded into an embedded DuckDB.
+
+    The file is copied once into a DuckDB table; every method then runs
+    queries over that table. Results the analyzer reuses are cached by its
+    ResultCache, the pair table and grade averages by this object.
+    """
+
+    def __init__(self, filepath: str, memory_limit: str = None, threads: int = None):
+        """Open a log file.
+
+        Args:
+            filepath: Path to a .csv, .parquet/.pq or .feather/.arrow file
+                (Feather goes through pyarrow)
+            memory_limit: Optional DuckDB memory limit, e.g. '4GB'; larger
+                tables and intermediate results spill to a temporary directory
+            threads: Optional number of DuckDB worker threads
+
+        Raises:
+            ImportError: If duckdb is not installed
+            FileNotFoundError: If the file does not exist
+            ValueError: If required columns are missing
+        """
+        duckdb = _duckdb()
+        if duckdb is None:
+            raise ImportError("The duckdb backend requires the duckdb package")
+        if not Path(filepath).exists():
+            raise FileNotFoundError(f"File not found: {filepath}")
+
+        self.filepath = str(filepath)
+        self.connection = duckdb.connect()
+        if memory_limit is not None:
+            self.connection.execute(f"SET memory_limit = {_sql_string(memory_limit)}")
+        if threads is not None:
+            self.connection.execute(f"SET threads = {int(threads)}")
+
+        file_format = COLUMNAR_FORMATS.get(Path(filepath).suffix.lower())
+        if file_format == 'parquet':
+            source = f"read_parquet({_sql_string(filepath)})"
+        elif file_format == 'feather':
+            import pyarrow.feather as feather
+            self.connection.register('source',
+                                     feather.read_table(filepath, memory_map=True))
+            source = 'source'
+        else:
+            source = f"read_csv({_sql_string(filepath)}, header = true)"
+
+        empty = self.connection.execute(f"SELECT * FROM {source} LIMIT 0").df()
+        columns = set(empty.columns)
+        check_columns(columns)
+        self.connection.execute("SET preserve_insertion_order = true")
+        self.connection.execute(_LOAD.format(source=source))
+        self._pairs = None
+        self._totals = None
+        self._students = None
+        self._activities = None
+        self._class_average = None
+
+    def _query(self, sql: str) -> pd.DataFrame:
+        """Run a query and return its result as a DataFrame."""
+        return self.connection.execute(sql).df()
+
+    def _grades(self, sql: str):
+        """Yield the grade column of a query in chunks, as float64 arrays."""
+        cursor = self.connection.cursor()
+        result = cursor.execute(sql)
+        while True:
+            chunk = result.fetch_df_chunk(_VECTORS_PER_CHUNK)
+            if chunk.empty:
+                break
+            yield chunk['grade'].to_numpy(dtype='float64', na_value=np.nan)
+        cursor.close()
+
+    def _group_moments(self, key: str, columns: str = '',
+                       variance: bool = False) -> pd.DataFrame:
+        """Grade moments per value of key, as aggregates.grade_moments().
+
+        Args:
+            key: 'student_id' or 'activity_type'
+            columns: Extra aggregate columns for the group query
+            variance: Also compute the sample variance
+
+        Returns:
+            DataFrame indexed by key with 'mean' (and 'variance') and the
+            extra columns
+        """
+        groups = self._query(_GROUPS.format(key=key, columns=columns)).set_index(key)
+        moments = chunked_grade_moments(
+            lambda: self._grades(_GROUP_GRADES.format(key=key)),
+            groups['size'].to_numpy(), variance=variance)
+        moments.index = groups.index
+        return moments.join(groups.drop(columns='size'))
+
+    def _summary(self):
+        """Return (students, rows), computed in one pass."""
+        if self._totals is None:
+            self._totals = self.connection.execute(
+                "SELECT count(DISTINCT student_id), count(*) FROM log"
+            ).fetchone()
+        return self._totals
+
+    @property
+    def total_rows(self) -> int:
+        """Number of rows in the log."""
+        return int(self._summary()[1])
+
+    def student_count(self) -> int:
+        """Return the number of distinct students."""
+        return int(self._summary()[0])
+
+    def class_average(self) -> float:
+        """Return the unrounded average grade over every graded row."""
+        if self._class_average is None:
+            moments = chunked_grade_moments(
+                lambda: self._grades("SELECT grade FROM log ORDER BY rowid"),
+                [self.total_rows])
+            self._class_average = float(moments['mean'].iloc[0])
+        return self._class_average
+
+    def pair_table(self) -> pd.DataFrame:
+        """Return the pair table (see aggregates.build_pair_table())."""
+        if self._pairs is None:
+            self._pairs = self._query(_PAIRS)
+        return self._pairs
+
+    def _student_stats(self) -> pd.DataFrame:
+        """Exact average grade and active days per student."""
+        if self._students is None:
+            self._students = self._group_moments(
+                'student_id',
+                ', count(DISTINCT CAST("timestamp" AS DATE)) AS days_active')
+        return self._students
+
+    def profile_table(self, students=None) -> pd.DataFrame:
+        """Return the per-student profile table.
+
+        Built like the in-memory path's: aggregates.build_profile_table()
+        over the pair table, with exact per-student averages.
+
+        Args:
+            students: Optional student ids to restrict the table to
+
+        Returns:
+            Profile table, see aggregates.build_profile_table()
+        """
+        pairs = self.pair_table()
+        if students is not None:
+            pairs = pairs[pairs['student_id'].isin(students)]
+        stats = self._student_stats()
+        return build_profile_table(pairs, stats['days_active'], stats['mean'])
+
+    def activity_table(self) -> pd.DataFrame:
+        """Return the per-activity statistics table.
+
+        Built like the in-memory path's: aggregates.build_activity_table()
+        over the pair table, with exact per-activity means and variances.
+        """
+        if self._activities is None:
+            self._activities = self._group_moments('activity_type', variance=True)
+        return build_activity_table(self.pair_table(), self._student_stats()['mean'],
+                                    self._activities)
+
+    def to_aggregator(self) -> LogAggregator:
+        """Materialize the log's pair and day tables as a LogAggregator.
+
+        Used when rows are appended to a log opened with this backend.
+        """
+        if not self.total_rows:
+            return LogAggregator()
+        return LogAggregator.from_tables(self.total_rows, self.pair_table().copy(),
+                                         self._query(_DAYS))
+
+    def close(self) -> None:
+        """Close the DuckDB connection."""
+        self.connection.close()
+
+
+def open_log(backend: str, filepath: str, **options):
+    """Open a log file with a non-default backend.
+
+    Args:
+        backend: Backend name (see BACKENDS), other than 'pandas'
+        filepath: Path to the log file
+        **options: Backend options, e.g. memory_limit for 'duckdb'
+
+    Returns:
+        Backend object with the LogAggregator query interface
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend == 'duckdb':
+        return DuckDBLog(filepath, **options)
+    raise ValueError(f"Unknown backend: {backend!r} (expected one of {BACKENDS})")
@@ -0,0 +1,293 @@
+"""Chart rendering for Learning Path Analyzer.
+
+Charts are drawn with matplotlib's object-oriented API on an Agg canvas, so
+no pyplot global state is involved and several charts can be rendered at
+once in a thread pool. Each chart is a pure function of a small data
+dictionary; a manifest in the output directory records a hash of the data
+and render options of every chart, and charts whose inputs have not changed
+since the last run are not rendered again.
+
+matplotlib and seaborn are imported on first use.
+"""
+
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict
+
+FORMATS = ('png', 'svg')
+PREVIEW_DPI = 60
+MANIFEST_NAME = '.render_manifest.json'
+
+_style_applied = False
+
+
+def apply_style() -> None:
+    """Set the chart style in matplotlib's rcParams, once.
+
+    rcParams are global, so this runs on the calling thread before any
+    chart is drawn; render_charts() calls it before starting its workers,
+    which then only read the style.
+    """
+    global _style_applied
+    if _style_applied:
+        return
+    import matplotlib
+    import seaborn as sns
+
+    matplotlib.rcParams.update(sns.axes_style("whitegrid"))
+    matplotlib.rcParams['font.size'] = 10
+    _style_applied = True
+
+
+def _new_figure(figsize):
+    """Create a Figure attached to its own Agg canvas."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figure = Figure(figsize=figsize)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _rotate_xticks(ax) -> None:
+    """Rotate category labels on the x axis."""
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)
+        label.set_horizontalalignment('right')
+
+
+def draw_activity_distribution(data: Dict):
+    """Draw the bar chart of activity counts.
+
+    Args:
+        data: Dictionary with 'activities' and 'counts' lists
+
+    Returns:
+        matplotlib Figure
+    """
+    figure = _new_figure((10, 6))
+    ax = figure.subplots()
+    bars = ax.bar(data['activities'], data['counts'], color='steelblue',
+                  edgecolor='navy', alpha=0.7)
+
+    # Add value labels on bars
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width() / 2., height, f'{int(height)}',
+                ha='center', va='bottom', fontweight='bold')
+
+    ax.set_xlabel('Activity Type', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Number of Activities', fontsize=12, fontweight='bold')
+    ax.set_title('Distribution of Learning Activities', fontsize=14, fontweight='bold')
+    ax.grid(axis='y', alpha=0.3)
+    _rotate_xticks(ax)
+    figure.tight_layout()
+    return figure
+
+
+def draw_average_grades(data: Dict):
+    """Draw the bar chart of average grade per activity type.
+
+    Args:
+        data: Dictionary with 'activities', 'grades' and 'class_average'
+
+    Returns:
+        matplotlib Figure
+    """
+    figure = _new_figure((10, 6))
+    ax = figure.subplots()
+    bars = ax.bar(data['activities'], data['grades'], color='mediumseagreen',
+                  edgecolor='darkgreen', alpha=0.7)
+
+    # Add value labels on bars
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width() / 2., height, f'{height:.1f}',
+                ha='center', va='bottom', fontweight='bold')
+
+    # Add a horizontal line for class average
+    class_avg = data['class_average']
+    ax.axhline(y=class_avg, color='red', linestyle='--', linewidth=2,
+               label=f'Class Average: {class_avg:.1f}')
+
+    ax.set_xlabel('Activity Type', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Average Grade', fontsize=12, fontweight='bold')
+    ax.set_title('Average Grade by Activity Type', fontsize=14, fontweight='bold')
+    ax.set_ylim(0, 100)
+    ax.grid(axis='y', alpha=0.3)
+    ax.legend(loc='upper right')
+    _rotate_xticks(ax)
+    figure.tight_layout()
+    return figure
+
+
+def draw_engagement_distribution(data: Dict):
+    """Draw the pie chart of student engagement levels.
+
+    Args:
+        data: Dictionary with 'counts' mapping engagement level to students
+
+    Returns:
+        matplotlib Figure
+    """
+    levels = list(data['counts'].keys())
+    counts = list(data['counts'].values())
+    colors = {'high': '#2ecc71', 'medium': '#f39c12', 'low': '#e74c3c'}
+    color_list = [colors[level] for level in levels]
+
+    figure = _new_figure((10, 8))
+    ax = figure.subplots()
+    wedges, texts, autotexts = ax.pie(counts, labels=levels, autopct='%1.1f%%',
+                                      colors=color_list, startangle=90,
+                                      textprops={'fontsize': 12, 'fontweight': 'bold'})
+
+    # Enhance the percentage text
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontsize(11)
+        autotext.set_fontweight('bold')
+
+    # Add count labels
+    legend_labels = [f'{level.capitalize()}: {counts[i]} students'
+                     for i, level in enumerate(levels)]
+    ax.legend(legend_labels, loc='upper left', bbox_to_anchor=(0.85, 1))
+    ax.set_title('Student Engagement Distribution', fontsize=14, fontweight='bold')
+    figure.tight_layout()
+    return figure
+
+
+def draw_weekly_activity(data: Dict):
+    """Draw weekly activity and active students, with the average grade.
+
+    Args:
+        data: Dictionary with 'weeks' labels and 'activities',
+            'active_students' and 'average_grade' lists (None for weeks
+            without grades)
+
+    Returns:
+        matplotlib Figure
+    """
+    figure = _new_figure((12, 6))
+    ax = figure.subplots()
+    positions = range(len(data['weeks']))
+    ax.bar(positions, data['activities'], color='steelblue', alpha=0.7,
+           label='Activities')
+    ax.plot(positions, data['active_students'], color='navy', marker='o',
+            label='Active students')
+    ax.set_xticks(list(positions))
+    ax.set_xticklabels(data['weeks'])
+    ax.set_xlabel('Week', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Count', fontsize=12, fontweight='bold')
+    ax.set_title('Weekly Engagement', fontsize=14, fontweight='bold')
+
+    grades = ax.twinx()
+    grades.plot(positions,
+                [float('nan') if g is None else g for g in data['average_grade']],
+                color='#e74c3c', marker='s', linestyle='--', label='Average grade')
+    grades.set_ylabel('Average Grade', fontsize=12, fontweight='bold')
+    grades.set_ylim(0, 100)
+    grades.grid(False)
+
+    handles, labels = ax.get_legend_handles_labels()
+    more_handles, more_labels = grades.get_legend_handles_labels()
+    ax.legend(handles + more_handles, labels + more_labels, loc='upper left')
+    _rotate_xticks(ax)
+    figure.tight_layout()
+    return figure
+
+
+CHARTS = {
+    'activity_distribution': draw_activity_distribution,
+    'average_grades': draw_average_grades,
+    'engagement_distribution': draw_engagement_distribution,
+    'weekly_activity': draw_weekly_activity,
+}
+
+
+def chart_fingerprint(data: Dict, fmt: str, dpi: int, preview: bool) -> str:
+    """Hash a chart's data and render options."""
+    payload = json.dumps({'data': data, 'fmt': fmt, 'dpi': dpi, 'preview': preview},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def render_chart(name: str, data: Dict, path: Path, fmt: str, dpi: int,
+                 preview: bool) -> str:
+    """Draw one chart and save it.
+
+    Safe to call from several threads at once; call apply_style() first
+    (render_charts() does).
+
+    Args:
+        name: Key of CHARTS
+        data: Chart data dictionary
+        path: Output file
+        fmt: 'png' or 'svg'
+        dpi: Resolution for raster output
+        preview: Save quickly at PREVIEW_DPI without tight bounding box
+
+    Returns:
+        Path of the saved file
+    """
+    figure = CHARTS[name](data)
+    if preview:
+        figure.savefig(path, format=fmt, dpi=PREVIEW_DPI)
+    else:
+        figure.savefig(path, format=fmt, dpi=dpi, bbox_inches='tight')
+    return str(path)
+
+
+def render_charts(charts: Dict[str, Dict], output_dir: str = 'reports',
+                  fmt: str = 'png', dpi: int = 300, preview: bool = False,
+                  max_workers: int = None, force: bool = False) -> Dict[str, str]:
+    """Render several charts concurrently, skipping unchanged ones.
+
+    Args:
+        charts: Mapping of chart name (key of CHARTS) to its data dictionary
+        output_dir: Directory for the chart files and render manifest
+        fmt: 'png' or 'svg'
+        dpi: Resolution for raster output
+        preview: Fast low-resolution output (see render_chart())
+        max_workers: Rendering threads (default: one per chart)
+        force: Render even if the inputs are unchanged
+
+    Returns:
+        Dictionary with chart file paths
+
+    Raises:
+        ValueError: If fmt is not supported
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported chart format: {fmt}")
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    manifest_path = output / MANIFEST_NAME
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        manifest = {}
+
+    paths = {}
+    pending = {}
+    for name, data in charts.items():
+        path = output / f'{name}.{fmt}'
+        fingerprint = chart_fingerprint(data, fmt, dpi, preview)
+        paths[name] = str(path)
+        if force or manifest.get(str(path)) != fingerprint or not path.exists():
+            pending[name] = (path, fingerprint)
+
+    if pending:
+        apply_style()
+        with ThreadPoolExecutor(max_workers=max_workers or len(pending)) as pool:
+            futures = {
+                name: pool.submit(render_chart, name, charts[name], path, fmt,
+                                  dpi, preview)
+                for name, (path, _) in pending.items()
+            }
+            for name, future in futures.items():
+                future.result()
+                manifest[str(pending[name][0])] = pending[name][1]
+        manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return paths
@@ -0,0 +1,485 @@
+"""Vectorized validation and cleaning of LMS log chunks.
+
+LogCleaner runs inside the loading scan: load_data(..., clean=True) passes
+every chunk (or the whole frame) through clean() before it is aggregated or
+kept. Each check is a column-wide mask, so a chunk costs a few passes over
+its columns rather than a loop over rows. Rows are dropped for the first
+issue they have, in this order:
+
+- missing_id: no student_id
+- missing_activity: no activity_type
+- bad_timestamp: missing or unparseable timestamp
+- bad_grade: a grade that is not a number or lies outside grade_range
+  (a missing grade is allowed; it marks an ungraded activity)
+- duplicate: same (student_id, activity_type, timestamp) as an earlier row
+
+Dropped rows can be written to a quarantine CSV with their original values
+and an `issue` column. Duplicates are found across chunks, and exactly:
+the key of every kept row is stored as its timestamp and the chunk-local
+codes of its ids (16 bytes), and new keys are searched by a 64-bit hash.
+The stored keys are kept as a few runs sorted by hash, each entry packing
+the top 32 hash bits with a reference to the key (8 bytes), and the runs
+are merged like a binary counter, so each chunk costs one sort of its own
+hashes rather than a re-sort of everything seen. A bitmap over the top
+hash bits (1 to 4 bytes per key) rules most new keys out before any run
+is searched. A row is only dropped once the stored key equals its own, so
+two different keys with the same hash cost a comparison, never a row.
+
+Arrow-backed timestamp strings are parsed by pyarrow, which is about twice
+as fast as pd.to_datetime(); see parse_timestamps(). The plain load path
+parses with the same function, so cleaning costs only its checks.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+try:
+    from .utils import COMPACT_DTYPES
+except ImportError:  # running as a script from src/ (see main.py)
+    from utils import COMPACT_DTYPES
+
+REQUIRED_COLUMNS = ('student_id', 'activity_type', 'timestamp', 'grade')
+
+ID_COLUMNS = ('student_id', 'activity_type')
+
+ISSUES = ('missing_id', 'missing_activity', 'bad_timestamp', 'bad_grade', 'duplicate')
+
+
+# Non-null values tried when guessing the timestamp format of a chunk
+_FORMAT_SAMPLE = 20
+
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+# Stored keys are packed into one uint64: the top 32 bits of their hash and
+# a 32-bit reference to the key itself (so up to 2**32 rows per load)
+_REF_BITS = np.uint64(0xFFFFFFFF)
+_HASH_BITS = ~_REF_BITS
+
+# The filter of stored hashes is regrown, to four times as many bits per
+# stored key, once it has fewer than this many (at most 2**32 bits in all)
+_FILTER_BITS_PER_KEY = 8
+
+
+def check_columns(columns: Iterable) -> None:
+    """Raise if any required column is missing.
+
+    Args:
+        columns: Column names of a log
+
+    Raises:
+        ValueError: Naming only the missing columns
+    """
+    missing = [col for col in REQUIRED_COLUMNS if col not in set(columns)]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+
+def parse_timestamps(values: pd.Series, errors: str = 'coerce') -> pd.Series:
+    """Parse timestamps, turning unparseable values into NaT.
+
+    The format is guessed once from the first parseable values, so the
+    column is parsed in one vectorized pass instead of value by value.
+    Values that do not match the guessed format (e.g. a log mixing
+    '2024-01-05 10:00' and '01/05/2024 10:00') are parsed again one by one,
+    so only values no format fits become NaT. Both load_data() paths use
+    this parser: the plain one with errors='raise', cleaning with 'coerce'.
+
+    Args:
+        values: Timestamp column (strings or datetimes)
+        errors: 'coerce' turns unparseable values into NaT, 'raise' raises
+
+    Returns:
+        datetime64 Series aligned with values
+
+    Raises:
+        ValueError: If errors='raise' and a value cannot be parsed
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    fmt = None
+    for value in values.dropna().head(_FORMAT_SAMPLE):
+        fmt = guess_datetime_format(str(value))
+        if fmt is not None:
+            break
+    if fmt is None:
+        parsed = pd.to_datetime(values, errors='coerce', format='mixed')
+    else:
+        parsed = _arrow_parse(values, fmt)
+        if parsed is None:
+            parsed = pd.to_datetime(values, errors='coerce', format=_pandas_format(fmt))
+        parsed = _parse_other_formats(values, parsed)
+    if errors == 'raise':
+        failed = parsed.isna() & values.notna()
+        if failed.any():
+            # Raises pandas' error for the first unparseable value; null
+            # strings such as '' or 'NaT' parse to NaT
+            retried = pd.to_datetime(values[failed], format='mixed')
+            if retried.notna().any():
+                raise ValueError("Timestamps mix time-zone-aware and naive values")
+    return parsed
+
+
+def _parse_other_formats(values: pd.Series, parsed: pd.Series) -> pd.Series:
+    """Parse the values that failed the guessed format, each with its own format."""
+    failed = parsed.isna() & values.notna()
+    if not failed.any():
+        return parsed
+    retried = pd.to_datetime(values[failed], errors='coerce', format='mixed')
+    if retried.dtype.kind != 'M' or getattr(retried.dtype, 'tz', None) is not None:
+        return parsed  # time-zone-aware values are left to the errors check
+    if parsed.dtype.kind != 'M':
+        return pd.to_datetime(values, errors='coerce', format='mixed')
+    # Keep the finer unit of the two, so no fractional seconds are lost
+    unit = np.promote_types(parsed.dtype, retried.dtype)
+    parsed = parsed.astype(unit)
+    parsed[failed] = retried.astype(unit)
+    return parsed
+
+
+def _pandas_format(fmt: str) -> str:
+    """Format passed to pd.to_datetime() for a guessed format."""
+    # ISO 8601 values may mix dates, times and fractional seconds
+    return 'ISO8601' if fmt.startswith('%Y-%m-%d') else fmt
+
+
+def _arrow_parse(values: pd.Series, fmt: str):
+    """Parse Arrow-backed strings with pyarrow, or return None if it does not apply.
+
+    pyarrow parses the strings in place, where pandas converts them to
+    Python objects first: casting ISO 8601 values is several times as fast
+    as pd.to_datetime(), strptime about twice. Values pyarrow rejects are
+    parsed again by pandas, so the result matches pd.to_datetime(); time
+    zones are left to pandas altogether.
+    """
+    arrow = getattr(values.dtype, 'storage', None) == 'pyarrow'
+    if not arrow or '%z' in fmt or '%Z' in fmt:
+        return None
+    import pyarrow as pa  # backs the column, so it is installed
+    import pyarrow.compute as pc
+
+    # Use the unit pandas parses strings to
+    sample = pd.to_datetime(values.head(_FORMAT_SAMPLE), errors='coerce',
+                            format=_pandas_format(fmt))
+    if sample.dtype.kind != 'M':
+        return None
+    unit = np.datetime_data(sample.dtype)[0]
+    strings = pa.array(values.array)
+    parsed = None
+    if fmt.startswith('%Y-%m-%d'):
+        try:
+            parsed = pc.cast(strings, pa.timestamp(unit))
+        except pa.ArrowInvalid:
+            pass  # some value is not strict ISO 8601 (or is invalid)
+    if parsed is None:
+        if '%f' in fmt:
+            return None
+        parsed = pc.strptime(strings, format=fmt, unit=unit, error_is_null=True)
+    result = pd.Series(parsed.to_numpy(zero_copy_only=False), index=values.index,
+                       name=values.name)
+    failed = result.isna() & values.notna()
+    if failed.any():
+        retried = pd.to_datetime(values[failed], errors='coerce',
+                                 format=_pandas_format(fmt))
+        if retried.dtype != result.dtype:
+            return None
+        result[failed] = retried
+    return result
+
+
+def key_hashes(stamps: np.ndarray, *factorized) -> np.ndarray:
+    """Hash each row's (timestamp, student_id, activity_type) key to 64 bits.
+
+    Each distinct id is hashed once; hashes depend only on the values, so
+    they match across chunks. Equal hashes are only a hint: LogCleaner
+    confirms them by comparing the keys.
+
+    Args:
+        stamps: int64 nanosecond timestamps
+        *factorized: (codes, uniques) of each id column, from pd.factorize()
+
+    Returns:
+        uint64 array, one hash per row
+    """
+    # Multiplicative (Fibonacci) hashing spreads the timestamps over the top bits
+    hashes = stamps.view('uint64') * _HASH_MULTIPLIER
+    for codes, uniques in factorized:
+        value_hashes = pd.util.hash_array(np.asarray(uniques, dtype=object),
+                                          categorize=False)
+        hashes = hashes * _HASH_MULTIPLIER ^ value_hashes[codes]
+    return hashes
+
+
+def _sort_hashes(hashes: np.ndarray) -> tuple:
+    """Sort the top 32 bits of key hashes.
+
+    The row number is packed into the low bits, so a sort rather than an
+    argsort orders the chunk, and rows with equal hashes stay in row order.
+
+    Returns:
+        (row order, sorted hashes with the low bits cleared)
+    """
+    packed = np.sort(hashes & _HASH_BITS | np.arange(len(hashes), dtype='uint64'))
+    return (packed & _REF_BITS).astype('intp'), packed & _HASH_BITS
+
+
+def _kept_categorical(codes: np.ndarray, uniques, kept: np.ndarray) -> pd.Categorical:
+    """Categorical of a factorized column, with the categories of the kept rows only.
+
+    Cheaper than filtering and calling remove_unused_categories(), which
+    sorts the codes to find the used ones.
+    """
+    used = np.bincount(codes[kept], minlength=len(uniques)) > 0
+    if not used.all():
+        codes = np.where(kept, (np.cumsum(used) - 1)[codes], -1)
+        uniques = uniques[used]
+    return pd.Categorical.from_codes(codes, uniques)
+
+
+class LogCleaner:
+    """Validates and cleans a log chunk by chunk, keeping running counts."""
+
+    def __init__(self, quarantine: str = None, dedupe: bool = True,
+                 grade_range: tuple = (0, 100), compact: bool = False):
+        """Configure the checks.
+
+        Args:
+            quarantine: Optional CSV file receiving the dropped rows, with
+                an issue column; it is rewritten by the first clean() call
+            dedupe: Drop repeated (student_id, activity_type, timestamp) rows
+            grade_range: Inclusive (min, max) of valid grades
+            compact: Return chunks in the compact typed layout (see
+                utils.COMPACT_DTYPES)
+        """
+        self.quarantine = Path(quarantine) if quarantine is not None else None
+        self.dedupe = dedupe
+        self.grade_range = grade_range
+        self.compact = compact
+        self.counts = dict.fromkeys(('rows', 'kept') + ISSUES, 0)
+        # Keys of the kept rows, per chunk: (timestamps, {column: (codes, uniques)})
+        self._stored = []
+        self._offsets = np.zeros(0, dtype='int64')  # first ref of each chunk
+        self._runs = []  # sorted, packed hashes and refs of the stored keys
+        self._filter = np.zeros(0, dtype='uint8')  # see _may_be_stored()
+        self._filter_bits = 0
+        self._started = False
+
+    def clean(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Validate one chunk and return its good rows.
+
+        Args:
+            df: Log chunk as read (raw strings are fine)
+
+        Returns:
+            Cleaned chunk with datetime timestamps and float grades
+
+        Raises:
+            ValueError: If required columns are missing
+        """
+        check_columns(df.columns)
+        # Factorized once: for the null check, the row hashes and the
+        # categorical columns of the compact layout
+        ids = {col: pd.factorize(df[col]) for col in ID_COLUMNS}
+        timestamps = parse_timestamps(df['timestamp'])
+        grades = df['grade']
+        if not pd.api.types.is_numeric_dtype(grades):
+            grades = pd.to_numeric(grades, errors='coerce')
+        low, high = self.grade_range
+
+        issue = np.full(len(df), -1, dtype='int8')
+        checks = [
+            ids['student_id'][0] < 0,
+            ids['activity_type'][0] < 0,
+            timestamps.isna().to_numpy(),
+            ((grades.isna() & df['grade'].notna())
+             | (grades < low) | (grades > high)).to_numpy(),
+        ]
+        for code, mask in reversed(list(enumerate(checks))):
+            issue[mask] = code
+
+        valid = issue < 0
+        if self.dedupe and valid.any():
+            rows = np.flatnonzero(valid)
+            stamps = timestamps.to_numpy(dtype='datetime64[ns]')[rows].view('int64')
+            keys = {col: (codes[rows], uniques)
+                    for col, (codes, uniques) in ids.items()}
+            hashes = key_hashes(stamps, *keys.values())
+            repeated = self._duplicates(hashes, stamps, keys)
+            issue[rows[repeated]] = ISSUES.index('duplicate')
+            valid[rows[repeated]] = False
+
+        self.counts['rows'] += len(df)
+        self.counts['kept'] += int(valid.sum())
+        if not valid.all():
+            dropped = np.bincount(issue[~valid], minlength=len(ISSUES))
+            for code, count in enumerate(dropped):
+                self.counts[ISSUES[code]] += int(count)
+        self._write_quarantine(df, issue, valid)
+
+        columns = {'timestamp': timestamps, 'grade': grades}
+        if self.compact:
+            columns.update({col: _kept_categorical(codes, uniques, valid)
+                            for col, (codes, uniques) in ids.items()})
+            columns['grade'] = grades.astype(COMPACT_DTYPES['grade'])
+        cleaned = df.assign(**columns)
+        return cleaned if valid.all() else cleaned[valid]
+
+    def _duplicates(self, hashes: np.ndarray, stamps: np.ndarray,
+                    keys: dict) -> np.ndarray:
+        """Mark rows whose key was seen earlier in this chunk or a previous one.
+
+        Args:
+            hashes: Key hash of each row
+            stamps: int64 timestamp of each row
+            keys: {column: (codes, uniques)} of the id columns of the rows
+        """
+        order, ordered = _sort_hashes(hashes)
+        repeated = np.zeros(len(ordered), dtype=bool)
+        same = ordered[1:] == ordered[:-1]
+        if same.any():
+            # Sort each group of equal hashes by key, then row, so that equal
+            # keys are adjacent and the first occurrence is the one kept
+            tied = np.zeros(len(ordered), dtype=bool)
+            tied[1:] |= same
+            tied[:-1] |= same
+            slots = np.flatnonzero(tied)
+            rows = order[slots]
+            codes = [keys[col][0][rows] for col in ID_COLUMNS]
+            rows = rows[np.lexsort((rows, stamps[rows], *codes, ordered[slots]))]
+            order[slots] = rows
+            equal = ((ordered[slots[1:]] == ordered[slots[:-1]])
+                     & (stamps[rows[1:]] == stamps[rows[:-1]]))
+            for col in ID_COLUMNS:
+                equal &= keys[col][0][rows[1:]] == keys[col][0][rows[:-1]]
+            repeated[slots[1:]] = equal
+        candidates = np.flatnonzero(self._may_be_stored(ordered))
+        for run in self._runs:
+            repeated[candidates] |= self._stored_in(
+                run, ordered[candidates], order[candidates], stamps, keys)
+        first = ~repeated
+        self._store(ordered[first], order[first], stamps, keys)
+        result = np.empty(len(repeated), dtype=bool)
+        result[order] = repeated
+        return result
+
+    def _stored_in(self, run: np.ndarray, hashes: np.ndarray, rows: np.ndarray,
+                   stamps: np.ndarray, keys: dict) -> np.ndarray:
+        """Whether the key of each row (sorted by hash) is stored in a run."""
+        positions = np.searchsorted(run, hashes)
+        stored = np.zeros(len(hashes), dtype=bool)
+        # Each candidate steps through the stored keys with its hash: one,
+        # unless two different keys collided
+        pending = np.flatnonzero(positions < len(run))
+        while len(pending):
+            entries = run[positions[pending]]
+            hit = (entries & _HASH_BITS) == hashes[pending]
+            pending, entries = pending[hit], entries[hit]
+            refs = (entries & _REF_BITS).astype('int64')
+            found = self._same_keys(refs, rows[pending], stamps, keys)
+            stored[pending[found]] = True
+            pending = pending[~found]
+            positions[pending] += 1
+            pending = pending[positions[pending] < len(run)]
+        return stored
+
+    def _same_keys(self, refs: np.ndarray, rows: np.ndarray, stamps: np.ndarray,
+                   keys: dict) -> np.ndarray:
+        """Whether stored keys equal the keys of rows of the current chunk."""
+        chunks = np.searchsorted(self._offsets, refs, side='right') - 1
+        same = np.zeros(len(refs), dtype=bool)
+        for chunk in np.unique(chunks).tolist():
+            picked = np.flatnonzero(chunks == chunk)
+            stored_stamps, stored_keys = self._stored[chunk]
+            at = refs[picked] - self._offsets[chunk]
+            current = rows[picked]
+            equal = stored_stamps[at] == stamps[current]
+            for col in ID_COLUMNS:
+                codes, uniques = keys[col]
+                stored_codes, stored_uniques = stored_keys[col]
+                stored_values = stored_uniques.take(stored_codes[at])
+                values = uniques.take(codes[current])
+                equal &= (np.asarray(stored_values, dtype=object)
+                          == np.asarray(values, dtype=object))
+            same[picked] = equal
+        return same
+
+    def _store(self, hashes: np.ndarray, rows: np.ndarray, stamps: np.ndarray,
+               keys: dict) -> None:
+        """Store the chunk's keys and add the new rows, in hash order, as a run."""
+        if not len(rows):
+            return
+        first = self._offsets[-1] + len(self._stored[-1][0]) if self._stored else 0
+        # Kept in row order, so a row's ref is just first + row
+        self._stored.append((stamps, {col: (codes.astype('int32'), uniques)
+                                      for col, (codes, uniques) in keys.items()}))
+        self._offsets = np.append(self._offsets, first)
+        run = hashes | (first + rows).astype('uint64')
+        self._add_run(run)
+        self._update_filter(run)
+
+    def _add_run(self, run: np.ndarray) -> None:
+        """Store new sorted keys, merging runs like a binary counter.
+
+        A run is merged once the run after it has grown as large, so there
+        are O(log chunks) runs and each key is merged O(log chunks) times.
+        """
+        self._runs.append(run)
+        while len(self._runs) > 1 and len(self._runs[-2]) <= len(self._runs[-1]):
+            merged = np.concatenate((self._runs.pop(-2), self._runs.pop()))
+            # Two sorted runs: the stable sort (timsort) merges them in linear time
+            merged.sort(kind='stable')
+            self._runs.append(merged)
+
+    def _may_be_stored(self, hashes: np.ndarray) -> np.ndarray:
+        """Whether a stored key may have each hash, from a bitmap of their top bits.
+
+        The bitmap has one bit per value of the top _filter_bits hash bits,
+        set for every stored key, so most new keys are ruled out without
+        searching the runs.
+        """
+        if not self._filter_bits:
+            return np.zeros(len(hashes), dtype=bool)
+        slots = hashes >> np.uint64(64 - self._filter_bits)
+        bits = self._filter[(slots >> 3).astype('intp')] >> (slots & 7).astype('uint8')
+        return (bits & 1).astype(bool)
+
+    def _update_filter(self, run: np.ndarray) -> None:
+        """Set the filter bits of newly stored keys, regrowing the filter if needed."""
+        stored = sum(len(stored_run) for stored_run in self._runs)
+        runs = [run]
+        full = stored * _FILTER_BITS_PER_KEY > len(self._filter) * 8
+        if full and self._filter_bits < 32:
+            bits = (4 * _FILTER_BITS_PER_KEY * stored).bit_length()
+            self._filter_bits = min(bits, 32)
+            self._filter = np.zeros(2 ** self._filter_bits // 8, dtype='uint8')
+            runs = self._runs
+        for stored_run in runs:
+            slots = stored_run >> np.uint64(64 - self._filter_bits)
+            masks = np.left_shift(1, (slots & 7).astype('uint8'), dtype='uint8')
+            np.bitwise_or.at(self._filter, (slots >> 3).astype('intp'), masks)
+
+    def _write_quarantine(self, df: pd.DataFrame, issue: np.ndarray,
+                          valid: np.ndarray) -> None:
+        """Append the dropped rows, as read, to the quarantine file."""
+        if self.quarantine is None:
+            return
+        labels = np.asarray(ISSUES, dtype=object)[issue[~valid]]
+        dropped = df[~valid].assign(issue=labels)
+        dropped.to_csv(self.quarantine, mode='a' if self._started else 'w',
+                       header=not self._started, index=False)
+        self._started = True
+
+    def report(self) -> Dict:
+        """Return the row counts so far.
+
+        Returns:
+            Dictionary with rows, kept, one count per issue, dropped and
+            the quarantine path (None if not written)
+        """
+        report = dict(self.counts)
+        report['dropped'] = report['rows'] - report['kept']
+        report['quarantine'] = str(self.quarantine) if self._started else None
+        return report
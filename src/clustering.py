@@ -0,0 +1,144 @@
+"""Student segmentation with mini-batch k-means.
+
+The numeric profile columns are turned into a feature matrix once, scaled
+to 0..1 with MinMaxScaler and clustered with MiniBatchKMeans. Both are fed
+in batches of `batch_size` students (partial_fit), so memory during fitting
+does not grow with the number of students. Alternatively the model is fit
+on a random sample and every student is then assigned in a vectorized,
+batched predict pass.
+
+With a fixed random_state, sampling, batch order and the k-means
+initialization are reproducible. Clusters are numbered by the mean of
+their scaled center, so cluster 0 is always the least engaged segment.
+
+scikit-learn is imported on first use.
+"""
+
+import numpy as np
+import pandas as pd
+
+FEATURES = ['total_activities', 'average_grade', 'activity_diversity', 'days_active']
+
+
+def feature_matrix(profile_table: pd.DataFrame) -> pd.DataFrame:
+    """Build the numeric feature matrix from a profile table.
+
+    Students without any grade get the mean average grade.
+
+    Args:
+        profile_table: Profile table indexed by student_id (see
+            aggregates.build_profile_table())
+
+    Returns:
+        float64 DataFrame with the FEATURES columns, same index
+    """
+    features = profile_table[FEATURES].astype('float64')
+    return features.fillna(features.mean()).fillna(0.0)
+
+
+class StudentClusters:
+    """Mini-batch k-means over student features."""
+
+    def __init__(self, n_clusters: int = 3, batch_size: int = 4096,
+                 sample_size: int = None, epochs: int = 3, random_state: int = 0):
+        """Configure the clustering.
+
+        Args:
+            n_clusters: Number of segments
+            batch_size: Students per partial_fit / predict batch
+            sample_size: Fit on a random sample of this many students
+                instead of streaming over all of them
+            epochs: Passes over the data when streaming
+            random_state: Seed for sampling, batch order and k-means
+                (None for non-reproducible runs)
+        """
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.sample_size = sample_size
+        self.epochs = epochs
+        self.random_state = random_state
+        self.scaler = None
+        self.model = None
+        self._order = None
+
+    def _batches(self, n: int):
+        """Slices of at most batch_size rows covering range(n)."""
+        for start in range(0, n, self.batch_size):
+            yield slice(start, min(start + self.batch_size, n))
+
+    def fit(self, features: pd.DataFrame) -> 'StudentClusters':
+        """Fit the scaler and k-means.
+
+        Args:
+            features: Output of feature_matrix()
+
+        Returns:
+            This object
+
+        Raises:
+            ValueError: If there are fewer students than clusters
+        """
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.preprocessing import MinMaxScaler
+
+        values = features.to_numpy(dtype='float64')
+        if len(values) < self.n_clusters:
+            raise ValueError(f"Need at least {self.n_clusters} students "
+                             f"to form {self.n_clusters} clusters")
+        rng = np.random.default_rng(self.random_state)
+        if self.sample_size is not None and self.sample_size < len(values):
+            values = values[np.sort(rng.choice(len(values), self.sample_size,
+                                               replace=False))]
+
+        self.scaler = MinMaxScaler()
+        for rows in self._batches(len(values)):
+            self.scaler.partial_fit(values[rows])
+
+        self.model = MiniBatchKMeans(n_clusters=self.n_clusters,
+                                     batch_size=self.batch_size,
+                                     random_state=self.random_state, n_init=3)
+        if len(values) <= self.batch_size:
+            self.model.fit(self.scaler.transform(values))
+        else:
+            for _ in range(self.epochs):
+                order = rng.permutation(len(values))
+                for rows in self._batches(len(values)):
+                    batch = values[order[rows]]
+                    if len(batch) >= self.n_clusters:
+                        self.model.partial_fit(self.scaler.transform(batch))
+
+        # Number clusters from least to most engaged
+        rank = np.argsort(self.model.cluster_centers_.mean(axis=1), kind='stable')
+        self._order = np.empty(self.n_clusters, dtype='int64')
+        self._order[rank] = np.arange(self.n_clusters)
+        return self
+
+    def predict(self, features: pd.DataFrame) -> pd.Series:
+        """Assign students to the fitted clusters, batch by batch.
+
+        Args:
+            features: Output of feature_matrix()
+
+        Returns:
+            int64 Series of cluster numbers named 'cluster', same index
+        """
+        if self.model is None:
+            raise ValueError("Clusters are not fitted. Call fit() first.")
+        values = features.to_numpy(dtype='float64')
+        labels = np.empty(len(values), dtype='int64')
+        for rows in self._batches(len(values)):
+            labels[rows] = self.model.predict(self.scaler.transform(values[rows]))
+        return pd.Series(self._order[labels], index=features.index, name='cluster')
+
+    def fit_predict(self, features: pd.DataFrame) -> pd.Series:
+        """Fit, then assign every student."""
+        return self.fit(features).predict(features)
+
+    def centers(self) -> pd.DataFrame:
+        """Return the cluster centers in feature units, one row per cluster."""
+        if self.model is None:
+            raise ValueError("Clusters are not fitted. Call fit() first.")
+        centers = np.empty_like(self.model.cluster_centers_)
+        centers[self._order] = self.scaler.inverse_transform(
+            self.model.cluster_centers_)
+        return pd.DataFrame(centers, columns=FEATURES).rename_axis('cluster')
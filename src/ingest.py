@@ -0,0 +1,168 @@
+"""Concurrent ingestion of many log files (e.g. one CSV per course per day).
+
+Files are discovered from a directory (recursively) or a glob pattern and
+parsed by a thread or process pool. At most `max_pending` parsed files are
+held at any time: a file is only submitted once an earlier one has been
+handed to the consumer, so memory stays capped however many files there
+are. Files are yielded in discovery order, so the combined log has the
+same row order as reading the files one after the other.
+
+Each file's rows are tagged with a `course` column. By default the course
+is the name of the file's top-level directory below the root, or the file
+name up to the first '_' (e.g. 'CS101_2024-03-01.csv') for files directly
+in the root.
+"""
+
+import glob
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator, List, Tuple
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+try:
+    from .utils import COLUMNAR_FORMATS, read_log
+except ImportError:  # running as a script from src/ (see main.py)
+    from utils import COLUMNAR_FORMATS, read_log
+
+LOG_SUFFIXES = ('.csv',) + tuple(COLUMNAR_FORMATS)
+
+GLOB_CHARACTERS = '*?['
+
+
+def is_multi_file(source) -> bool:
+    """Whether a load_data() source names several files (directory or glob)."""
+    return Path(source).is_dir() or any(ch in str(source) for ch in GLOB_CHARACTERS)
+
+
+def discover(source) -> Tuple[Path, List[Path]]:
+    """Find the log files under a directory or matching a glob pattern.
+
+    Args:
+        source: Directory (searched recursively for .csv, .parquet/.pq and
+            .feather/.arrow files) or glob pattern ('**' is recursive)
+
+    Returns:
+        (root, sorted file paths); root is the directory course names are
+        taken relative to
+
+    Raises:
+        FileNotFoundError: If nothing matches
+    """
+    source = Path(source)
+    if source.is_dir():
+        root = source
+        paths = [path for path in source.rglob('*')
+                 if path.suffix.lower() in LOG_SUFFIXES and path.is_file()]
+    else:
+        # The root is the part of the pattern before the first wildcard
+        parts = source.parts
+        fixed = next(i for i, part in enumerate(parts)
+                     if any(ch in part for ch in GLOB_CHARACTERS))
+        root = Path(*parts[:fixed]) if fixed else Path('.')
+        paths = [Path(path) for path in glob.glob(str(source), recursive=True)
+                 if Path(path).is_file()]
+    if not paths:
+        raise FileNotFoundError(f"No log files found: {source}")
+    return root, sorted(paths)
+
+
+def course_name(path: Path, root: Path) -> str:
+    """Default course of a file (see the module docstring)."""
+    path = Path(path)
+    relative = path.relative_to(root) if path.is_relative_to(root) else Path(path.name)
+    if len(relative.parts) > 1:
+        return relative.parts[0]
+    return relative.stem.split('_')[0]
+
+
+def read_course_file(path: Path, course: str, compact: bool = False,
+                     validate: Callable = None) -> pd.DataFrame:
+    """Read one file, validate it and add the course column.
+
+    Args:
+        path: Log file
+        course: Value of the course column
+        compact: Use the compact typed layout
+        validate: Optional function applied to the frame (e.g. the
+            analyzer's validation), run inside the worker
+
+    Returns:
+        DataFrame with a course column
+    """
+    df = read_log(str(path), compact=compact)
+    if validate is not None:
+        df = validate(df)
+    df['course'] = course
+    return df
+
+
+def iter_files(source, course: Callable = None, workers: int = None,
+               executor: str = 'thread', max_pending: int = None, compact: bool = False,
+               validate: Callable = None) -> Iterator[pd.DataFrame]:
+    """Parse many log files concurrently and yield them in discovery order.
+
+    Args:
+        source: Directory or glob pattern (see discover())
+        course: Function (path, root) -> course name; default course_name()
+        workers: Pool size (default: number of cores)
+        executor: 'thread' or 'process'
+        max_pending: Maximum parsed files held at once (default: 2 x workers)
+        compact: Use the compact typed layout
+        validate: Optional function applied to each frame in the worker
+            (must be picklable for the process pool)
+
+    Yields:
+        One DataFrame per file, with a course column
+
+    Raises:
+        ValueError: If executor is unknown
+    """
+    if executor not in ('thread', 'process'):
+        raise ValueError(f"Unknown executor: {executor!r} "
+                         "(expected 'thread' or 'process')")
+    root, paths = discover(source)
+    course = course or course_name
+    workers = workers or os.cpu_count() or 1
+    max_pending = max(max_pending or 2 * workers, 1)
+    pool_class = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+
+    with pool_class(max_workers=workers) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append(pool.submit(read_course_file, path, course(path, root),
+                                       compact, validate))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def concat_files(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Combine per-file frames, keeping categorical columns categorical.
+
+    pd.concat() falls back to strings for a categorical column unless every
+    frame has the same categories, which per-file frames never do. The
+    categories are unioned first (in order of first appearance), so the
+    compact layout survives without an intermediate object column.
+
+    Args:
+        frames: Frames from iter_files(), in order
+
+    Returns:
+        Combined DataFrame with a fresh RangeIndex
+    """
+    frames = list(frames)
+    if not frames:
+        return pd.concat(frames, ignore_index=True)
+    for column in frames[0].columns:
+        if not all(isinstance(frame[column].dtype, pd.CategoricalDtype)
+                   for frame in frames):
+            continue
+        categories = union_categoricals([frame[column] for frame in frames]).categories
+        frames = [frame.assign(**{column: frame[column].cat.set_categories(categories)})
+                  for frame in frames]
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,193 @@
+"""Per-stage timing and memory instrumentation.
+
+A StageProfiler records, for every named stage of a run, the wall time, CPU
+time, growth of the process's peak RSS and (optionally) the peak of Python
+allocations traced by tracemalloc, plus any counts the caller attaches
+(rows, students, ...). Stages may be nested; a nested stage is also part of
+its parent's totals.
+
+The records can be printed as a table, embedded in a report, appended to a
+JSON-lines file (one line per stage, to chart runs over time) or written as a
+Chrome trace (open in chrome://tracing or https://ui.perfetto.dev).
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in MiB (None if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+class Stage:
+    """Measurements of one stage."""
+
+    def __init__(self, name: str, depth: int):
+        self.name = name
+        self.depth = depth
+        self.start = None
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.peak_rss_delta_mb = None
+        self.traced_peak_mb = None
+        self.counts = {}
+
+    def count(self, **counts) -> None:
+        """Attach counts such as rows=... or students=... to the stage."""
+        self.counts.update(counts)
+
+    def to_dict(self) -> Dict:
+        """Return the stage as a JSON-serializable dictionary."""
+        return {
+            'stage': self.name,
+            'depth': self.depth,
+            'wall_seconds': round(self.wall_seconds, 6),
+            'cpu_seconds': round(self.cpu_seconds, 6),
+            'peak_rss_delta_mb': (None if self.peak_rss_delta_mb is None
+                                  else round(self.peak_rss_delta_mb, 3)),
+            'traced_peak_mb': (None if self.traced_peak_mb is None
+                               else round(self.traced_peak_mb, 3)),
+            **self.counts,
+        }
+
+
+class StageProfiler:
+    """Collects Stage measurements for one run."""
+
+    def __init__(self, trace_memory: bool = False):
+        """Create a profiler.
+
+        Args:
+            trace_memory: Also record the tracemalloc peak of every stage.
+                Tracing Python allocations slows the run down noticeably.
+        """
+        self.trace_memory = trace_memory
+        self.stages: List[Stage] = []
+        self.started = datetime.now()
+        self._origin = time.perf_counter()
+        self._open: List[Stage] = []
+        # [current at start, peak so far] per open stage
+        self._traced: List[List[int]] = []
+
+    @contextmanager
+    def stage(self, name: str, **counts) -> Iterator[Stage]:
+        """Measure the enclosed block as one stage.
+
+        Args:
+            name: Stage name
+            **counts: Counts to attach right away (more can be added with
+                the yielded Stage's count())
+
+        Yields:
+            The Stage being measured
+        """
+        record = Stage(name, depth=len(self._open))
+        record.count(**counts)
+        self.stages.append(record)
+        self._open.append(record)
+
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            elif self._traced:
+                # Keep the parent's peak so far before resetting for this stage
+                self._traced[-1][1] = max(self._traced[-1][1],
+                                          tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            self._traced.append([current, current])
+
+        rss_before = peak_rss_mb()
+        cpu_start = time.process_time()
+        record.start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.wall_seconds = time.perf_counter() - record.start
+            record.cpu_seconds = time.process_time() - cpu_start
+            rss_after = peak_rss_mb()
+            if rss_before is not None:
+                record.peak_rss_delta_mb = rss_after - rss_before
+
+            if self.trace_memory:
+                current_before, peak = self._traced.pop()
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                record.traced_peak_mb = (peak - current_before) / 2 ** 20
+                if self._traced:
+                    self._traced[-1][1] = max(self._traced[-1][1], peak)
+                if started_tracing:
+                    tracemalloc.stop()
+            self._open.pop()
+
+    def to_dict(self) -> List[Dict]:
+        """Return every finished stage as a dictionary, in start order."""
+        return [stage.to_dict() for stage in self.stages
+                if stage.wall_seconds is not None]
+
+    def summary_table(self) -> str:
+        """Format the stages as a fixed-width text table."""
+        count_keys = []
+        for stage in self.stages:
+            count_keys.extend(key for key in stage.counts if key not in count_keys)
+        header = (f"{'Stage':<30} {'Wall s':>9} {'CPU s':>9} {'+RSS MB':>9}"
+                  + (f" {'Traced MB':>10}" if self.trace_memory else '')
+                  + ''.join(f" {key:>10}" for key in count_keys))
+        lines = [header, '-' * len(header)]
+        for stage in self.stages:
+            if stage.wall_seconds is None:
+                continue
+            rss = ('' if stage.peak_rss_delta_mb is None
+                   else f'{stage.peak_rss_delta_mb:.1f}')
+            line = (f"{'  ' * stage.depth + stage.name:<30} {stage.wall_seconds:>9.3f} "
+                    f"{stage.cpu_seconds:>9.3f} {rss:>9}")
+            if self.trace_memory:
+                line += f" {stage.traced_peak_mb:>10.1f}"
+            line += ''.join(f" {stage.counts.get(key, ''):>10}" for key in count_keys)
+            lines.append(line)
+        return '\n'.join(lines)
+
+    def write_jsonl(self, path: str) -> None:
+        """Append one JSON line per stage, tagged with the run's start time."""
+        run = self.started.isoformat(timespec='seconds')
+        with open(path, 'a') as f:
+            for record in self.to_dict():
+                f.write(json.dumps({'run': run, **record}) + '\n')
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Write the stages as a Chrome trace event file."""
+        pid, tid = os.getpid(), threading.get_ident()
+        events = [
+            {
+                'name': stage.name,
+                'ph': 'X',
+                'ts': round((stage.start - self._origin) * 1e6),
+                'dur': round(stage.wall_seconds * 1e6),
+                'pid': pid,
+                'tid': tid,
+                'args': {key: value for key, value in stage.to_dict().items()
+                         if key not in ('stage', 'depth')},
+            }
+            for stage in self.stages if stage.wall_seconds is not None
+        ]
+        trace = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+        Path(path).write_text(json.dumps(trace, indent=1))
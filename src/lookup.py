@@ -0,0 +1,102 @@
+"""Per-student row index over the activity log.
+
+The log is stably sorted by student_id once; each student's rows are then
+one contiguous block, located by an offsets array. A student's history is
+a positional slice of the sorted frame (a view, no rows are copied), so a
+drill-down costs O(rows of that student) instead of a boolean mask over
+the whole log. Within a student, rows keep their log order and their
+original index labels, i.e. a history equals df[df.student_id == id].
+
+The sorted frame is one extra copy of the log, built on first use.
+"""
+
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+class StudentIndex:
+    """Student -> row range index over a sorted copy of the log."""
+
+    def __init__(self, df: pd.DataFrame):
+        """Sort the log by student and record each student's row range.
+
+        Args:
+            df: Activity log with a student_id column
+        """
+        codes, uniques = pd.factorize(df['student_id'], sort=False)
+        order = np.argsort(codes, kind='stable')
+        # Rows without a student_id (code -1) sort first and are skipped
+        missing = int((codes < 0).sum())
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        self.frame = df.take(order)
+        self.offsets = np.concatenate(([0], np.cumsum(counts))) + missing
+        self.student_ids = pd.Index(uniques, name='student_id')
+        self._positions = {sid: i for i, sid in enumerate(self.student_ids.tolist())}
+
+    def __len__(self) -> int:
+        return len(self.student_ids)
+
+    def __contains__(self, student_id) -> bool:
+        return student_id in self._positions
+
+    def bounds(self, student_id) -> tuple:
+        """Return the (start, stop) row positions of a student in self.frame.
+
+        Raises:
+            KeyError: If the student is not in the log
+        """
+        try:
+            position = self._positions[student_id]
+        except TypeError:
+            raise KeyError(student_id) from None
+        return int(self.offsets[position]), int(self.offsets[position + 1])
+
+    def history(self, student_id) -> pd.DataFrame:
+        """Return a student's rows, in log order.
+
+        Args:
+            student_id: Student to look up
+
+        Returns:
+            Slice of the sorted log (a view; copy it before modifying)
+
+        Raises:
+            KeyError: If the student is not in the log
+        """
+        start, stop = self.bounds(student_id)
+        return self.frame.iloc[start:stop]
+
+    def histories(self, student_ids: Iterable) -> Dict[str, pd.DataFrame]:
+        """Return the history of several students.
+
+        Args:
+            student_ids: Students to look up
+
+        Returns:
+            {student_id: slice of the sorted log}, in the order given
+
+        Raises:
+            KeyError: If a student is not in the log
+        """
+        return {student_id: self.history(student_id) for student_id in student_ids}
+
+    def rows(self, student_ids: Iterable) -> pd.DataFrame:
+        """Return the rows of several students as one frame.
+
+        Each student's rows stay contiguous and in log order; students come
+        in the order given. Unlike history(), the result is a copy.
+
+        Args:
+            student_ids: Students to look up
+
+        Returns:
+            DataFrame with the columns of the log
+
+        Raises:
+            KeyError: If a student is not in the log
+        """
+        ranges = [np.arange(*self.bounds(student_id)) for student_id in student_ids]
+        positions = np.concatenate(ranges) if ranges else np.empty(0, dtype='int64')
+        return self.frame.take(positions)
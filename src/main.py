@@ -1,18 +1,39 @@
 """Main entry point for Learning Path Analyzer."""
 
+import argparse
 import sys
 from pathlib import Path
 from analyzer import LearningPathAnalyzer
+from cleaning import ISSUES
+from instrumentation import StageProfiler
 from utils import load_lms_logs, save_report, export_recommendations
 
 
-def main():
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(
+        description="Learning Path Analyzer - Educational Analytics Tool")
+    parser.add_argument('--trace', metavar='PATH',
+                        help='Write per-stage timings as a Chrome trace')
+    parser.add_argument('--metrics-log', metavar='PATH',
+                        help='Append per-stage metrics to a JSON-lines file')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Record tracemalloc peaks per stage (slower)')
+    parser.add_argument('--clean', action='store_true',
+                        help='Drop invalid and duplicate rows, '
+                             'writing them to reports/quarantine.csv')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Run the learning path analysis."""
+    args = parse_args(argv)
     print("Learning Path Analyzer - Educational Analytics Tool")
     print("=" * 50)
 
     # Initialize analyzer
-    analyzer = LearningPathAnalyzer()
+    profiler = StageProfiler(trace_memory=args.trace_memory)
+    analyzer = LearningPathAnalyzer(profiler=profiler)
 
     # Use sample data file
     data_file = Path(__file__).parent.parent / 'data' / 'sample_lms_data.csv'
@@ -25,25 +46,46 @@ def main():
         sample_data.to_csv(data_file, index=False)
         print(f"Sample data created: {data_file}")
 
+    reports_dir = Path(__file__).parent.parent / 'reports'
+    reports_dir.mkdir(parents=True, exist_ok=True)
+
     # Load data
     print(f"\nLoading data from {data_file}...")
+    if args.clean:
+        options = {'quarantine': str(reports_dir / 'quarantine.csv')}
+    else:
+        options = {'cache': True}
     try:
-        analyzer.load_data(str(data_file))
-        print(f"Loaded {len(analyzer.df)} activity records from {len(analyzer.df['student_id'].unique())} students")
+        with profiler.stage('load') as stage:
+            analyzer.load_data(str(data_file), **options)
+            stage.count(rows=len(analyzer.df),
+                        students=analyzer.df['student_id'].nunique())
+        print(f"Loaded {stage.counts['rows']} activity records "
+              f"from {stage.counts['students']} students")
     except Exception as e:
         print(f"Error loading data: {e}")
         return 1
+    cleaning = analyzer.cleaning_report
+    if cleaning is not None:
+        issues = ", ".join(f"{cleaning[issue]} {issue}"
+                           for issue in ISSUES if cleaning[issue])
+        print(f"Dropped {cleaning['dropped']} of {cleaning['rows']} rows"
+              + (f" ({issues})" if issues else ""))
 
     # Analyze activity patterns
     print("\nAnalyzing activity patterns...")
-    activity_stats = analyzer.analyze_activity_patterns()
+    with profiler.stage('activity_patterns', rows=len(analyzer.df)) as stage:
+        activity_stats = analyzer.analyze_activity_patterns()
+        stage.count(activities=len(activity_stats))
     print("Activity Statistics:")
     for activity, stats in activity_stats.items():
         print(f"  - {activity}: {stats['count']} activities, avg grade {stats['avg_grade']}")
 
     # Profile students
     print("\nProfiling students...")
-    profiles = analyzer.profile_students()
+    with profiler.stage('profiling', rows=len(analyzer.df)) as stage:
+        profiles = analyzer.profile_students()
+        stage.count(students=len(profiles))
     print(f"Profiled {len(profiles)} students")
 
     # Show engagement levels
@@ -58,12 +100,14 @@ def main():
 
     # Generate recommendations
     print("\nGenerating recommendations...")
-    recommendations = analyzer.generate_recommendations()
+    with profiler.stage('recommendations', students=len(profiles)):
+        recommendations = analyzer.generate_recommendations()
     print(f"Generated recommendations for {len(recommendations)} students")
 
     # Get summary report
     print("\nGenerating summary report...")
-    report = analyzer.get_summary_report()
+    with profiler.stage('report', students=len(profiles)):
+        report = analyzer.get_summary_report()
 
     print("\n" + "=" * 50)
     print("ANALYSIS SUMMARY")
@@ -87,26 +131,44 @@ def main():
 
     # Save reports
     print("\nSaving reports...")
-    reports_dir = Path(__file__).parent.parent / 'reports'
-    reports_dir.mkdir(parents=True, exist_ok=True)
-
-    report_file = reports_dir / 'analysis_report.json'
-    save_report(report, str(report_file))
-    print(f"Report saved to {report_file}")
 
     recs_file = reports_dir / 'recommendations.txt'
-    export_recommendations(recommendations, str(recs_file))
+    with profiler.stage('export', students=len(recommendations)):
+        export_recommendations(recommendations, str(recs_file))
     print(f"Recommendations saved to {recs_file}")
 
     # Generate visualizations
     print("\nGenerating visualizations...")
     try:
-        visualizations = analyzer.generate_all_visualizations()
+        with profiler.stage('visualizations') as stage:
+            visualizations = analyzer.generate_all_visualizations()
+            stage.count(charts=len(visualizations))
         for viz_name, filepath in visualizations.items():
             print(f"  ✓ {viz_name}: {filepath}")
     except Exception as e:
         print(f"Warning: Could not generate visualizations: {e}")
 
+    # Stage metrics go into the report, which is written last so that
+    # every stage is included
+    print("\nStage metrics:")
+    print(profiler.summary_table())
+    report['metrics'] = {
+        'started': profiler.started.isoformat(timespec='seconds'),
+        'stages': profiler.to_dict(),
+        'cache': analyzer.cache.stats(),
+    }
+    if cleaning is not None:
+        report['cleaning'] = cleaning
+    report_file = reports_dir / 'analysis_report.json'
+    save_report(report, str(report_file))
+    print(f"\nReport saved to {report_file}")
+    if args.metrics_log:
+        profiler.write_jsonl(args.metrics_log)
+        print(f"Metrics appended to {args.metrics_log}")
+    if args.trace:
+        profiler.write_chrome_trace(args.trace)
+        print(f"Chrome trace saved to {args.trace}")
+
     print("\nAnalysis complete!")
     return 0
 
@@ -0,0 +1,119 @@
+"""Memoized, dependency-tracked analysis results.
+
+Every derived result (activity statistics, profiles, recommendations, class
+average, rankings, ...) is stored under a name together with a stamp: the
+data version it was computed from and the revision of each result it was
+computed from. A result is reused while its stamp is current. Loading or
+appending data bumps the data version and drops every stored result;
+recomputing or replacing a result gives it a new revision, which makes the
+results built from it stale.
+
+Hit and miss counts per result name show what was reused.
+"""
+
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Tuple
+
+
+class _Entry(NamedTuple):
+    value: Any
+    revision: int
+    data_version: int
+    depends: Tuple[Tuple[str, int], ...]
+
+
+class ResultCache:
+    """Named results with explicit dependencies on a data version."""
+
+    def __init__(self):
+        self.data_version = 0
+        self.hits = Counter()
+        self.misses = Counter()
+        self._entries: Dict[str, _Entry] = {}
+        self._revision = 0
+
+    def invalidate(self, name: str = None) -> None:
+        """Mark results as stale.
+
+        Args:
+            name: Drop only this result (and, through their stamps,
+                everything computed from it); None marks the data as
+                changed and drops every result, so values computed from
+                the old data (indexes, timelines, ...) are released; hit
+                and miss counts are kept
+        """
+        if name is None:
+            self.data_version += 1
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+    def _stamp(self, depends: Iterable[str]) -> Tuple[Tuple[str, int], ...]:
+        """Current revisions of the named results (-1 if missing)."""
+        return tuple(
+            (dep, self._entries[dep].revision if dep in self._entries else -1)
+            for dep in depends
+        )
+
+    def _valid(self, entry: _Entry) -> bool:
+        """Whether an entry was computed from the current inputs."""
+        return entry.data_version == self.data_version and self._stamp(
+            dep for dep, _ in entry.depends) == entry.depends
+
+    def get(self, name: str, compute: Callable[[], Any],
+            depends: Iterable[str] = ()) -> Any:
+        """Return a result, computing it if it is missing or stale.
+
+        Dependencies must be brought up to date (with get()) before this
+        call; the result is valid for their current revisions.
+
+        Args:
+            name: Result name
+            compute: Function computing the result
+            depends: Names of the results it is computed from
+
+        Returns:
+            The cached or newly computed result
+        """
+        depends = tuple(depends)
+        entry = self._entries.get(name)
+        if entry is not None and entry.data_version == self.data_version \
+                and entry.depends == self._stamp(depends):
+            self.hits[name] += 1
+            return entry.value
+        self.misses[name] += 1
+        return self.put(name, compute(), depends)
+
+    def put(self, name: str, value: Any, depends: Iterable[str] = ()) -> Any:
+        """Store a result computed from the current data and dependencies.
+
+        Args:
+            name: Result name
+            value: Result
+            depends: Names of the results it was computed from
+
+        Returns:
+            value
+        """
+        self._revision += 1
+        self._entries[name] = _Entry(value, self._revision, self.data_version,
+                                     self._stamp(depends))
+        return value
+
+    def peek(self, name: str, default: Any = None) -> Any:
+        """Return a result if it is current, without computing it."""
+        entry = self._entries.get(name)
+        if entry is None or not self._valid(entry):
+            return default
+        return entry.value
+
+    def derived_from(self, name: str, dep: str) -> bool:
+        """Whether the current value of name was computed from dep."""
+        entry = self._entries.get(name)
+        return entry is not None and self._valid(entry) and dep in dict(entry.depends)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return hit and miss counts per result name."""
+        names = sorted(set(self.hits) | set(self.misses))
+        return {name: {'hits': self.hits[name], 'misses': self.misses[name]}
+                for name in names}
@@ -0,0 +1,106 @@
+"""Multi-process analysis over student shards.
+
+The log is hash-partitioned by student_id, so every student's rows land in
+exactly one shard and keep their original order. Each shard is profiled in
+its own process; the parent only merges small per-shard tables. Because a
+student's metrics only ever see that student's rows, the merged profiles are
+identical to the serial path.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .aggregates import (
+        build_pair_table, build_day_table, build_profile_table, student_grade_means
+    )
+except ImportError:  # running as a script from src/ (see main.py)
+    from aggregates import (
+        build_pair_table, build_day_table, build_profile_table, student_grade_means
+    )
+
+
+class ShardResult(NamedTuple):
+    """Merged output of a sharded run."""
+
+    profile_table: pd.DataFrame
+    pairs: pd.DataFrame
+    grade_means: pd.Series
+
+
+def resolve_n_jobs(n_jobs: int) -> int:
+    """Turn an n_jobs setting into a worker count (-1 means all cores)."""
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return n_jobs
+
+
+def partition_rows(student_ids: pd.Series, num_shards: int):
+    """Hash-partition row positions by student.
+
+    Args:
+        student_ids: student_id column of the log
+        num_shards: Number of shards
+
+    Returns:
+        List of num_shards arrays of row positions, each in ascending order
+    """
+    hashes = pd.util.hash_pandas_object(student_ids, index=False).to_numpy()
+    shard_ids = (hashes % np.uint64(num_shards)).astype('int64')
+    order = np.argsort(shard_ids, kind='stable')
+    bounds = np.cumsum(np.bincount(shard_ids, minlength=num_shards))[:-1]
+    return np.split(order, bounds)
+
+
+def _run_shard(shard: pd.DataFrame, rows: np.ndarray) -> tuple:
+    """Profile one shard (runs in a worker process)."""
+    pairs = build_pair_table(shard)
+    pairs['first_row'] = rows[pairs['first_row'].to_numpy()]
+    grade_means = student_grade_means(shard)
+    table = build_profile_table(pairs, build_day_table(shard), grade_means)
+    first_rows = pairs.groupby('student_id', sort=False, observed=True)['first_row']
+    table['first_row'] = first_rows.min()
+    return table, pairs, grade_means
+
+
+def run_sharded(df: pd.DataFrame, n_jobs: int) -> ShardResult:
+    """Profile every student using a process pool.
+
+    Args:
+        df: Validated activity log
+        n_jobs: Number of worker processes (-1 for all cores)
+
+    Returns:
+        ShardResult with students and pairs in first-appearance order
+    """
+    num_shards = resolve_n_jobs(n_jobs)
+    columns = ['student_id', 'activity_type', 'timestamp', 'grade']
+    shards = [rows for rows in partition_rows(df['student_id'], num_shards)
+              if len(rows)]
+
+    with ProcessPoolExecutor(max_workers=num_shards) as pool:
+        futures = [
+            pool.submit(_run_shard, df[columns].take(rows), rows)
+            for rows in shards
+        ]
+        results = [future.result() for future in futures]
+
+    if not results:
+        empty = _run_shard(df[columns], np.arange(0))
+        results = [empty]
+
+    tables, pairs, grade_means = zip(*results)
+    profile_table = pd.concat(tables).sort_values('first_row', kind='stable')
+    profile_table = profile_table.drop(columns='first_row')
+    return ShardResult(
+        profile_table=profile_table,
+        pairs=pd.concat(pairs).sort_values('first_row', kind='stable',
+                                           ignore_index=True),
+        grade_means=pd.concat(grade_means),
+    )
@@ -0,0 +1,174 @@
+"""Grade ranking index over student profiles.
+
+Answers top-k / bottom-k, rank and percentile queries without sorting every
+student: top-k finds the k-th grade with np.partition (O(n)) and only sorts
+the candidates (O(k log k)); rank and percentile are vectorized counts.
+Equal grades are ordered by student_id, ascending, in every query.
+Students without a grade are left out of the ranking.
+"""
+
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class GradeRanking:
+    """Ranking of students by average grade."""
+
+    def __init__(self, student_ids, grades):
+        """Build the index.
+
+        Args:
+            student_ids: Sequence of student ids
+            grades: Sequence of average grades aligned with student_ids
+        """
+        ids = np.array(list(student_ids), dtype=object)
+        values = np.asarray(grades, dtype='float64')
+        graded = ~np.isnan(values)
+        self.source_size = len(ids)
+        self.student_ids = ids[graded]
+        self.grades = values[graded]
+        self._positions = {sid: i for i, sid in enumerate(self.student_ids.tolist())}
+
+    @classmethod
+    def from_profiles(cls, profiles: dict) -> 'GradeRanking':
+        """Build the index from a student_profiles dictionary."""
+        return cls(list(profiles), [p['average_grade'] for p in profiles.values()])
+
+    @classmethod
+    def from_table(cls, profile_table: pd.DataFrame) -> 'GradeRanking':
+        """Build the index from a profile table indexed by student_id."""
+        return cls(profile_table.index.tolist(),
+                   profile_table['average_grade'].to_numpy())
+
+    def updated(self, student_ids, grades, source_size: int = None) -> 'GradeRanking':
+        """Return a copy with some students' grades replaced or added.
+
+        Only the given students are looked up, so refreshing the ranking
+        after an append does not rebuild the position index of every
+        student.
+
+        Args:
+            student_ids: Students whose grade changed or who are new
+            grades: Their average grades, aligned with student_ids
+            source_size: Number of students, graded or not, the updated
+                ranking covers; defaults to adding the new graded students
+
+        Returns:
+            New GradeRanking
+        """
+        ids = np.array(list(student_ids), dtype=object)
+        values = np.asarray(grades, dtype='float64')
+        positions = np.array([self._positions.get(sid, -1) for sid in ids.tolist()],
+                             dtype='int64')
+        known = positions >= 0
+        added = ~known & ~np.isnan(values)
+        all_ids = np.concatenate([self.student_ids, ids[added]])
+        all_grades = np.concatenate([self.grades, values[added]])
+        all_grades[positions[known]] = values[known]
+        if source_size is None:
+            source_size = self.source_size + int(added.sum())
+        if np.isnan(all_grades).any():
+            # A student lost their grade: rebuild without them
+            ranking = GradeRanking(all_ids, all_grades)
+        else:
+            ranking = GradeRanking.__new__(GradeRanking)
+            ranking.student_ids = all_ids
+            ranking.grades = all_grades
+            ranking._positions = dict(self._positions)
+            ranking._positions.update(
+                zip(ids[added].tolist(), range(len(self.grades), len(all_grades))))
+        ranking.source_size = source_size
+        return ranking
+
+    def __len__(self) -> int:
+        return len(self.grades)
+
+    def _cohort(self, cohort: Iterable = None) -> np.ndarray:
+        """Positions of the students in cohort (all students if None)."""
+        if cohort is None:
+            return np.arange(len(self.grades))
+        positions = [self._positions[sid] for sid in cohort if sid in self._positions]
+        return np.asarray(positions, dtype='int64')
+
+    def top(self, k: int = 5, cohort: Iterable = None) -> List[Tuple]:
+        """Return the k highest graded students, best first.
+
+        Args:
+            k: Number of students
+            cohort: Optional student ids to rank within
+
+        Returns:
+            List of (student_id, grade) tuples
+        """
+        return self._select(k, cohort, descending=True)
+
+    def bottom(self, k: int = 5, cohort: Iterable = None) -> List[Tuple]:
+        """Return the k lowest graded students, lowest first.
+
+        Args:
+            k: Number of students
+            cohort: Optional student ids to rank within
+
+        Returns:
+            List of (student_id, grade) tuples
+        """
+        return self._select(k, cohort, descending=False)
+
+    def _select(self, k: int, cohort: Iterable, descending: bool) -> List[Tuple]:
+        """Partial selection shared by top() and bottom()."""
+        positions = self._cohort(cohort)
+        if k <= 0 or len(positions) == 0:
+            return []
+        keys = -self.grades[positions] if descending else self.grades[positions]
+        if k < len(positions):
+            boundary = np.partition(keys, k - 1)[k - 1]
+            candidates = np.flatnonzero(keys <= boundary)
+        else:
+            candidates = np.arange(len(positions))
+        order = np.lexsort((self.student_ids[positions[candidates]],
+                            keys[candidates]))[:k]
+        chosen = positions[candidates[order]]
+        return list(zip(self.student_ids[chosen].tolist(),
+                        self.grades[chosen].tolist()))
+
+    def rank(self, student_id, cohort: Iterable = None) -> int:
+        """Return the 1-based rank of a student (1 = highest grade).
+
+        Args:
+            student_id: Student to look up
+            cohort: Optional student ids to rank within
+
+        Returns:
+            Rank of the student
+
+        Raises:
+            KeyError: If the student is not ranked
+        """
+        target = self._positions[student_id]
+        positions = self._cohort(cohort)
+        grade = self.grades[target]
+        grades = self.grades[positions]
+        ties = positions[grades == grade]
+        ahead_on_ties = int((self.student_ids[ties] < student_id).sum())
+        return int((grades > grade).sum()) + ahead_on_ties + 1
+
+    def percentile(self, student_id, cohort: Iterable = None) -> float:
+        """Return the percentage of students with a lower grade.
+
+        Args:
+            student_id: Student to look up
+            cohort: Optional student ids to rank within
+
+        Returns:
+            Percentile between 0 and 100 (NaN for an empty cohort)
+
+        Raises:
+            KeyError: If the student is not ranked
+        """
+        grade = self.grades[self._positions[student_id]]
+        grades = self.grades[self._cohort(cohort)]
+        if len(grades) == 0:
+            return float('nan')
+        return 100.0 * float((grades < grade).sum()) / len(grades)
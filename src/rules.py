@@ -0,0 +1,232 @@
+"""Vectorized recommendation rules.
+
+Each rule is a column predicate over the profile table (one row per student)
+plus the messages it contributes. All rules are evaluated with boolean masks
+in one pass and every student's result is stored as a bitset of the rules
+that fired, so 200k students cost one small integer each instead of a list
+of repeated strings. Messages are kept once in a message table and only
+expanded to text when a student's recommendations are read (for example
+while exporting); the expansion is cached per distinct (bitset, template
+values) combination, of which there are only a handful (see
+Recommendations.combinations()).
+"""
+
+from collections.abc import ItemsView, Mapping, ValuesView
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class Rule(NamedTuple):
+    """A recommendation rule."""
+
+    name: str
+    when: Callable[[pd.DataFrame], pd.Series]
+    messages: Tuple[str, ...]
+
+
+# Order matters: messages are listed in rule order. Messages may refer to
+# profile columns named in TEMPLATE_FIELDS.
+RULES = (
+    Rule('low_engagement', lambda p: p['engagement_level'] == 'low', (
+        "Increase participation in learning activities",
+        "Set a schedule for regular study sessions",
+    )),
+    Rule('medium_engagement', lambda p: p['engagement_level'] == 'medium', (
+        "Explore diverse activity types to enhance learning",
+        "Aim to increase consistency in participation",
+    )),
+    Rule('high_engagement', lambda p: ~p['engagement_level'].isin(['low', 'medium']), (
+        "Maintain current level of engagement",
+        "Consider peer mentoring to help others",
+    )),
+    Rule('low_grade', lambda p: p['average_grade'] < 60, (
+        "Focus on high-effectiveness activities",
+        "Seek help from instructors or tutoring services",
+    )),
+    Rule('low_diversity', lambda p: p['activity_diversity'] < 3, (
+        "Try different activities beyond {preferred_activity}",
+    )),
+)
+
+TEMPLATE_FIELDS = ('preferred_activity',)
+
+# Rules over the weekly trend columns (timeline.TREND_FIELDS), evaluated after
+# RULES when recommendations are generated with trends
+TREND_RULES = (
+    Rule('activity_drop', lambda p: p['activity_change'] <= -0.5, (
+        "Your activity dropped this week; plan short sessions to get back on track",
+    )),
+    Rule('grade_drop', lambda p: p['grade_change'] <= -10, (
+        "Your recent grades are lower than usual; review this week's material",
+    )),
+)
+
+
+def evaluate_rules(profile_table: pd.DataFrame, rules=RULES) -> np.ndarray:
+    """Evaluate every rule over the profile table.
+
+    Args:
+        profile_table: DataFrame with one row per student and the profile
+            columns the rules refer to
+        rules: Sequence of Rule (at most 32)
+
+    Returns:
+        uint32 array with bit i set where rule i fired, one entry per row
+
+    Raises:
+        ValueError: If there are more than 32 rules
+    """
+    if len(rules) > 32:
+        raise ValueError("At most 32 rules are supported")
+    codes = np.zeros(len(profile_table), dtype='uint32')
+    for bit, rule in enumerate(rules):
+        mask = np.asarray(rule.when(profile_table), dtype=bool)
+        codes |= mask.astype('uint32') << np.uint32(bit)
+    return codes
+
+
+class Recommendations(Mapping):
+    """Read-only mapping of student_id to recommendation list.
+
+    Behaves like the {student_id: [message, ...]} dictionary it replaces;
+    lists are built on access.
+    """
+
+    def __init__(self, student_ids, codes,
+                 template_values: Dict[str, np.ndarray] = None,
+                 rules=RULES):
+        """Wrap evaluated rule bitsets.
+
+        Args:
+            student_ids: Student ids, one per code
+            codes: Output of evaluate_rules()
+            template_values: {field: array aligned with student_ids} for
+                the fields used in message templates
+            rules: The rules the codes were evaluated with
+        """
+        self.rules = tuple(rules)
+        self.messages = tuple(message for rule in self.rules
+                              for message in rule.messages)
+        self._rule_messages = []
+        start = 0
+        for rule in self.rules:
+            self._rule_messages.append(range(start, start + len(rule.messages)))
+            start += len(rule.messages)
+
+        self.student_ids = pd.Index(student_ids)
+        self.codes = np.asarray(codes, dtype='uint32')
+        self.template_values = {
+            field: np.asarray(values, dtype=object)
+            for field, values in (template_values or {}).items()
+        }
+        self._combinations = None
+        self._positions = None
+
+    @classmethod
+    def from_table(cls, profile_table: pd.DataFrame, rules=RULES) -> 'Recommendations':
+        """Evaluate the rules over a profile table indexed by student_id."""
+        return cls(
+            profile_table.index,
+            evaluate_rules(profile_table, rules),
+            {field: profile_table[field].to_numpy(dtype=object)
+             for field in TEMPLATE_FIELDS if field in profile_table.columns},
+            rules,
+        )
+
+    def message_ids(self, code: int) -> List[int]:
+        """Return the message table positions for a rule bitset."""
+        return [message for bit, messages in enumerate(self._rule_messages)
+                if code >> bit & 1 for message in messages]
+
+    def _expand(self, position: int) -> Tuple[str, ...]:
+        """Build the messages for the student at position."""
+        fields = {field: values[position]
+                  for field, values in self.template_values.items()}
+        return tuple(self.messages[i].format(**fields) if fields else self.messages[i]
+                     for i in self.message_ids(int(self.codes[position])))
+
+    def combinations(self) -> Tuple[np.ndarray, List[Tuple[str, ...]]]:
+        """Intern the distinct (bitset, template values) combinations.
+
+        Returns:
+            Combination id per student and the messages of each combination
+        """
+        if self._combinations is None:
+            keys = pd.DataFrame({'code': self.codes, **self.template_values})
+            groups = keys.groupby(list(keys.columns), sort=False, dropna=False)
+            ids = groups.ngroup().to_numpy()
+            _, first = np.unique(ids, return_index=True)
+            self._combinations = (ids, [self._expand(position) for position in first])
+        return self._combinations
+
+    def __getitem__(self, student_id) -> List[str]:
+        if self._positions is None:
+            self._positions = {sid: i
+                               for i, sid in enumerate(self.student_ids.tolist())}
+        try:
+            position = self._positions[student_id]
+        except TypeError:
+            raise KeyError(student_id) from None
+        ids, texts = self.combinations()
+        return list(texts[ids[position]])
+
+    def __iter__(self):
+        return iter(self.student_ids.tolist())
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def items(self):
+        return _ItemsView(self)
+
+    def values(self):
+        return _ValuesView(self)
+
+    def updated(self, other: 'Recommendations') -> 'Recommendations':
+        """Return a copy with other's students replaced or appended.
+
+        Students already present keep their position; new students are added
+        at the end, like dict.update().
+        """
+        if not len(other):
+            return self
+        positions = self.student_ids.get_indexer(other.student_ids)
+        known = positions >= 0
+        codes = self.codes.copy()
+        codes[positions[known]] = other.codes[known]
+        values = {}
+        for field, column in self.template_values.items():
+            column = column.copy()
+            column[positions[known]] = other.template_values[field][known]
+            values[field] = np.concatenate([column,
+                                            other.template_values[field][~known]])
+        return Recommendations(
+            self.student_ids.append(other.student_ids[~known]),
+            np.concatenate([codes, other.codes[~known]]),
+            values,
+            self.rules,
+        )
+
+    def __repr__(self) -> str:
+        return f'<Recommendations: {len(self)} students, {len(self.rules)} rules>'
+
+
+class _ItemsView(ItemsView):
+    """Items view that walks students by position instead of by key."""
+
+    def __iter__(self):
+        ids, texts = self._mapping.combinations()
+        for student_id, combination in zip(self._mapping.student_ids.tolist(),
+                                           ids.tolist()):
+            yield student_id, list(texts[combination])
+
+
+class _ValuesView(ValuesView):
+    """Values view that walks students by position instead of by key."""
+
+    def __iter__(self):
+        ids, texts = self._mapping.combinations()
+        for combination in ids.tolist():
+            yield list(texts[combination])
@@ -0,0 +1,199 @@
+"""Learning-path sequence mining over ordered activity streams.
+
+The log is ordered once by student and, within a student, by timestamp
+(ties keep log order). Activities are integer codes, so every statistic is
+computed over shifted copies of a few integer arrays in a single pass:
+
+- transition matrix: counts of consecutive (activity, next activity)
+  pairs of the same student
+- n-gram paths: every run of n consecutive activities of one student, e.g.
+  reading -> quiz -> assignment, encoded as one base-k integer, with its
+  number of occurrences and of distinct students
+- outcomes: the grade of the activity that follows each path occurrence,
+  averaged per path and compared with the class average
+
+No per-student Python loop is involved; memory is a few integer arrays of
+the log's length.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .timeline import ActivityTimeline
+except ImportError:  # running as a script from src/ (see main.py)
+    from timeline import ActivityTimeline
+
+PATH_SEPARATOR = ' → '
+
+
+class ActivitySequences:
+    """Activity streams of every student, ordered by time."""
+
+    def __init__(self, student_codes: np.ndarray, activity_codes: np.ndarray,
+                 grades: np.ndarray, activity_types):
+        """Wrap arrays already ordered by student, then by time.
+
+        Args:
+            student_codes: Integer student code per row; each student's rows
+                are contiguous
+            activity_codes: Integer activity code per row (0..k-1, -1 if
+                the activity type is missing)
+            grades: Grade per row (NaN if ungraded)
+            activity_types: Activity type of each code
+        """
+        self.student_codes = np.asarray(student_codes, dtype='int64')
+        self.activity_codes = np.asarray(activity_codes, dtype='int64')
+        self.grades = np.asarray(grades, dtype='float64')
+        self.activity_types = pd.Index(activity_types, name='activity_type')
+
+    @classmethod
+    def from_timeline(cls, timeline) -> 'ActivitySequences':
+        """Order a timeline.ActivityTimeline by student (one stable sort).
+
+        Args:
+            timeline: Log already sorted by timestamp
+
+        Returns:
+            ActivitySequences over the same rows
+        """
+        students = timeline.codes['student_id']
+        order = np.argsort(students, kind='stable')
+        return cls(students[order], timeline.codes['activity_type'][order],
+                   timeline.grades[order], timeline.labels['activity_type'])
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'ActivitySequences':
+        """Build sequences from a loaded log with a datetime timestamp column."""
+        return cls.from_timeline(ActivityTimeline(df))
+
+    def __len__(self) -> int:
+        return len(self.activity_codes)
+
+    def _runs(self, n: int) -> np.ndarray:
+        """Start positions of the runs of n rows within one student.
+
+        A row with a missing student or activity type (code -1) ends the
+        run: no run contains it.
+        """
+        if len(self) < n:
+            return np.zeros(0, dtype='int64')
+        starts = np.arange(len(self) - n + 1)
+        # Rows of a student are contiguous, so comparing the ends suffices
+        same = self.student_codes[:len(self) - n + 1] == self.student_codes[n - 1:]
+        same &= self.student_codes[n - 1:] >= 0
+        missing = self.activity_codes < 0
+        if missing.any():
+            # Missing activities among rows [i, i + n), from a running count
+            seen = np.concatenate(([0], np.cumsum(missing)))
+            same &= seen[n:] == seen[:len(self) - n + 1]
+        return starts[same]
+
+    def transition_matrix(self, normalize: bool = False) -> pd.DataFrame:
+        """Count transitions from each activity to the next one.
+
+        Args:
+            normalize: Divide each row by its total, giving the probability
+                of every next activity
+
+        Returns:
+            DataFrame with the current activity as index and the next
+            activity as columns
+        """
+        k = len(self.activity_types)
+        starts = self._runs(2)
+        cells = self.activity_codes[starts] * k + self.activity_codes[starts + 1]
+        matrix = np.bincount(cells, minlength=k * k).reshape(k, k)
+        if normalize:
+            totals = matrix.sum(axis=1, keepdims=True)
+            matrix = np.divide(matrix, totals, out=np.zeros(matrix.shape),
+                               where=totals > 0)
+        return pd.DataFrame(matrix, index=self.activity_types.rename('from'),
+                            columns=self.activity_types.rename('to'))
+
+    def ngrams(self, n: int = 3, min_count: int = 1, top: int = None) -> pd.DataFrame:
+        """Count frequent paths of n consecutive activities.
+
+        Args:
+            n: Path length (2 or more)
+            min_count: Drop paths seen fewer times
+            top: Keep only the most frequent paths
+
+        Returns:
+            DataFrame with path (activities joined by PATH_SEPARATOR),
+            count, students (distinct students who followed it),
+            next_grade (average grade of the activity right after the
+            path, NaN if never followed by a graded activity), graded (how
+            many such grades) and grade_lift (next_grade minus the class
+            average), most frequent first; ties keep code order
+
+        Raises:
+            ValueError: If n < 2 or the path codes would overflow int64
+        """
+        if n < 2:
+            raise ValueError("Paths need at least 2 activities")
+        k = max(len(self.activity_types), 1)
+        if k ** n >= 2 ** 63:
+            raise ValueError(f"Paths of {n} over {k} activity types "
+                             "are too long to encode")
+        starts = self._runs(n)
+        codes = np.zeros(len(starts), dtype='int64')
+        for offset in range(n):
+            codes = codes * k + self.activity_codes[starts + offset]
+
+        if k ** n <= max(len(codes), 1 << 16):
+            # Small code space: count directly instead of sorting
+            dense = np.bincount(codes, minlength=k ** n)
+            grams = np.flatnonzero(dense)
+            lookup = np.zeros(k ** n, dtype='int64')
+            lookup[grams] = np.arange(len(grams))
+            inverse = lookup[codes]
+            counts = dense[grams]
+        else:
+            grams = _distinct(codes)
+            inverse = np.searchsorted(grams, codes)
+            counts = np.bincount(inverse, minlength=len(grams))
+
+        # Distinct students per path: unique (path, student) combinations
+        num_students = int(self.student_codes.max(initial=-1)) + 1
+        pairs = _distinct(inverse * num_students + self.student_codes[starts])
+        students = np.bincount(pairs // max(num_students, 1), minlength=len(grams))
+
+        # Outcome: the grade right after the path, for the same student
+        after = starts + n
+        followed = after < len(self)
+        followed[followed] = (self.student_codes[after[followed]]
+                              == self.student_codes[starts[followed]])
+        next_grades = np.full(len(starts), np.nan)
+        next_grades[followed] = self.grades[after[followed]]
+        graded = ~np.isnan(next_grades)
+        grade_sums = np.bincount(inverse[graded], weights=next_grades[graded],
+                                 minlength=len(grams))
+        grade_counts = np.bincount(inverse[graded], minlength=len(grams))
+        next_grade = np.divide(grade_sums, grade_counts,
+                               out=np.full(len(grams), np.nan),
+                               where=grade_counts > 0)
+        graded = (~np.isnan(self.grades)).any()
+        class_average = np.nanmean(self.grades) if graded else np.nan
+
+        # Labels are only built for the paths that are returned
+        selected = np.flatnonzero(counts >= min_count)
+        selected = selected[np.argsort(-counts[selected], kind='stable')][:top]
+        digits = (grams[selected, None] // k ** np.arange(n - 1, -1, -1)) % k
+        names = self.activity_types.to_numpy(dtype=object)[digits]
+        return pd.DataFrame({
+            'path': [PATH_SEPARATOR.join(map(str, row)) for row in names],
+            'count': counts[selected],
+            'students': students[selected],
+            'next_grade': next_grade[selected],
+            'graded': grade_counts[selected],
+            'grade_lift': next_grade[selected] - class_average,
+        })
+
+
+def _distinct(values: np.ndarray) -> np.ndarray:
+    """Sorted distinct values (a sort and a neighbour comparison)."""
+    values = np.sort(values)
+    keep = np.ones(len(values), dtype=bool)
+    keep[1:] = values[1:] != values[:-1]
+    return values[keep]
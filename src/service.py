@@ -0,0 +1,289 @@
+"""Local HTTP/JSON analysis service with warm in-memory state.
+
+The log is loaded and analyzed once; every answer is then served from the
+in-memory results (profile dictionary, Recommendations mapping, grade
+ranking index and summary report), so a request costs a dictionary lookup
+or a top-k query instead of a run of main.py.
+
+Reloads build a complete new AnalysisState in a background thread while
+the old one keeps serving. The new state is swapped in with a single
+reference assignment, so readers never block on a reload and never see a
+half-built state: each request reads self.state once and answers from it.
+
+Endpoints (GET unless noted):
+
+    /health                              load time, sizes, reload status
+    /summary                             get_summary_report()
+    /students/<id>                       profile, recommendations, rank
+    /students/<id>/recommendations       recommendation list
+    /top?n=5[&cohort=a,b]                best average grades
+    /bottom?n=5[&cohort=a,b]             lowest average grades
+    POST /reload                         re-read the log in the background
+
+Only the standard library is used; plotting libraries are never imported.
+
+Usage:
+    python src/service.py --data data/sample_lms_data.csv [--port 8000]
+"""
+
+import argparse
+import threading
+import time
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import parse_qs, unquote, urlsplit
+
+try:
+    from .analyzer import LearningPathAnalyzer
+    from .backends import BACKENDS
+    from .utils import json_bytes
+except ImportError:  # running as a script from src/ (see main.py)
+    from analyzer import LearningPathAnalyzer
+    from backends import BACKENDS
+    from utils import json_bytes
+
+MAX_RESULTS = 1000
+
+
+class AnalysisState:
+    """Fully computed results for one version of the log (read-only)."""
+
+    def __init__(self, analyzer: LearningPathAnalyzer, source: str):
+        """Compute and index every result the endpoints serve.
+
+        Args:
+            analyzer: Analyzer with the log loaded
+            source: Path the log was loaded from
+        """
+        self.source = source
+        self.profiles = analyzer.profile_students()
+        self.recommendations = analyzer.generate_recommendations()
+        self.ranking = analyzer.ranking
+        self.summary = analyzer.get_summary_report()
+        # Path segments are text; numeric student ids are loaded as ints
+        self.student_ids = {str(student_id): student_id for student_id in self.profiles}
+        self.loaded_at = datetime.now().isoformat(timespec='seconds')
+        self.load_seconds = None
+        if self.profiles:
+            # Build the recommendation lookup table before serving
+            self.recommendations[next(iter(self.profiles))]
+
+    @classmethod
+    def load(cls, filepath: str, backend: str = 'pandas',
+             **load_options) -> 'AnalysisState':
+        """Load and analyze a log file.
+
+        Args:
+            filepath: Log file (see LearningPathAnalyzer.load_data())
+            backend: Analyzer backend
+            **load_options: Options for load_data(), e.g. compact=True
+
+        Returns:
+            New AnalysisState
+        """
+        start = time.perf_counter()
+        analyzer = LearningPathAnalyzer(backend=backend)
+        analyzer.load_data(filepath, **load_options)
+        analyzer.analyze_activity_patterns()
+        state = cls(analyzer, filepath)
+        state.load_seconds = round(time.perf_counter() - start, 3)
+        return state
+
+    def student(self, student_id) -> Dict:
+        """Profile, recommendations and grade rank of one student."""
+        result = {'student_id': student_id, 'profile': self.profiles[student_id],
+                  'recommendations': self.recommendations[student_id]}
+        if self.ranking is not None:
+            try:
+                result['rank'] = self.ranking.rank(student_id)
+                result['percentile'] = self.ranking.percentile(student_id)
+            except KeyError:  # ungraded students are not ranked
+                result['rank'] = result['percentile'] = None
+        return result
+
+
+class AnalysisService:
+    """Holds the current AnalysisState and replaces it on reload."""
+
+    def __init__(self, filepath: str, backend: str = 'pandas', **load_options):
+        """Load the log once.
+
+        Args:
+            filepath: Log file to serve
+            backend: Analyzer backend ('pandas' or 'duckdb')
+            **load_options: Options for load_data()
+        """
+        self.filepath = filepath
+        self.backend = backend
+        self.load_options = load_options
+        self.state = AnalysisState.load(filepath, backend, **load_options)
+        self.last_error = None
+        self._reloading = threading.Lock()
+        self._reload_thread = None
+
+    @property
+    def reloading(self) -> bool:
+        """Whether a reload is in progress."""
+        return self._reloading.locked()
+
+    def reload(self, wait: bool = False) -> bool:
+        """Re-read the log in a background thread and swap the result in.
+
+        Args:
+            wait: Block until the reload has finished
+
+        Returns:
+            False if a reload was already running (no new one is started)
+        """
+        if not self._reloading.acquire(blocking=False):
+            return False
+
+        def run():
+            try:
+                state = AnalysisState.load(self.filepath, self.backend,
+                                           **self.load_options)
+                self.state = state  # atomic swap; readers keep the state they hold
+                self.last_error = None
+            except Exception as error:  # keep serving the previous state
+                self.last_error = f'{type(error).__name__}: {error}'
+            finally:
+                self._reloading.release()
+
+        self._reload_thread = threading.Thread(target=run, name='analysis-reload',
+                                               daemon=True)
+        self._reload_thread.start()
+        if wait:
+            self._reload_thread.join()
+        return True
+
+    def health(self) -> Dict:
+        """Describe the state being served."""
+        state = self.state
+        return {
+            'status': 'ok',
+            'source': state.source,
+            'loaded_at': state.loaded_at,
+            'load_seconds': state.load_seconds,
+            'students': len(state.profiles),
+            'reloading': self.reloading,
+            'last_error': self.last_error,
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes requests to the service's current state."""
+
+    service: AnalysisService = None
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without TCP_NODELAY every
+    # keep-alive response waits for the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):  # noqa: A002 - keep the console quiet
+        pass
+
+    def _send(self, status: HTTPStatus, body) -> None:
+        payload = json_bytes(body)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+        query = parse_qs(url.query)
+        state = self.service.state  # one consistent snapshot per request
+        try:
+            if parts == ['health']:
+                return self._send(HTTPStatus.OK, self.service.health())
+            if parts == ['summary']:
+                return self._send(HTTPStatus.OK, state.summary)
+            if parts and parts[0] == 'students' and len(parts) in (2, 3):
+                if len(parts) == 3 and parts[2] != 'recommendations':
+                    raise LookupError(self.path)
+                student_id = state.student_ids.get(parts[1])
+                if student_id is None:
+                    return self._send(HTTPStatus.NOT_FOUND,
+                                      {'error': f'Unknown student: {parts[1]}'})
+                if len(parts) == 3:
+                    return self._send(HTTPStatus.OK, state.recommendations[student_id])
+                return self._send(HTTPStatus.OK, state.student(student_id))
+            if parts in (['top'], ['bottom']):
+                n = min(int(query.get('n', ['5'])[0]), MAX_RESULTS)
+                cohort = None
+                if 'cohort' in query:
+                    cohort = [state.student_ids.get(part, part)
+                              for part in query['cohort'][0].split(',')]
+                if state.ranking is None:
+                    return self._send(HTTPStatus.OK, [])
+                select = state.ranking.top if parts == ['top'] else state.ranking.bottom
+                return self._send(HTTPStatus.OK, select(n, cohort))
+            raise LookupError(self.path)
+        except LookupError:
+            self._send(HTTPStatus.NOT_FOUND, {'error': f'Unknown endpoint: {url.path}'})
+        except ValueError as error:
+            self._send(HTTPStatus.BAD_REQUEST, {'error': str(error)})
+
+    def do_POST(self):  # noqa: N802 - http.server naming
+        if urlsplit(self.path).path.strip('/') != 'reload':
+            return self._send(HTTPStatus.NOT_FOUND,
+                              {'error': f'Unknown endpoint: {self.path}'})
+        started = self.service.reload()
+        self._send(HTTPStatus.ACCEPTED, {'reloading': True, 'started': started})
+
+
+def make_server(service: AnalysisService, host: str = '127.0.0.1',
+                port: int = 8000) -> ThreadingHTTPServer:
+    """Create a threaded HTTP server for a service (port 0 picks a free port).
+
+    Args:
+        service: Loaded AnalysisService
+        host: Interface to bind
+        port: TCP port
+
+    Returns:
+        Server; call serve_forever() to run it
+    """
+    handler = type('AnalysisHandler', (_Handler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(
+        description="Learning Path Analyzer - analysis service")
+    parser.add_argument('--data', required=True, help='Log file to serve')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--backend', default='pandas', choices=BACKENDS)
+    parser.add_argument('--compact', action='store_true',
+                        help='Use the compact typed layout')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Load the log and serve it until interrupted."""
+    args = parse_args(argv)
+    options = {'compact': True} if args.compact else {}
+    print(f"Loading {args.data}...")
+    service = AnalysisService(args.data, backend=args.backend, **options)
+    server = make_server(service, args.host, args.port)
+    print(f"Serving {len(service.state.profiles)} students on "
+          f"http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
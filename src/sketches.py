@@ -0,0 +1,215 @@
+"""Compact per-student distinct counters for streaming and incremental runs.
+
+The exact day table keeps one row per (student, active day) and grows with
+the history. These structures keep a fixed number of bytes per student
+instead and are folded chunk by chunk like the other aggregates:
+
+- DayBitmap: one bit per day of a bounded term. Counts are exact; days
+  outside the term are counted in `out_of_range` and otherwise ignored.
+  Memory is ceil(num_days / 8) bytes per student (15 bytes for a
+  120-day term, 46 bytes for a year).
+- HyperLogLog: 2**precision one-byte registers per student for open-ended
+  histories. The relative standard error is 1.04 / sqrt(2**precision)
+  (6.5% at the default precision 8, 256 bytes per student; 3.3% at 10,
+  1 KiB). Below 2.5 * 2**precision distinct values the estimate switches
+  to linear counting, whose error is lower for small counts, e.g. about 4%
+  for 30 days and 5% for 300 days at precision 8 (2% and 3% at 10).
+
+Both are mergeable: sketches built over different shards, files or days
+combine (bitwise OR / register max) into the sketch of the whole log, and
+values are hashed deterministically, so sketches built in different
+processes merge correctly.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def day_numbers(timestamps: pd.Series) -> np.ndarray:
+    """Convert timestamps to calendar day numbers (days since 1970-01-01).
+
+    Args:
+        timestamps: datetime Series; time-zone aware values use their
+            local calendar date
+
+    Returns:
+        int64 array of day numbers
+    """
+    if getattr(timestamps.dt, 'tz', None) is not None:
+        timestamps = timestamps.dt.tz_localize(None)
+    return timestamps.to_numpy().astype('datetime64[D]').astype('int64')
+
+
+def _bit_counts(state: np.ndarray) -> np.ndarray:
+    """Number of set bits per row of a uint8 array."""
+    if hasattr(np, 'bitwise_count'):  # numpy >= 2.0
+        return np.bitwise_count(state).sum(axis=1, dtype='int64')
+    return np.unpackbits(state, axis=1).sum(axis=1, dtype='int64')
+
+
+class _StudentSketch:
+    """Fixed-width per-student state rows, in order of first appearance."""
+
+    def __init__(self, width: int, dtype: str):
+        self.student_ids = pd.Index([], dtype=object)
+        self._state = np.zeros((0, width), dtype=dtype)
+
+    @property
+    def state(self) -> np.ndarray:
+        """State rows, aligned with student_ids."""
+        return self._state[:len(self.student_ids)]
+
+    @property
+    def bytes_per_student(self) -> int:
+        return self._state.shape[1] * self._state.itemsize
+
+    def _rows(self, student_ids) -> np.ndarray:
+        """Row of each value in student_ids, adding unseen students."""
+        codes, uniques = pd.factorize(np.asarray(student_ids, dtype=object))
+        positions = self.student_ids.get_indexer(uniques)
+        new = positions < 0
+        if new.any():
+            size = len(self.student_ids)
+            positions[new] = size + np.arange(new.sum())
+            new_ids = pd.Index(uniques[new], dtype=object)
+            self.student_ids = self.student_ids.append(new_ids)
+            if len(self.student_ids) > len(self._state):
+                # Grow geometrically so adding chunks stays linear overall
+                capacity = max(len(self.student_ids), 2 * len(self._state))
+                grown = np.zeros((capacity, self._state.shape[1]),
+                                 dtype=self._state.dtype)
+                grown[:size] = self._state[:size]
+                self._state = grown
+        return positions[codes]
+
+    def _check_compatible(self, other) -> None:
+        if (type(other) is not type(self)
+                or other._state.shape[1] != self._state.shape[1]):
+            raise ValueError("Sketches with different parameters cannot be merged")
+
+    def counts(self, students=None) -> pd.Series:
+        """Distinct count per student.
+
+        Args:
+            students: Optional student ids to restrict to (unknown ids count 0)
+
+        Returns:
+            int64 Series indexed by student_id
+        """
+        if students is None:
+            return pd.Series(self._estimate(self.state), index=self.student_ids,
+                             dtype='int64')
+        # Only the requested rows are estimated, so a refresh after a small
+        # append does not depend on how many students the sketch holds
+        students = pd.Index(np.asarray(students, dtype=object))
+        positions = self.student_ids.get_indexer(students)
+        known = positions >= 0
+        counts = np.zeros(len(students), dtype='int64')
+        if known.any():
+            counts[known] = self._estimate(self.state[positions[known]])
+        return pd.Series(counts, index=students)
+
+    def __len__(self) -> int:
+        return len(self.student_ids)
+
+
+class DayBitmap(_StudentSketch):
+    """Exact active-day sets for a bounded term, one bit per day."""
+
+    def __init__(self, start: str, end: str):
+        """Create an empty bitmap.
+
+        Args:
+            start: First day of the term (e.g. '2024-01-15')
+            end: Last day of the term, inclusive
+        """
+        self.start = np.datetime64(start, 'D')
+        self.end = np.datetime64(end, 'D')
+        self.num_days = int((self.end - self.start).astype('int64')) + 1
+        if self.num_days <= 0:
+            raise ValueError("end must not be before start")
+        self.out_of_range = 0
+        super().__init__(-(-self.num_days // 8), 'uint8')
+
+    def add(self, student_ids, days: np.ndarray) -> None:
+        """Mark days as active.
+
+        Args:
+            student_ids: Student id per row
+            days: Day number per row (see day_numbers())
+        """
+        rows = self._rows(student_ids)
+        offset = np.asarray(days, dtype='int64') - self.start.astype('int64')
+        inside = (offset >= 0) & (offset < self.num_days)
+        self.out_of_range += int((~inside).sum())
+        rows, offset = rows[inside], offset[inside]
+        np.bitwise_or.at(self._state, (rows, offset >> 3),
+                         (1 << (offset & 7)).astype('uint8'))
+
+    def merge(self, other: 'DayBitmap') -> 'DayBitmap':
+        """Fold another bitmap over the same term into this one."""
+        self._check_compatible(other)
+        if other.start != self.start:
+            raise ValueError("Sketches with different parameters cannot be merged")
+        rows = self._rows(other.student_ids)
+        self._state[rows] |= other.state
+        self.out_of_range += other.out_of_range
+        return self
+
+    @staticmethod
+    def _estimate(state: np.ndarray) -> np.ndarray:
+        return _bit_counts(state)
+
+
+class HyperLogLog(_StudentSketch):
+    """Approximate distinct counts per student (HyperLogLog)."""
+
+    def __init__(self, precision: int = 8):
+        """Create an empty sketch.
+
+        Args:
+            precision: log2 of the number of registers per student (4-16)
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        super().__init__(1 << precision, 'uint8')
+
+    @property
+    def relative_error(self) -> float:
+        """Relative standard error of the estimates."""
+        return 1.04 / np.sqrt(1 << self.precision)
+
+    def add(self, student_ids, values) -> None:
+        """Add values (e.g. day numbers) seen for each student.
+
+        Args:
+            student_ids: Student id per row
+            values: Value per row; equal values hash equally in every process
+        """
+        rows = self._rows(student_ids)
+        hashes = pd.util.hash_array(np.asarray(values))
+        register = (hashes & np.uint64((1 << self.precision) - 1)).astype('intp')
+        rest = hashes >> np.uint64(self.precision)
+        # Rank = position of the lowest set bit of the remaining hash bits
+        lowest = rest & (~rest + np.uint64(1))
+        rank = np.where(rest == 0, 65 - self.precision,
+                        np.log2(lowest.astype('float64'), where=rest > 0,
+                                out=np.zeros(len(rest))) + 1)
+        np.maximum.at(self._state, (rows, register), rank.astype('uint8'))
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """Fold another sketch with the same precision into this one."""
+        self._check_compatible(other)
+        rows = self._rows(other.student_ids)
+        self._state[rows] = np.maximum(self._state[rows], other.state)
+        return self
+
+    def _estimate(self, state: np.ndarray) -> np.ndarray:
+        m = state.shape[1]
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / np.exp2(-state.astype('float64')).sum(axis=1)
+        zeros = (state == 0).sum(axis=1)
+        small = (estimate <= 2.5 * m) & (zeros > 0)
+        estimate[small] = m * np.log(m / zeros[small])
+        return np.rint(estimate).astype('int64')
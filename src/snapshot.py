@@ -0,0 +1,147 @@
+"""Cached binary snapshots of validated LMS logs.
+
+The first load of a log writes the validated, typed DataFrame next to the
+source file as an uncompressed Feather (Arrow IPC) file. Later loads check
+that the snapshot still matches the source and memory-map it, skipping CSV
+parsing and timestamp conversion.
+
+A snapshot matches when the source file's size, modification time and a
+SHA-256 of its first and last megabyte are unchanged, and it was written with
+the same layout (compact or not). Hashing only the ends of the file keeps the
+check constant-time for multi-GB logs; size and mtime catch other edits.
+
+Snapshots need pyarrow. Without it, loading and saving are silently skipped.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+SNAPSHOT_SUFFIX = '.snapshot.feather'
+SNAPSHOT_VERSION = 2
+FINGERPRINT_BYTES = 1 << 20
+_METADATA_KEY = b'learning_path_analyzer'
+
+
+def _arrow():
+    """Return the pyarrow module, or None if it is not installed."""
+    try:
+        import pyarrow
+        import pyarrow.feather  # noqa: F401
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def snapshot_path(filepath: str) -> Path:
+    """Return where the snapshot of a source file is stored.
+
+    Args:
+        filepath: Path to the source log
+
+    Returns:
+        Path of the snapshot next to the source file
+    """
+    return Path(str(filepath) + SNAPSHOT_SUFFIX)
+
+
+def source_fingerprint(filepath: str, compact: bool = False) -> dict:
+    """Fingerprint a source file for snapshot validation.
+
+    Args:
+        filepath: Path to the source log
+        compact: Whether the snapshot holds the compact layout
+
+    Returns:
+        Dictionary with the file size, mtime, partial content hash, layout
+        and snapshot format version
+    """
+    stat = os.stat(filepath)
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        digest.update(f.read(FINGERPRINT_BYTES))
+        if stat.st_size > FINGERPRINT_BYTES:
+            f.seek(max(FINGERPRINT_BYTES, stat.st_size - FINGERPRINT_BYTES))
+            digest.update(f.read(FINGERPRINT_BYTES))
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': digest.hexdigest(),
+        'compact': compact,
+        'version': SNAPSHOT_VERSION,
+    }
+
+
+def load_snapshot(filepath: str, compact: bool = False, chunksize: int = None):
+    """Load the snapshot of a source file if it is still valid.
+
+    Args:
+        filepath: Path to the source log
+        compact: Whether the compact layout is wanted
+        chunksize: If given, return an iterator over DataFrames of at most
+            this many rows, converted one record batch at a time
+
+    Returns:
+        Validated DataFrame (or iterator of chunks), or None if there is no
+        matching snapshot
+    """
+    pa = _arrow()
+    path = snapshot_path(filepath)
+    if pa is None or not path.exists():
+        return None
+
+    try:
+        source = pa.memory_map(str(path))
+        reader = pa.ipc.open_file(source)
+        metadata = reader.schema.metadata or {}
+        stored = json.loads(metadata.get(_METADATA_KEY, b'null'))
+    except (OSError, ValueError, pa.ArrowInvalid):
+        return None
+    if stored != source_fingerprint(filepath, compact):
+        return None
+
+    table = reader.read_all()
+    if chunksize is None:
+        return table.to_pandas()
+    return (batch.to_pandas() for batch in table.to_batches(max_chunksize=chunksize))
+
+
+def save_snapshot(df: pd.DataFrame, filepath: str,
+                  compact: bool = False) -> Optional[Path]:
+    """Write the validated DataFrame as the snapshot of its source file.
+
+    The snapshot is written to a temporary file and moved into place, so a
+    concurrent reader never sees a partial file. Failures to write (e.g. a
+    read-only data directory) are ignored.
+
+    Args:
+        df: Validated log loaded from filepath
+        filepath: Path to the source log
+        compact: Whether df uses the compact layout
+
+    Returns:
+        Path of the snapshot, or None if it was not written
+    """
+    pa = _arrow()
+    if pa is None:
+        return None
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    fingerprint = json.dumps(source_fingerprint(filepath, compact)).encode()
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           _METADATA_KEY: fingerprint})
+
+    path = snapshot_path(filepath)
+    temp_path = path.with_name(path.name + f'.{os.getpid()}.tmp')
+    try:
+        pa.feather.write_feather(table, str(temp_path), compression='uncompressed')
+        os.replace(temp_path, path)
+    except OSError:
+        temp_path.unlink(missing_ok=True)
+        return None
+    return path
@@ -0,0 +1,186 @@
+"""Vectorized synthetic LMS log generator for load testing.
+
+Rows are produced in chunks with numpy only, no per-row Python. The shape of
+the data is controlled by a few knobs:
+
+- skewed activity rates: each student gets a lognormal activity rate, so a
+  few students produce most of the rows (activity_skew=0 makes it uniform)
+- per-activity grade distributions: normal (mean, sd) per activity type,
+  shifted by a per-student ability offset and clipped to 0..100
+- session burstiness: rows come in sessions with a geometric number of
+  activities a few minutes apart
+- semester calendar: sessions fall on term days, weekends are less busy
+  and breaks are empty
+
+Output is reproducible for a given seed and chunk_rows.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ACTIVITIES = {
+    # activity_type: (share of activities, grade mean, grade sd)
+    'quiz': (0.25, 72.0, 12.0),
+    'assignment': (0.20, 78.0, 10.0),
+    'forum_post': (0.15, 85.0, 8.0),
+    'video_watch': (0.25, 80.0, 10.0),
+    'reading': (0.15, 76.0, 11.0),
+}
+
+
+class SemesterCalendar(NamedTuple):
+    """Term dates used to place sessions."""
+
+    start: str = '2024-01-15'
+    end: str = '2024-05-10'
+    breaks: Tuple[Tuple[str, str], ...] = (('2024-03-11', '2024-03-15'),)
+    weekend_weight: float = 0.3
+
+    def day_weights(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the term days and their relative activity weights."""
+        days = np.arange(np.datetime64(self.start, 'D'),
+                         np.datetime64(self.end, 'D') + 1)
+        weekday = (days.astype('int64') + 3) % 7  # 0 = Monday
+        weights = np.where(weekday >= 5, self.weekend_weight, 1.0)
+        for break_start, break_end in self.breaks:
+            in_break = ((days >= np.datetime64(break_start))
+                        & (days <= np.datetime64(break_end)))
+            weights[in_break] = 0.0
+        return days, weights / weights.sum()
+
+
+def student_ids(num_students: int, prefix: str = 'STU') -> np.ndarray:
+    """Build zero-padded student ids such as STU0000042."""
+    width = max(4, len(str(num_students - 1)))
+    numbers = np.char.zfill(np.arange(num_students).astype(str), width)
+    return np.char.add(prefix, numbers).astype(object)
+
+
+def generate_lms_chunks(num_rows: int, num_students: int = None, seed: int = 0,
+                        chunk_rows: int = 1_000_000,
+                        activities: Dict[str, Tuple[float, float, float]] = None,
+                        activity_skew: float = 1.0, ability_sd: float = 8.0,
+                        session_length: float = 4.0, session_gap_minutes: float = 6.0,
+                        calendar: SemesterCalendar = None) -> Iterator[pd.DataFrame]:
+    """Generate a synthetic activity log in chunks.
+
+    Args:
+        num_rows: Total number of rows
+        num_students: Number of students (default: one per 50 rows)
+        seed: Random seed
+        chunk_rows: Rows per generated chunk
+        activities: {activity_type: (share, grade mean, grade sd)}
+        activity_skew: Sigma of the lognormal per-student activity rate
+        ability_sd: Standard deviation of the per-student grade offset
+        session_length: Mean number of activities per session (>= 1)
+        session_gap_minutes: Mean gap between activities in a session
+        calendar: Term calendar (default: SemesterCalendar())
+
+    Yields:
+        DataFrames with student_id, activity_type, timestamp and grade
+    """
+    activities = activities or DEFAULT_ACTIVITIES
+    calendar = calendar or SemesterCalendar()
+    num_students = num_students or max(1, num_rows // 50)
+    seeds = np.random.SeedSequence(seed)
+    student_seed, *chunk_seeds = seeds.spawn(1 + -(-num_rows // chunk_rows))
+
+    # Per-student parameters, fixed across chunks
+    rng = np.random.default_rng(student_seed)
+    ids = student_ids(num_students)
+    rates = rng.lognormal(0.0, activity_skew, num_students)
+    student_cdf = np.cumsum(rates / rates.sum())
+    ability = rng.normal(0.0, ability_sd, num_students)
+
+    names = np.array(list(activities), dtype=object)
+    shares, means, sds = (np.array(column, dtype='float64')
+                          for column in zip(*activities.values()))
+    activity_cdf = np.cumsum(shares / shares.sum())
+    days, day_weights = calendar.day_weights()
+    day_cdf = np.cumsum(day_weights)
+
+    remaining = num_rows
+    for chunk_seed in chunk_seeds:
+        rng = np.random.default_rng(chunk_seed)
+        size = min(chunk_rows, remaining)
+        remaining -= size
+
+        # Sessions: geometric lengths until the chunk is full
+        num_sessions = int(size / session_length * 1.2) + 16
+        success = 1.0 / max(session_length, 1.0)
+        lengths = rng.geometric(success, num_sessions)
+        while lengths.sum() < size:
+            lengths = np.concatenate([lengths, rng.geometric(success, num_sessions)])
+        lengths = lengths[:np.searchsorted(np.cumsum(lengths), size) + 1]
+        lengths[-1] -= lengths.sum() - size
+
+        session_student = np.searchsorted(student_cdf, rng.random(len(lengths)))
+        session_student = np.minimum(session_student, num_students - 1)
+        session_day = np.searchsorted(day_cdf, rng.random(len(lengths)))
+        session_day = days[np.minimum(session_day, len(days) - 1)]
+        session_start = (session_day.astype('datetime64[s]')
+                         + rng.integers(8 * 3600, 23 * 3600, len(lengths)))
+
+        # Rows: activities inside each session, minutes apart
+        student = np.repeat(session_student, lengths)
+        gaps = rng.exponential(session_gap_minutes * 60, size).astype('int64')
+        first = np.r_[0, np.cumsum(lengths)[:-1]]
+        gaps[first] = 0
+        offsets = np.cumsum(gaps)
+        offsets -= np.repeat(offsets[first], lengths)
+        timestamp = np.repeat(session_start, lengths) + offsets.astype('timedelta64[s]')
+
+        activity = np.minimum(np.searchsorted(activity_cdf, rng.random(size)),
+                              len(names) - 1)
+        grade = rng.normal(means[activity], sds[activity]) + ability[student]
+
+        yield pd.DataFrame({
+            'student_id': ids[student],
+            'activity_type': names[activity],
+            'timestamp': timestamp,
+            'grade': np.clip(grade, 0.0, 100.0).round(1),
+        })
+
+
+def write_lms_dataset(path: str, num_rows: int, **options) -> Path:
+    """Generate a synthetic log straight to a CSV or Parquet file.
+
+    Chunks are written as they are generated, so memory depends on
+    chunk_rows, not num_rows.
+
+    Args:
+        path: Output file; .parquet/.pq writes Parquet (needs pyarrow),
+            anything else CSV
+        num_rows: Total number of rows
+        **options: Passed to generate_lms_chunks()
+
+    Returns:
+        Path of the written file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    chunks = generate_lms_chunks(num_rows, **options)
+
+    if path.suffix.lower() in ('.parquet', '.pq'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(str(path), table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return path
+
+    with open(path, 'w', newline='') as f:
+        for number, chunk in enumerate(chunks):
+            chunk.to_csv(f, header=number == 0, index=False)
+    return path
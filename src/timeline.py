@@ -0,0 +1,264 @@
+"""Time-windowed engagement analytics.
+
+ActivityTimeline sorts the log by timestamp once and keeps it as
+integer-coded numpy columns. A window query (any [start, end) range, e.g.
+the last 7 days) locates its rows with two binary searches and aggregates
+only that slice, so repeated queries neither rescan nor re-sort the log.
+
+The student x week and activity x week matrices of activity counts and
+grade sums are built once, with one bincount each, and shared by the trend
+table, the trend recommendation rules (see rules.TREND_RULES) and the
+weekly activity chart. Weeks start on Monday.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .sketches import day_numbers
+    from .utils import grade_values
+except ImportError:  # running as a script from src/ (see main.py)
+    from sketches import day_numbers
+    from utils import grade_values
+
+KEYS = ('student_id', 'activity_type')
+
+# 1970-01-01 was a Thursday; shifting day numbers by 3 makes weeks start on Monday
+_WEEK_SHIFT = 3
+
+TREND_FIELDS = ['recent_activities', 'baseline_activities', 'activity_change',
+                'recent_grade', 'baseline_grade', 'grade_change']
+
+
+class ActivityTimeline:
+    """An activity log sorted by timestamp, with window and weekly queries."""
+
+    def __init__(self, df: pd.DataFrame):
+        """Sort and encode a loaded log.
+
+        Rows without a timestamp (NaT) cannot be placed in any window or
+        week and are left out; rows with a missing key are counted only
+        under the other key, as in the profile and activity tables.
+
+        Args:
+            df: Activity log with student_id, activity_type, datetime
+                timestamp and grade columns
+        """
+        timestamps = df['timestamp']
+        if getattr(timestamps.dt, 'tz', None) is not None:
+            timestamps = timestamps.dt.tz_localize(None)
+        timestamps = timestamps.to_numpy().astype('datetime64[ns]')
+        missing = np.isnat(timestamps)
+        dated = ~missing if missing.any() else None
+        if dated is not None:
+            timestamps = timestamps[dated]
+        times = timestamps.astype('int64')
+        order = None
+        if len(times) > 1 and (np.diff(times) < 0).any():
+            order = np.argsort(times, kind='stable')
+            times = times[order]
+
+        def column(values):
+            values = np.asarray(values)
+            if dated is not None:
+                values = values[dated]
+            return values if order is None else values[order]
+
+        # Keys are numbered in order of first appearance in the log, like the
+        # profile and activity tables
+        self.codes = {}
+        self.labels = {}
+        for key in KEYS:
+            codes, labels = pd.factorize(df[key], sort=False)
+            self.codes[key] = column(codes)
+            self.labels[key] = pd.Index(labels, name=key)
+        self.times = times
+        self.grades = column(grade_values(df['grade']))
+        self.graded = ~np.isnan(self.grades)
+
+        weeks = (column(day_numbers(df['timestamp'])) + _WEEK_SHIFT) // 7
+        self.first_week = int(weeks.min()) if len(weeks) else 0
+        self.week_codes = weeks - self.first_week
+        self.num_weeks = int(self.week_codes.max()) + 1 if len(weeks) else 0
+        self._weekly = {}
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def weeks(self) -> pd.DatetimeIndex:
+        """Monday of every week the log covers."""
+        days = (np.arange(self.num_weeks) + self.first_week) * 7 - _WEEK_SHIFT
+        return pd.DatetimeIndex(days.astype('datetime64[D]'), name='week')
+
+    def _bounds(self, start=None, end=None) -> slice:
+        """Rows with start <= timestamp < end, found by binary search."""
+        lo = 0 if start is None else np.searchsorted(
+            self.times, pd.Timestamp(start).value, side='left')
+        hi = len(self.times) if end is None else np.searchsorted(
+            self.times, pd.Timestamp(end).value, side='left')
+        return slice(lo, max(lo, hi))
+
+    def window(self, start=None, end=None, by: str = 'student_id') -> pd.DataFrame:
+        """Aggregate the activities in a time window.
+
+        Args:
+            start: First timestamp included (None: start of the log)
+            end: First timestamp excluded (None: end of the log)
+            by: 'student_id' or 'activity_type'
+
+        Returns:
+            DataFrame indexed by every student (or activity type) with the
+            number of activities and the unrounded average grade in the
+            window; 0 and NaN where there were none
+        """
+        rows = self._bounds(start, end)
+        codes = self.codes[by][rows]
+        size = len(self.labels[by])
+        # Rows with a missing key (code -1) belong to no group
+        keyed = codes >= 0
+        graded = self.graded[rows] & keyed
+        activities = np.bincount(codes[keyed], minlength=size)
+        grade_sum = np.bincount(codes[graded], weights=self.grades[rows][graded],
+                                minlength=size)
+        grade_count = np.bincount(codes[graded], minlength=size)
+        average = np.divide(grade_sum, grade_count, out=np.full(size, np.nan),
+                            where=grade_count > 0)
+        return pd.DataFrame({'activities': activities, 'average_grade': average},
+                            index=self.labels[by])
+
+    def rolling(self, days: int = 7, end=None, by: str = 'student_id') -> pd.DataFrame:
+        """Compare the last `days` days with the `days` days before them.
+
+        Args:
+            days: Window length in days
+            end: End of the current window, exclusive (None: just after the
+                last activity)
+            by: 'student_id' or 'activity_type'
+
+        Returns:
+            DataFrame with activities, previous_activities, activity_change
+            (relative, NaN without previous activity), average_grade,
+            previous_average_grade and grade_change per student or activity
+        """
+        if end is None:
+            end = pd.Timestamp(int(self.times[-1]) + 1 if len(self.times) else 0)
+        end = pd.Timestamp(end)
+        length = pd.Timedelta(days=days)
+        current = self.window(end - length, end, by)
+        previous = self.window(end - 2 * length, end - length, by)
+        table = current.copy()
+        table['previous_activities'] = previous['activities']
+        table['activity_change'] = _relative_change(current['activities'],
+                                                    previous['activities'])
+        table['previous_average_grade'] = previous['average_grade']
+        table['grade_change'] = current['average_grade'] - previous['average_grade']
+        return table[['activities', 'previous_activities', 'activity_change',
+                      'average_grade', 'previous_average_grade', 'grade_change']]
+
+    def _weekly_sums(self, by: str):
+        """(counts, grade sums, graded counts) arrays of shape keys x weeks."""
+        if by not in self._weekly:
+            size = len(self.labels[by])
+            shape = (size, self.num_weeks)
+            cells = self.codes[by].astype('int64') * self.num_weeks + self.week_codes
+            keyed = self.codes[by] >= 0
+            graded = self.graded & keyed
+            counts = np.bincount(cells[keyed], minlength=size * self.num_weeks)
+            sums = np.bincount(cells[graded], weights=self.grades[graded],
+                               minlength=size * self.num_weeks)
+            graded_counts = np.bincount(cells[graded], minlength=size * self.num_weeks)
+            self._weekly[by] = (counts.reshape(shape), sums.reshape(shape),
+                                graded_counts.reshape(shape))
+        return self._weekly[by]
+
+    def weekly(self, by: str = 'student_id',
+               values: str = 'activities') -> pd.DataFrame:
+        """Return the key x week matrix, built once per key.
+
+        Args:
+            by: 'student_id' or 'activity_type'
+            values: 'activities' (counts) or 'average_grade' (unrounded,
+                NaN in weeks without graded activities)
+
+        Returns:
+            DataFrame indexed by student (or activity type) with one column
+            per week (see weeks)
+        """
+        counts, sums, graded = self._weekly_sums(by)
+        if values == 'activities':
+            matrix = counts
+        elif values == 'average_grade':
+            matrix = np.divide(sums, graded, out=np.full(sums.shape, np.nan),
+                               where=graded > 0)
+        else:
+            raise ValueError(f"Unknown weekly values: {values!r}")
+        return pd.DataFrame(matrix, index=self.labels[by], columns=self.weeks)
+
+    def weekly_totals(self) -> pd.DataFrame:
+        """Return activities, active students and average grade per week.
+
+        Derived from the student x week matrix.
+        """
+        counts, sums, graded = self._weekly_sums('student_id')
+        return pd.DataFrame({
+            'activities': counts.sum(axis=0),
+            'active_students': (counts > 0).sum(axis=0),
+            'average_grade': _mean(sums.sum(axis=0), graded.sum(axis=0)),
+        }, index=self.weeks)
+
+    def trends(self, week=None, baseline_weeks: int = 4,
+               by: str = 'student_id') -> pd.DataFrame:
+        """Compare one week with the average of the weeks before it.
+
+        Args:
+            week: Any timestamp in the week to look at (None: the last week
+                of the log)
+            baseline_weeks: Number of preceding weeks to average
+            by: 'student_id' or 'activity_type'
+
+        Returns:
+            DataFrame with the TREND_FIELDS columns per student or activity:
+            activities and average grade in the week and over the baseline,
+            the relative change in activities (NaN without baseline
+            activity) and the change in average grade
+        """
+        counts, sums, graded = self._weekly_sums(by)
+        if week is None:
+            current = self.num_weeks - 1
+        else:
+            days = int(np.datetime64(pd.Timestamp(week).date(), 'D').astype('int64'))
+            current = (days + _WEEK_SHIFT) // 7 - self.first_week
+        size = len(self.labels[by])
+        if 0 <= current < self.num_weeks:
+            recent = counts[:, current]
+            recent_grade = _mean(sums[:, current], graded[:, current])
+        else:
+            recent, recent_grade = np.zeros(size, dtype='int64'), np.full(size, np.nan)
+        first = min(max(current - baseline_weeks, 0), self.num_weeks)
+        last = min(max(current, 0), self.num_weeks)
+        baseline = counts[:, first:last].sum(axis=1) / baseline_weeks
+        baseline_grade = _mean(sums[:, first:last].sum(axis=1),
+                               graded[:, first:last].sum(axis=1))
+
+        table = pd.DataFrame(index=self.labels[by])
+        table['recent_activities'] = recent
+        table['baseline_activities'] = baseline
+        table['activity_change'] = _relative_change(recent, baseline)
+        table['recent_grade'] = recent_grade
+        table['baseline_grade'] = baseline_grade
+        table['grade_change'] = recent_grade - baseline_grade
+        return table
+
+
+def _mean(sums: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Element-wise sums / counts, NaN where counts is 0."""
+    return np.divide(sums, counts, out=np.full(len(sums), np.nan), where=counts > 0)
+
+
+def _relative_change(current, previous) -> np.ndarray:
+    """(current - previous) / previous, NaN where previous is 0."""
+    current = np.asarray(current, dtype='float64')
+    previous = np.asarray(previous, dtype='float64')
+    return np.divide(current - previous, previous, out=np.full(len(current), np.nan),
+                     where=previous > 0)
@@ -1,19 +1,148 @@
 """Utility functions for Learning Path Analyzer."""
 
+import numpy as np
 import pandas as pd
 import json
 from pathlib import Path
 from datetime import datetime
 
+# Opt-in compact layout, applied while parsing: integer-coded ids and
+# activity types, float32 grades and timestamps as datetime64 (int64 epoch).
+COMPACT_DTYPES = {
+    'student_id': 'category',
+    'activity_type': 'category',
+    'grade': 'float32',
+}
 
-def load_lms_logs(filepath: str) -> pd.DataFrame:
-    """Load LMS logs from CSV file.
+# Columns parsed with the default dtype and only then made categorical, so
+# the categories keep the parsed type (integer ids stay integers)
+CATEGORY_AFTER_PARSE = ('student_id',)
+
+
+def read_options(compact: bool = False) -> dict:
+    """Build pd.read_csv keyword arguments for an LMS log.
+
+    Args:
+        compact: Use the compact typed layout (COMPACT_DTYPES) and parse
+            timestamps while reading; the CATEGORY_AFTER_PARSE columns are
+            left to _apply_compact()
+
+    Returns:
+        Keyword arguments for pd.read_csv
+    """
+    if not compact:
+        return {}
+    dtypes = {col: dtype for col, dtype in COMPACT_DTYPES.items()
+              if col not in CATEGORY_AFTER_PARSE}
+    return {'dtype': dtypes, 'parse_dates': ['timestamp']}
+
+
+# File suffixes read with a columnar reader instead of pd.read_csv
+COLUMNAR_FORMATS = {
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+}
+
+
+def read_log(filepath: str, chunksize: int = None, compact: bool = False):
+    """Read an LMS log from CSV, Parquet or Feather, chosen by file suffix.
+
+    Columnar formats need pyarrow. Their chunks come from Arrow record
+    batches; Feather files are memory-mapped, so only the batch being
+    converted is paged in.
+
+    Args:
+        filepath: Path to a .csv, .parquet/.pq or .feather/.arrow file
+        chunksize: If given, return an iterator over DataFrames of at most
+            this many rows instead of reading the whole file
+        compact: Read into the compact typed layout (see COMPACT_DTYPES)
+
+    Returns:
+        Loaded DataFrame, or an iterator of DataFrame chunks
+    """
+    file_format = COLUMNAR_FORMATS.get(Path(filepath).suffix.lower())
+    if file_format is None:
+        log = pd.read_csv(filepath, chunksize=chunksize, **read_options(compact))
+        if not compact:
+            return log
+        if chunksize is None:
+            return _apply_compact(log)
+        return (_apply_compact(chunk) for chunk in log)
+
+    if chunksize is None:
+        if file_format == 'parquet':
+            df = pd.read_parquet(filepath)
+        else:
+            df = pd.read_feather(filepath)
+        return _apply_compact(df) if compact else df
+    return _iter_columnar(filepath, file_format, chunksize, compact)
+
+
+def _iter_columnar(filepath: str, file_format: str, chunksize: int, compact: bool):
+    """Yield DataFrame chunks from a Parquet or Feather file."""
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(filepath).iter_batches(batch_size=chunksize)
+    else:
+        import pyarrow.feather as feather
+        table = feather.read_table(filepath, memory_map=True)
+        batches = table.to_batches(max_chunksize=chunksize)
+    for batch in batches:
+        chunk = batch.to_pandas()
+        yield _apply_compact(chunk) if compact else chunk
+
+
+def _apply_compact(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast an already-parsed log to the compact typed layout."""
+    dtypes = {col: dtype for col, dtype in COMPACT_DTYPES.items() if col in df.columns}
+    return df.astype(dtypes)
+
+
+# Significant decimal digits every float32 reads back exactly (FLT_DIG)
+FLOAT32_DIGITS = 6
+
+
+def grade_values(grades: pd.Series) -> np.ndarray:
+    """Return a grade column as float64 for arithmetic, equal in both layouts.
+
+    A compact (float32) grade is widened to the float64 of the shortest
+    decimal of up to 6 significant digits that reads back as the same
+    float32, i.e. the value the default layout reads from the same text
+    (72.3 rather than 72.30000305). Averages and variances are then the
+    same in both layouts, not only close.
+
+    Args:
+        grades: Grade column, float32 or float64
+
+    Returns:
+        float64 array, NaN for missing grades
+    """
+    values = grades.to_numpy(dtype='float64', na_value=np.nan)
+    if grades.dtype != 'float32':
+        return values
+    nonzero = np.isfinite(values) & (values != 0)
+    magnitude = np.floor(np.log10(np.abs(values), where=nonzero,
+                                  out=np.zeros_like(values)))
+    scale = 10.0 ** np.clip(FLOAT32_DIGITS - 1 - magnitude, 0, 22)
+    decimal = np.rint(values * scale) / scale
+    # Keep the plain widened value where no such decimal exists
+    return np.where(decimal.astype('float32') == values.astype('float32'), decimal,
+                    values)
+
+
+def load_lms_logs(filepath: str, chunksize: int = None, compact: bool = False):
+    """Load LMS logs from a CSV, Parquet or Feather file.
 
     Args:
-        filepath: Path to CSV file
+        filepath: Path to CSV file (or .parquet/.feather, see read_log())
+        chunksize: If given, return an iterator over DataFrames of at most
+            this many rows instead of reading the whole file
+        compact: Read into the compact typed layout (see COMPACT_DTYPES)
 
     Returns:
-        Loaded DataFrame
+        Loaded DataFrame, or an iterator of DataFrame chunks
 
     Raises:
         FileNotFoundError: If file doesn't exist
@@ -23,24 +152,109 @@ def load_lms_logs(filepath: str) -> pd.DataFrame:
         raise FileNotFoundError(f"File not found: {filepath}")
 
     try:
-        df = pd.read_csv(filepath)
+        df = read_log(filepath, chunksize=chunksize, compact=compact)
         return df
     except Exception as e:
         raise ValueError(f"Error reading CSV: {str(e)}")
 
 
-def save_report(report: dict, output_filepath: str) -> None:
+# Output compression by file suffix (compression='infer')
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.zst': 'zstd'}
+WRITE_BUFFER_BYTES = 1 << 20
+
+
+def _orjson():
+    """Return the orjson module, or None if it is not installed."""
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+def open_output(output_path: Path, compression: str = 'infer'):
+    """Open a text file for writing through a large buffer.
+
+    Args:
+        output_path: Destination file
+        compression: None, 'gzip', 'zstd' (requires zstandard) or 'infer'
+            to choose from the suffix (.gz, .zst)
+
+    Returns:
+        Writable text stream
+
+    Raises:
+        ValueError: If the compression is not supported
+    """
+    if compression == 'infer':
+        compression = COMPRESSION_SUFFIXES.get(output_path.suffix.lower())
+    if compression is None:
+        return open(output_path, 'w', buffering=WRITE_BUFFER_BYTES)
+    if compression == 'gzip':
+        import gzip
+        import io
+        return io.TextIOWrapper(gzip.open(output_path, 'wb', compresslevel=6),
+                                write_through=False)
+    if compression == 'zstd':
+        import io
+        import zstandard
+        writer = zstandard.ZstdCompressor().stream_writer(open(output_path, 'wb'))
+        return io.TextIOWrapper(writer, write_through=False)
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def _json_safe(value):
+    """Replace NaN and infinite floats with None, recursively."""
+    if isinstance(value, float):
+        finite = value == value and value not in (float('inf'), float('-inf'))
+        return value if finite else None
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return value
+
+
+def json_bytes(value) -> bytes:
+    """Encode a value as compact UTF-8 JSON, NaN and infinities as null.
+
+    Uses orjson when it is installed.
+
+    Args:
+        value: Dictionaries, lists, strings, numbers (including numpy)
+
+    Returns:
+        Encoded JSON
+    """
+    orjson = _orjson()
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        return orjson.dumps(value, default=str, option=options)
+    return json.dumps(_json_safe(value), default=str, separators=(',', ':')).encode()
+
+
+def save_report(report: dict, output_filepath: str, compression: str = 'infer') -> None:
     """Save analysis report to JSON file.
 
+    Uses orjson when it is installed and the standard json module
+    otherwise; both write NaN and infinite values as null.
+
     Args:
         report: Report dictionary to save
         output_filepath: Path to save JSON file
+        compression: None, 'gzip', 'zstd' or 'infer' (see open_output())
     """
     output_path = Path(output_filepath)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(output_path, 'w') as f:
-        json.dump(report, f, indent=2, default=str)
+    orjson = _orjson()
+    with open_output(output_path, compression) as f:
+        if orjson is not None:
+            options = (orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                       | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME)
+            f.write(orjson.dumps(report, default=str, option=options).decode())
+        else:
+            json.dump(_json_safe(report), f, indent=2, default=str)
 
 
 def validate_lms_data(df: pd.DataFrame) -> bool:
@@ -62,52 +276,114 @@ def validate_lms_data(df: pd.DataFrame) -> bool:
     return True
 
 
-def create_sample_lms_data(num_students: int = 10, num_records: int = 50) -> pd.DataFrame:
+def create_sample_lms_data(num_students: int = 10, num_records: int = 50,
+                           seed: int = None) -> pd.DataFrame:
     """Create sample LMS data for testing.
 
+    All columns are drawn at once with numpy. For large, realistic
+    benchmark datasets see synthetic.write_lms_dataset().
+
     Args:
         num_students: Number of students
         num_records: Number of activity records
+        seed: Optional random seed for reproducible data
 
     Returns:
         Sample DataFrame
     """
-    import numpy as np
-    from datetime import timedelta, datetime as dt
+    rng = np.random.default_rng(seed)
+    activity_types = np.array(['quiz', 'assignment', 'forum_post', 'video_watch',
+                               'reading'], dtype=object)
+    student_numbers = rng.integers(1000, 1000 + num_students, num_records)
+    days = rng.integers(0, 90, num_records).astype('timedelta64[D]')
 
-    activity_types = ['quiz', 'assignment', 'forum_post', 'video_watch', 'reading']
-    data = []
-    start_date = dt(2024, 1, 1)
+    return pd.DataFrame({
+        'student_id': np.char.add('STU', student_numbers.astype(str)).astype(object),
+        'activity_type': activity_types[rng.integers(0, len(activity_types),
+                                                     num_records)],
+        'timestamp': np.datetime_as_string(np.datetime64('2024-01-01T00:00:00') + days,
+                                           unit='s'),
+        'grade': rng.uniform(50, 100, num_records),
+    })
 
-    for _ in range(num_records):
-        record = {
-            'student_id': f'STU{np.random.randint(1000, 1000 + num_students)}',
-            'activity_type': np.random.choice(activity_types),
-            'timestamp': (start_date + timedelta(days=np.random.randint(0, 90))).isoformat(),
-            'grade': np.random.uniform(50, 100)
-        }
-        data.append(record)
 
-    return pd.DataFrame(data)
+def export_recommendations(recommendations: dict, output_filepath: str,
+                           fmt: str = 'text', compression: str = 'infer',
+                           batch_size: int = 10_000) -> None:
+    """Export recommendations to a formatted text or JSON-lines file.
 
-
-def export_recommendations(recommendations: dict, output_filepath: str) -> None:
-    """Export recommendations to a formatted text file.
+    Students are written in batches of batch_size through a large buffer,
+    so time and memory stay flat in the number of students. With a
+    rules.Recommendations mapping, each distinct recommendation list is
+    formatted once and reused.
 
     Args:
         recommendations: Dictionary of recommendations by student
         output_filepath: Path to save recommendations file
+        fmt: 'text' for the readable report or 'jsonl' for one
+            {"student_id": ..., "recommendations": [...]} object per line
+        compression: None, 'gzip', 'zstd' or 'infer' (see open_output())
+        batch_size: Students per write
+
+    Raises:
+        ValueError: If fmt is not supported
     """
+    if fmt not in ('text', 'jsonl'):
+        raise ValueError(f"Unsupported export format: {fmt}")
     output_path = Path(output_filepath)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(output_path, 'w') as f:
-        f.write("Learning Path Recommendations Report\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write("=" * 50 + "\n\n")
+    if fmt == 'text':
+        def format_recs(recs):
+            return ''.join(f"  {i}. {rec}\n" for i, rec in enumerate(recs, 1)) + "\n"
+
+        def format_student(student_id, block):
+            return f"Student ID: {student_id}\n{block}"
+    else:
+        orjson = _orjson()
+
+        def format_recs(recs):
+            if orjson is not None:
+                return orjson.dumps(list(recs)).decode()
+            return json.dumps(list(recs), ensure_ascii=False, separators=(',', ':'))
+
+        def format_student(student_id, block):
+            if orjson is not None:
+                student = orjson.dumps(student_id).decode()
+            else:
+                student = json.dumps(student_id)
+            return f'{{"student_id":{student},"recommendations":{block}}}\n'
+
+    with open_output(output_path, compression) as f:
+        if fmt == 'text':
+            f.write("Learning Path Recommendations Report\n")
+            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write("=" * 50 + "\n\n")
+
+        if hasattr(recommendations, 'combinations'):
+            # Format each distinct recommendation list once, then walk the
+            # students slice by slice
+            ids, texts = recommendations.combinations()
+            blocks = [format_recs(recs) for recs in texts]
+            student_ids = recommendations.student_ids
+            for start in range(0, len(ids), batch_size):
+                stop = start + batch_size
+                f.write(''.join(
+                    format_student(student_id, blocks[i])
+                    for student_id, i in zip(student_ids[start:stop].tolist(),
+                                             ids[start:stop].tolist())
+                ))
+            return
 
+        blocks = {}
+        batch = []
         for student_id, recs in recommendations.items():
-            f.write(f"Student ID: {student_id}\n")
-            for i, rec in enumerate(recs, 1):
-                f.write(f"  {i}. {rec}\n")
-            f.write("\n")
+            key = tuple(recs)
+            block = blocks.get(key)
+            if block is None:
+                block = blocks[key] = format_recs(recs)
+            batch.append(format_student(student_id, block))
+            if len(batch) >= batch_size:
+                f.write(''.join(batch))
+                batch.clear()
+        f.write(''.join(batch))
@@ -0,0 +1,383 @@
+"""Unit tests for the aggregation engine."""
+
+import pytest
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import aggregates
+from src.analyzer import LearningPathAnalyzer
+from src.aggregates import (
+    build_pair_table, build_day_table, build_profile_table, chunked_grade_moments,
+    grade_limbs, grade_moments, limb_totals
+)
+from src.rules import Recommendations
+from src.utils import grade_values
+
+
+def reference_profiles(df):
+    """Per-student loop the vectorized engine replaced."""
+    profiles = {}
+    for student_id in df['student_id'].unique():
+        student_data = df[df['student_id'] == student_id]
+        total = len(student_data)
+        avg_grade = student_data['grade'].mean()
+        if total > 15 and avg_grade > 70:
+            engagement = 'high'
+        elif total > 5 or avg_grade > 60:
+            engagement = 'medium'
+        else:
+            engagement = 'low'
+        profiles[student_id] = {
+            'total_activities': total,
+            'average_grade': round(avg_grade, 2),
+            'activity_diversity': len(student_data['activity_type'].unique()),
+            'days_active': len(student_data['timestamp'].dt.date.unique()),
+            'preferred_activity': student_data['activity_type'].value_counts().index[0],
+            'engagement_level': engagement,
+        }
+    return profiles
+
+
+@pytest.fixture
+def random_log():
+    """Create a randomized log with many ties and repeated days."""
+    rng = np.random.default_rng(7)
+    n = 2000
+    return pd.DataFrame({
+        'student_id': [f'STU{i:03d}' for i in rng.integers(0, 150, n)],
+        'activity_type': rng.choice(['quiz', 'assignment', 'forum_post', 'reading'], n),
+        'timestamp': (pd.Timestamp('2024-01-01')
+                      + pd.to_timedelta(rng.integers(0, 30 * 24, n), unit='h')),
+        'grade': rng.uniform(30, 100, n).round(1),
+    })
+
+
+def test_profiles_match_reference(random_log):
+    """Test vectorized profiles match the per-student loop.
+
+    Averages are summed exactly, so one on a rounding tie can round the
+    other way than pandas' sum does.
+    """
+    analyzer = LearningPathAnalyzer()
+    analyzer.df = random_log
+    profiles = analyzer.profile_students()
+
+    assert_results_close(profiles, reference_profiles(random_log))
+
+
+def test_missing_activity_counts_like_reference(random_log, tmp_path):
+    """Test rows without an activity_type still count towards the profile."""
+    df = random_log.copy()
+    df.loc[::7, 'activity_type'] = None
+    csv_path = tmp_path / 'log.csv'
+    df.to_csv(csv_path, index=False)
+    expected = reference_profiles(df)
+    assert any(p['activity_diversity'] == 5 for p in expected.values())
+
+    analyzer = LearningPathAnalyzer()
+    analyzer.df = df
+    assert_results_close(analyzer.profile_students(), expected)
+    streamed = LearningPathAnalyzer()
+    streamed.load_data(str(csv_path), chunksize=97)
+    assert_results_close(streamed.profile_students(), expected)
+
+
+def test_preferred_activity_tie_break():
+    """Test ties go to the activity the student did first."""
+    df = pd.DataFrame({
+        'student_id': ['S1', 'S1', 'S1', 'S1'],
+        'activity_type': ['reading', 'quiz', 'quiz', 'reading'],
+        'timestamp': pd.to_datetime(['2024-01-01'] * 4),
+        'grade': [80.0, 70.0, 60.0, 90.0],
+    })
+    profile = build_profile_table(build_pair_table(df), build_day_table(df))
+    assert profile.loc['S1', 'preferred_activity'] == 'reading'
+    assert profile.loc['S1', 'days_active'] == 1
+
+
+def test_activity_stats_match_pandas(random_log):
+    """Test per-activity count, mean and variance match pandas per group."""
+    analyzer = LearningPathAnalyzer()
+    analyzer.df = random_log
+    stats = analyzer.analyze_activity_patterns()
+
+    assert list(stats) == list(random_log['activity_type'].unique())
+    for activity, group in random_log.groupby('activity_type'):
+        assert stats[activity]['count'] == len(group)
+        assert stats[activity]['avg_grade'] == round(group['grade'].mean(), 2)
+        assert stats[activity]['grade_variance'] == round(group['grade'].var(), 2)
+
+
+def test_activity_stats_skip_missing_activity(random_log):
+    """Test rows without an activity_type do not break activity statistics."""
+    df = random_log.copy()
+    df.loc[::7, 'activity_type'] = None
+    analyzer = LearningPathAnalyzer()
+    analyzer.df = df
+    stats = analyzer.analyze_activity_patterns()
+
+    assert list(stats) == list(df['activity_type'].dropna().unique())
+    for activity, group in df.groupby('activity_type'):
+        assert stats[activity]['count'] == len(group)
+        assert stats[activity]['avg_grade'] == round(group['grade'].mean(), 2)
+        assert stats[activity]['grade_variance'] == round(group['grade'].var(), 2)
+
+
+def test_grade_moments_match_pandas():
+    """Test per-group means and variances agree with pandas' groupby."""
+    rng = np.random.default_rng(3)
+    n = 20000
+    df = pd.DataFrame({
+        'student_id': rng.integers(0, 300, n),
+        'grade': rng.uniform(0, 100, n).round(2),
+    })
+    df.loc[rng.random(n) < 0.05, 'grade'] = np.nan
+    moments = grade_moments(df, 'student_id', variance=True)
+    grouped = df.groupby('student_id', sort=False)['grade']
+    np.testing.assert_allclose(moments['mean'], grouped.mean(), rtol=1e-13)
+    np.testing.assert_allclose(moments['variance'], grouped.var(), rtol=1e-10)
+
+
+def test_grade_sums_do_not_depend_on_row_order():
+    """Test limb sums give the same totals however the rows are split up."""
+    rng = np.random.default_rng(5)
+    values = np.concatenate([rng.uniform(-50, 100, 5000).round(2),
+                             [1e-3, 0.1, 99.95, 123456.5]])
+    limbs = grade_limbs(values)
+    total = limb_totals(limbs.sum(axis=0))
+    shuffled = grade_limbs(rng.permutation(values))
+    parts = [part.sum(axis=0) for part in np.array_split(shuffled, 13)]
+    assert limb_totals(np.sum(parts, axis=0)).tolist() == total.tolist()
+    assert total[0] == pytest.approx(values.sum(), rel=1e-15)
+    np.testing.assert_array_equal(limb_totals(limbs), values)
+
+
+def test_chunked_grade_moments_match_grade_moments(random_log):
+    """Test moments of grades read in chunks equal grade_moments()."""
+    expected = grade_moments(random_log, 'activity_type', variance=True)
+    codes = {key: i for i, key in enumerate(expected.index)}
+    ordered = random_log.iloc[np.argsort(
+        random_log['activity_type'].map(codes), kind='stable')]
+    sizes = ordered.groupby('activity_type', sort=False).size()
+    grades = ordered['grade'].to_numpy()
+    actual = chunked_grade_moments(lambda: iter(np.array_split(grades, 7)),
+                                   sizes.reindex(expected.index), variance=True)
+    np.testing.assert_array_equal(actual.to_numpy(), expected.to_numpy())
+
+
+def test_activity_stats_reuse_profile_tables(random_log):
+    """Test activity statistics after profiling reuse the profile tables."""
+    analyzer = LearningPathAnalyzer()
+    analyzer.df = random_log
+    analyzer.profile_students()
+    analyzer.analyze_activity_patterns()
+    assert analyzer.cache.misses['pair_table'] == 1
+    assert analyzer.cache.misses['student_grade_means'] == 1
+
+
+def test_effectiveness_is_share_grade_correlation(random_log):
+    """Test effectiveness correlates activity share with student grades."""
+    analyzer = LearningPathAnalyzer()
+    analyzer.df = random_log
+    table = analyzer.analyze_activity_patterns(as_frame=True)
+
+    shares = pd.crosstab(random_log['student_id'], random_log['activity_type'],
+                         normalize='index')
+    grades = random_log.groupby('student_id')['grade'].mean()
+    for activity in shares.columns:
+        expected = shares[activity].corr(grades) * 100
+        assert table.loc[activity, 'effectiveness'] == pytest.approx(expected, abs=0.01)
+
+
+def test_streaming_matches_in_memory(random_log, tmp_path):
+    """Test chunked loading yields the same profiles, stats and summary."""
+    csv_path = tmp_path / 'log.csv'
+    random_log.to_csv(csv_path, index=False)
+
+    in_memory = LearningPathAnalyzer()
+    in_memory.load_data(str(csv_path))
+    streamed = LearningPathAnalyzer()
+    streamed.load_data(str(csv_path), chunksize=97)
+    assert streamed.df is None
+
+    for method in ('profile_students', 'analyze_activity_patterns'):
+        assert_results_close(getattr(streamed, method)(), getattr(in_memory, method)())
+
+    expected_report = in_memory.get_summary_report()
+    report = streamed.get_summary_report()
+    for field in ('total_students', 'total_activities', 'average_class_grade'):
+        assert report[field] == expected_report[field]
+    assert [sid for sid, _ in report['high_performers']] == \
+        [sid for sid, _ in expected_report['high_performers']]
+
+
+@pytest.mark.parametrize('chunksize', [97, 1000])
+def test_streaming_matches_in_memory_exactly(tmp_path, chunksize):
+    """Test streamed 2-decimal grades give exactly the in-memory results."""
+    rng = np.random.default_rng(11)
+    n = 6000
+    df = pd.DataFrame({
+        'student_id': rng.integers(1, 301, n),
+        'activity_type': rng.choice(['quiz', 'assignment', 'forum_post', 'reading'], n),
+        'timestamp': (pd.Timestamp('2024-01-01')
+                      + pd.to_timedelta(rng.integers(0, 30 * 24, n), unit='h')),
+        'grade': rng.uniform(30, 100, n).round(2),
+    })
+    csv_path = tmp_path / 'log.csv'
+    df.to_csv(csv_path, index=False)
+
+    in_memory = LearningPathAnalyzer()
+    in_memory.load_data(str(csv_path))
+    streamed = LearningPathAnalyzer()
+    streamed.load_data(str(csv_path), chunksize=chunksize)
+
+    assert streamed.profile_students() == in_memory.profile_students()
+    assert streamed.analyze_activity_patterns() == in_memory.analyze_activity_patterns()
+    assert streamed.generate_recommendations() == in_memory.generate_recommendations()
+    report, expected = streamed.get_summary_report(), in_memory.get_summary_report()
+    for field in ('average_class_grade', 'high_performers', 'needs_support'):
+        assert report[field] == expected[field]
+
+
+def assert_results_close(actual, expected):
+    """Compare nested result dicts, allowing last-bit float differences."""
+    assert list(actual) == list(expected)
+    for key, row in expected.items():
+        if not isinstance(row, dict):
+            assert actual[key] == row
+            continue
+        for field, value in row.items():
+            if isinstance(value, float):
+                assert actual[key][field] == pytest.approx(value, abs=0.011,
+                                                           nan_ok=True)
+            else:
+                assert actual[key][field] == value
+
+
+@pytest.mark.parametrize('chunksize', [None, 97])
+def test_compact_matches_default_exactly(random_log, tmp_path, chunksize):
+    """Test float32 grades give exactly the default layout's results."""
+    csv_path = tmp_path / 'log.csv'
+    random_log.to_csv(csv_path, index=False)
+    default, compact = LearningPathAnalyzer(), LearningPathAnalyzer()
+    default.load_data(str(csv_path), chunksize=chunksize)
+    compact.load_data(str(csv_path), chunksize=chunksize, compact=True)
+
+    assert compact.profile_students() == default.profile_students()
+    assert compact.analyze_activity_patterns() == default.analyze_activity_patterns()
+    assert compact.get_summary_report()['average_class_grade'] == \
+        default.get_summary_report()['average_class_grade']
+    grades = pd.Series([72.3, 0.1, 99.95, np.nan, 123456.5], dtype='float32')
+    np.testing.assert_array_equal(grade_values(grades),
+                                  [72.3, 0.1, 99.95, np.nan, 123456.5])
+
+
+@pytest.mark.parametrize('chunksize', [None, 97])
+def test_compact_keeps_numeric_student_ids(random_log, tmp_path, chunksize):
+    """Test compact loading keeps integer ids, so every result is keyed alike."""
+    df = random_log.assign(
+        student_id=random_log['student_id'].str[3:].astype(int) + 1)
+    csv_path = tmp_path / 'log.csv'
+    df.to_csv(csv_path, index=False)
+    default, compact = LearningPathAnalyzer(), LearningPathAnalyzer()
+    default.load_data(str(csv_path), chunksize=chunksize)
+    compact.load_data(str(csv_path), chunksize=chunksize, compact=True)
+
+    profiles = compact.profile_students()
+    assert profiles == default.profile_students()
+    assert all(type(student) is int for student in profiles)
+    assert compact.generate_recommendations() == default.generate_recommendations()
+    for field in ('high_performers', 'needs_support'):
+        assert compact.get_summary_report()[field] == \
+            default.get_summary_report()[field]
+    student = next(iter(profiles))
+    assert compact.get_profile(student) == default.get_profile(student)
+
+
+def test_append_matches_full_recompute(random_log, tmp_path):
+    """Test appending daily increments refreshes results like a full run."""
+    full = LearningPathAnalyzer()
+    full.df = random_log.copy()
+    full.generate_recommendations()
+    full.analyze_activity_patterns()
+
+    incremental = LearningPathAnalyzer()
+    incremental.df = random_log.iloc[:1200].copy()
+    incremental.generate_recommendations()
+    incremental.analyze_activity_patterns()
+    incremental.save_aggregates(tmp_path / 'state.pkl')
+
+    restored = LearningPathAnalyzer()
+    restored.load_aggregates(tmp_path / 'state.pkl')
+    restored.generate_recommendations()
+    restored.analyze_activity_patterns()
+    for analyzer in (incremental, restored):
+        analyzer.append(random_log.iloc[1200:1700])
+        analyzer.append(random_log.iloc[1700:])
+        assert_results_close(analyzer.student_profiles, full.student_profiles)
+        assert_results_close(analyzer.activity_stats, full.activity_stats)
+        assert analyzer.get_summary_report()['total_activities'] == len(random_log)
+        refreshed = Recommendations.from_table(
+            pd.DataFrame.from_dict(analyzer.student_profiles, orient='index'))
+        assert list(analyzer.recommendations) == list(analyzer.student_profiles)
+        assert analyzer.recommendations == refreshed
+
+
+def test_append_keeps_earlier_results_and_trends(random_log):
+    """Test append leaves earlier profiles alone and recomputes trend advice."""
+    analyzer = LearningPathAnalyzer()
+    analyzer.df = random_log.iloc[:1900].copy()
+    earlier = analyzer.profile_students()
+    snapshot = {student: dict(profile) for student, profile in earlier.items()}
+    analyzer.generate_recommendations(trends=True)
+
+    analyzer.append(random_log.iloc[1900:])
+    assert earlier == snapshot
+    assert analyzer.student_profiles is not earlier
+
+    full = LearningPathAnalyzer()
+    full.df = random_log.copy()
+    full.profile_students()
+    assert analyzer.recommendations == full.generate_recommendations(trends=True)
+    assert len(analyzer.df) == len(random_log)
+
+
+def test_append_reads_only_touched_students(random_log, monkeypatch):
+    """Test a small append refreshes results without rescanning the aggregates."""
+    analyzer = LearningPathAnalyzer()
+    analyzer.df = random_log.iloc[:1900].copy()
+    analyzer.generate_recommendations()
+    analyzer.analyze_activity_patterns()
+    analyzer.get_summary_report()
+    analyzer.append(random_log.iloc[1900:1990])
+    analyzer.get_summary_report()
+    full_pairs = len(analyzer.aggregates.pair_table())
+
+    sizes = []
+    for name in ('merge_pair_tables', 'build_profile_table', 'effectiveness_sums'):
+        def recording(tables, *args, _function=getattr(aggregates, name), **kwargs):
+            parts = tables if isinstance(tables, list) else [tables]
+            sizes.append(sum(len(part) for part in parts))
+            return _function(tables, *args, **kwargs)
+        monkeypatch.setattr(aggregates, name, recording)
+    monkeypatch.setattr(aggregates.LogAggregator, 'pair_table', None)
+
+    delta = random_log.iloc[1990:1993]
+    analyzer.append(delta)
+    report = analyzer.get_summary_report()
+
+    touched = random_log[random_log['student_id'].isin(delta['student_id'])]
+    assert sizes and max(sizes) <= 2 * len(build_pair_table(touched)) < full_pairs
+    monkeypatch.undo()
+    full = LearningPathAnalyzer()
+    full.df = random_log.iloc[:1993].copy()
+    full.profile_students()
+    expected = full.get_summary_report()
+    for field in ('total_students', 'total_activities', 'average_class_grade'):
+        assert report[field] == expected[field]
+    assert report['high_performers'] == expected['high_performers']
+    assert_results_close(analyzer.activity_stats, full.analyze_activity_patterns())
@@ -1,7 +1,10 @@
 """Unit tests for LearningPathAnalyzer."""
 
+import gzip
+import json
 import pytest
 import pandas as pd
+import subprocess
 import tempfile
 from pathlib import Path
 import sys
@@ -9,7 +12,10 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.analyzer import LearningPathAnalyzer
-from src.utils import load_lms_logs, validate_lms_data, create_sample_lms_data
+from src.utils import (
+    load_lms_logs, validate_lms_data, create_sample_lms_data, export_recommendations,
+    save_report
+)
 
 
 @pytest.fixture
@@ -54,6 +60,29 @@ def test_load_data(analyzer, sample_data):
         Path(temp_file).unlink(missing_ok=True)
 
 
+def test_load_data_compact(analyzer, sample_data, tmp_path):
+    """Test compact loading uses typed columns and gives the same results."""
+    temp_file = tmp_path / 'logs.csv'
+    sample_data.to_csv(temp_file, index=False)
+
+    expected = LearningPathAnalyzer()
+    expected.load_data(str(temp_file))
+    df = analyzer.load_data(str(temp_file), compact=True)
+
+    assert isinstance(df['student_id'].dtype, pd.CategoricalDtype)
+    assert isinstance(df['activity_type'].dtype, pd.CategoricalDtype)
+    assert df['grade'].dtype == 'float32'
+    assert pd.api.types.is_datetime64_any_dtype(df['timestamp'])
+    assert analyzer.profile_students() == expected.profile_students()
+    stats = analyzer.analyze_activity_patterns(as_frame=True)
+    expected_stats = expected.analyze_activity_patterns(as_frame=True)
+    assert list(stats.index) == list(expected_stats.index)
+    pd.testing.assert_frame_equal(stats.reset_index(drop=True),
+                                  expected_stats.reset_index(drop=True))
+    assert analyzer.get_summary_report()['average_class_grade'] == \
+        expected.get_summary_report()['average_class_grade']
+
+
 def test_analyze_activity_patterns(analyzer, sample_data):
     """Test activity pattern analysis."""
     analyzer.df = sample_data.copy()
@@ -129,6 +158,43 @@ def test_create_sample_data():
     assert set(data.columns) == {'student_id', 'activity_type', 'timestamp', 'grade'}
 
 
+def test_export_recommendations_formats(analyzer, sample_data, tmp_path):
+    """Test text, JSON-lines and gzip exports agree for dicts and rule results."""
+    analyzer.df = sample_data.copy()
+    analyzer.df['timestamp'] = pd.to_datetime(analyzer.df['timestamp'])
+    recommendations = analyzer.generate_recommendations()
+    plain = dict(recommendations)
+
+    export_recommendations(plain, tmp_path / 'dict.txt', batch_size=2)
+    export_recommendations(recommendations, tmp_path / 'rules.txt.gz', batch_size=2)
+    text = (tmp_path / 'dict.txt').read_text()
+    compressed = gzip.open(tmp_path / 'rules.txt.gz', 'rt').read()
+    assert text.splitlines()[3:] == compressed.splitlines()[3:]
+    assert "Student ID: STU001\n  1. " in text
+
+    export_recommendations(recommendations, tmp_path / 'recs.jsonl', fmt='jsonl')
+    text = (tmp_path / 'recs.jsonl').read_text()
+    lines = [json.loads(line) for line in text.splitlines()]
+    assert {line['student_id']: line['recommendations'] for line in lines} == plain
+
+    with pytest.raises(ValueError):
+        export_recommendations(plain, tmp_path / 'recs.csv', fmt='csv')
+
+
+def test_save_report_writes_valid_json(tmp_path):
+    """Test save_report output parses and writes NaN as null."""
+    report = {'average_class_grade': 81.5, 'high_performers': [('STU001', 90.0)],
+              'activity_stats': {'quiz': {'effectiveness': float('nan')}},
+              'analysis_date': pd.Timestamp('2024-01-01 10:00')}
+    save_report(report, tmp_path / 'report.json')
+    saved = json.loads((tmp_path / 'report.json').read_text())
+    assert saved == {'average_class_grade': 81.5, 'high_performers': [['STU001', 90.0]],
+                     'activity_stats': {'quiz': {'effectiveness': None}},
+                     'analysis_date': '2024-01-01 10:00:00'}
+    save_report(report, tmp_path / 'report.json.gz')
+    assert json.loads(gzip.open(tmp_path / 'report.json.gz', 'rt').read()) == saved
+
+
 def test_engagement_level(analyzer, sample_data):
     """Test engagement level calculation."""
     analyzer.df = sample_data.copy()
@@ -139,5 +205,19 @@ def test_engagement_level(analyzer, sample_data):
         assert profile['engagement_level'] in ['high', 'medium', 'low']
 
 
+def test_import_does_not_load_plotting_or_ml():
+    """Test importing the package leaves matplotlib, seaborn and sklearn unloaded."""
+    code = (
+        "import sys; import src.analyzer; "
+        "print(sorted(m for m in ('matplotlib', 'seaborn', 'sklearn') "
+        "if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=Path(__file__).parent.parent,
+        capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == '[]'
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
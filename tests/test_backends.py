@@ -0,0 +1,107 @@
+"""Parity tests for the execution backends."""
+
+import pytest
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analyzer import LearningPathAnalyzer
+from src.backends import BACKENDS
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    """Run a test once per backend, skipping those not installed."""
+    if request.param == 'duckdb':
+        pytest.importorskip('duckdb')
+    return request.param
+
+
+@pytest.fixture
+def random_log():
+    """Create a log with ties, missing grades and repeated days."""
+    rng = np.random.default_rng(17)
+    n = 2500
+    grades = rng.uniform(30, 100, n).round(1)
+    grades[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({
+        'student_id': [f'STU{i:03d}' for i in rng.integers(0, 160, n)],
+        'activity_type': rng.choice(['quiz', 'assignment', 'forum_post', 'reading',
+                                     'video'], n),
+        'timestamp': (pd.Timestamp('2024-01-01')
+                      + pd.to_timedelta(rng.integers(0, 45 * 24 * 60, n), unit='min')),
+        'grade': grades,
+    })
+
+
+def assert_results_close(actual, expected):
+    """Compare nested result dicts, allowing last-bit float differences."""
+    assert list(actual) == list(expected)
+    for key, row in expected.items():
+        for field, value in row.items():
+            if isinstance(value, float):
+                assert actual[key][field] == pytest.approx(value, abs=0.011,
+                                                           nan_ok=True)
+            else:
+                assert actual[key][field] == value
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.parquet'])
+def test_backend_matches_pandas(backend, random_log, tmp_path, suffix):
+    """Test every backend gives the in-memory pandas results."""
+    path = tmp_path / f'log{suffix}'
+    if suffix == '.csv':
+        random_log.to_csv(path, index=False)
+    else:
+        pytest.importorskip('pyarrow')
+        random_log.to_parquet(path, index=False)
+
+    reference = LearningPathAnalyzer()
+    reference.load_data(str(path))
+    analyzer = LearningPathAnalyzer(backend=backend)
+    analyzer.load_data(str(path))
+
+    for method in ('analyze_activity_patterns', 'profile_students'):
+        pd.testing.assert_frame_equal(
+            pd.DataFrame.from_dict(getattr(analyzer, method)(), orient='index'),
+            pd.DataFrame.from_dict(getattr(reference, method)(), orient='index'),
+            check_exact=True)
+    assert (dict(analyzer.generate_recommendations())
+            == dict(reference.generate_recommendations()))
+
+    report = analyzer.get_summary_report()
+    expected = reference.get_summary_report()
+    for field in ('total_students', 'total_activities', 'average_class_grade',
+                  'high_performers', 'needs_support'):
+        assert report[field] == expected[field]
+
+
+def test_backend_append(backend, random_log, tmp_path):
+    """Test appending to a log opened with any backend."""
+    path = tmp_path / 'log.csv'
+    random_log.iloc[:2000].to_csv(path, index=False)
+    analyzer = LearningPathAnalyzer(backend=backend)
+    analyzer.load_data(str(path))
+    analyzer.profile_students()
+    analyzer.append(random_log.iloc[2000:])
+
+    reference = LearningPathAnalyzer()
+    reference.df = random_log.copy()
+    assert_results_close(analyzer.student_profiles, reference.profile_students())
+
+
+def test_backend_errors(tmp_path):
+    """Test unknown backends and missing columns are reported."""
+    with pytest.raises(ValueError):
+        LearningPathAnalyzer(backend='spark')
+
+    pytest.importorskip('duckdb')
+    path = tmp_path / 'log.csv'
+    pd.DataFrame({'student_id': ['a'], 'grade': [1.0]}).to_csv(path, index=False)
+    with pytest.raises(ValueError, match='Missing required columns'):
+        LearningPathAnalyzer(backend='duckdb').load_data(str(path))
+    with pytest.raises(FileNotFoundError):
+        LearningPathAnalyzer(backend='duckdb').load_data(str(tmp_path / 'missing.csv'))
@@ -0,0 +1,78 @@
+"""Unit tests for the chart rendering pipeline."""
+
+import pandas as pd
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip('matplotlib')
+
+from src.analyzer import LearningPathAnalyzer
+
+
+@pytest.fixture
+def analyzer(tmp_path, monkeypatch):
+    """Create an analyzer writing into a temporary reports/ directory."""
+    monkeypatch.chdir(tmp_path)
+    analyzer = LearningPathAnalyzer()
+    analyzer.df = pd.DataFrame({
+        'student_id': ['STU001', 'STU001', 'STU002', 'STU003'],
+        'activity_type': ['quiz', 'assignment', 'quiz', 'reading'],
+        'timestamp': pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-02',
+                                     '2024-01-03']),
+        'grade': [85.0, 90.0, 55.0, 70.0],
+    })
+    return analyzer
+
+
+def test_generate_all_visualizations(analyzer):
+    """Test all charts are written in the requested format."""
+    paths = analyzer.generate_all_visualizations(fmt='svg', preview=True)
+    assert set(paths) == {'activity_distribution', 'average_grades',
+                          'engagement_distribution'}
+    for path in paths.values():
+        assert path.endswith('.svg')
+        assert Path(path).stat().st_size > 0
+
+
+def test_unchanged_charts_are_not_rerendered(analyzer):
+    """Test a second run only re-renders charts whose inputs changed."""
+    paths = analyzer.generate_all_visualizations(preview=True)
+    mtimes = {name: Path(path).stat().st_mtime_ns for name, path in paths.items()}
+
+    analyzer.generate_all_visualizations(preview=True)
+    assert {name: Path(path).stat().st_mtime_ns
+            for name, path in paths.items()} == mtimes
+
+    analyzer.activity_stats['quiz']['count'] += 1
+    analyzer.generate_all_visualizations(preview=True)
+    assert (Path(paths['activity_distribution']).stat().st_mtime_ns
+            != mtimes['activity_distribution'])
+    assert (Path(paths['engagement_distribution']).stat().st_mtime_ns
+            == mtimes['engagement_distribution'])
+
+
+def test_weekly_activity_chart(analyzer):
+    """Test the weekly chart is drawn from the student x week matrix."""
+    path = analyzer.visualize_weekly_activity(preview=True)
+    assert Path(path).name == 'weekly_activity.png' and Path(path).stat().st_size > 0
+    assert analyzer._chart_data('weekly_activity')['activities'] == [4]
+
+
+def test_style_is_applied_before_rendering_threads(analyzer, monkeypatch):
+    """Test rcParams are only written on the calling thread."""
+    import threading
+    import matplotlib
+    from src import charts
+
+    monkeypatch.setattr(charts, '_style_applied', False)
+    writers = []
+    update = matplotlib.rcParams.update
+    monkeypatch.setattr(matplotlib.rcParams, 'update',
+                        lambda *args, **kwargs: (
+                            writers.append(threading.current_thread()),
+                            update(*args, **kwargs)))
+    analyzer.generate_all_visualizations(preview=True, force=True)
+    assert writers == [threading.main_thread()]
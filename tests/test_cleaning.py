@@ -0,0 +1,140 @@
+"""Unit tests for log validation and cleaning."""
+
+import numpy as np
+import pytest
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analyzer import LearningPathAnalyzer
+from src.cleaning import ISSUES, LogCleaner, check_columns, parse_timestamps
+from src.utils import create_sample_lms_data
+
+
+@pytest.fixture
+def dirty_log():
+    """Create a log with one row per issue and repeated rows."""
+    df = create_sample_lms_data(num_students=15, num_records=400, seed=21)
+    df = df.drop_duplicates(['student_id', 'activity_type', 'timestamp'],
+                            ignore_index=True)
+    df = df.astype({'timestamp': str, 'grade': object})
+    df.loc[3, 'student_id'] = None
+    df.loc[4, 'activity_type'] = None
+    df.loc[5, 'timestamp'] = 'yesterday'
+    df.loc[6, 'grade'] = 'abc'
+    df.loc[7, 'grade'] = 105
+    repeats = df.iloc[[10, 200, 10]].assign(grade=[1, 2, 3])
+    return pd.concat([df, repeats], ignore_index=True)
+
+
+def test_missing_columns_are_named():
+    """Test only the missing columns are reported."""
+    with pytest.raises(ValueError, match=r'columns: activity_type, grade$'):
+        check_columns(['student_id', 'timestamp'])
+    with pytest.raises(ValueError, match=r'columns: grade$'):
+        LearningPathAnalyzer._validate_frame(
+            pd.DataFrame(columns=['student_id', 'activity_type', 'timestamp']))
+
+
+def test_timestamps_in_other_formats_are_kept(tmp_path, dirty_log):
+    """Test values off the guessed format are parsed, not quarantined."""
+    df = create_sample_lms_data(num_students=15, num_records=400, seed=21)
+    df = df.drop_duplicates(['student_id', 'activity_type', 'timestamp'],
+                            ignore_index=True)
+    stamps = pd.to_datetime(df['timestamp'])
+    other = df.index[1::7]
+    df = df.astype({'timestamp': str})
+    df.loc[other, 'timestamp'] = stamps[other].dt.strftime('%m/%d/%Y %H:%M:%S')
+
+    assert (parse_timestamps(df['timestamp']) == stamps).all()
+    cleaner = LogCleaner()
+    assert len(cleaner.clean(df)) == len(df)
+    assert cleaner.report()['bad_timestamp'] == 0
+
+    path = tmp_path / 'log.csv'
+    df.to_csv(path, index=False)
+    plain, clean = LearningPathAnalyzer(), LearningPathAnalyzer()
+    plain.load_data(str(path), chunksize=50)
+    clean.load_data(str(path), chunksize=50, clean=True)
+    assert plain.profile_students() == clean.profile_students()
+
+    with pytest.raises(ValueError):
+        LearningPathAnalyzer._validate_frame(dirty_log.copy())
+
+
+@pytest.mark.parametrize('chunk', [None, 64])
+def test_clean_drops_counts_and_quarantines(tmp_path, dirty_log, chunk):
+    """Test each issue is dropped, counted and quarantined in chunked scans."""
+    cleaner = LogCleaner(quarantine=tmp_path / 'bad.csv')
+    chunks = [dirty_log]
+    if chunk is not None:
+        chunks = [dirty_log.iloc[i:i + chunk] for i in range(0, len(dirty_log), chunk)]
+    cleaned = pd.concat([cleaner.clean(part) for part in chunks])
+
+    report = cleaner.report()
+    assert {key: report[key] for key in ISSUES} == {
+        'missing_id': 1, 'missing_activity': 1, 'bad_timestamp': 1, 'bad_grade': 2,
+        'duplicate': 3}
+    assert report['rows'] == len(dirty_log)
+    assert report['kept'] == len(cleaned) == len(dirty_log) - 8
+    assert list(cleaned.index) == [i for i in range(len(dirty_log) - 3)
+                                   if i not in (3, 4, 5, 6, 7)]
+    assert pd.api.types.is_datetime64_any_dtype(cleaned['timestamp'])
+    assert cleaned['grade'].dropna().between(0, 100).all()
+
+    quarantined = pd.read_csv(report['quarantine'], dtype=str)
+    assert list(quarantined['issue']) == ['missing_id', 'missing_activity',
+                                          'bad_timestamp', 'bad_grade', 'bad_grade',
+                                          'duplicate', 'duplicate', 'duplicate']
+    assert list(quarantined['grade'].iloc[3:5]) == ['abc', '105']
+
+
+@pytest.mark.parametrize('colliding', [False, True])
+def test_dedupe_matches_pandas_across_chunks(monkeypatch, colliding):
+    """Test deduplication keeps the same rows as drop_duplicates().
+
+    With colliding hashes, rows at the same time hash alike whatever their
+    student and activity, which must not drop any of them.
+    """
+    if colliding:
+        monkeypatch.setattr('src.cleaning.key_hashes',
+                            lambda stamps, *ids: stamps.view('uint64'))
+    rng = np.random.default_rng(5)
+    n = 20000
+    df = pd.DataFrame({
+        'student_id': rng.choice([f'S{i}' for i in range(40)], n),
+        'activity_type': rng.choice(['quiz', 'reading', 'forum_post'], n),
+        'timestamp': (pd.Timestamp('2024-01-01')
+                      + pd.to_timedelta(rng.integers(0, 300, n), unit='D')),
+        'grade': rng.uniform(0, 100, n),
+    })
+    cleaner = LogCleaner()
+    kept = pd.concat([cleaner.clean(df.iloc[i:i + 1500]) for i in range(0, n, 1500)])
+    expected = df.drop_duplicates(['student_id', 'activity_type', 'timestamp'])
+    pd.testing.assert_frame_equal(kept, expected)
+    assert cleaner.report()['duplicate'] == n - len(expected)
+
+
+@pytest.mark.parametrize('options', [{}, {'chunksize': 50}, {'compact': True},
+                                     {'chunksize': 50, 'compact': True}])
+def test_load_data_clean(tmp_path, dirty_log, options):
+    """Test load_data(clean=True) gives the same profiles in every load mode."""
+    path = tmp_path / 'log.csv'
+    dirty_log.to_csv(path, index=False)
+    expected = LearningPathAnalyzer()
+    good = LogCleaner().clean(dirty_log)
+    expected.df = good.reset_index(drop=True)
+
+    analyzer = LearningPathAnalyzer()
+    analyzer.load_data(str(path), quarantine=str(tmp_path / 'bad.csv'), **options)
+    assert analyzer.cleaning_report['dropped'] == 8
+    assert (tmp_path / 'bad.csv').exists()
+    assert analyzer.profile_students() == expected.profile_students()
+    if options.get('compact') and analyzer.df is not None:
+        assert analyzer.df['student_id'].dtype == 'category'
+        assert analyzer.df['grade'].dtype == 'float32'
+
+    with pytest.raises(ValueError):
+        LearningPathAnalyzer().load_data(str(path), **options)
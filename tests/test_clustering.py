@@ -0,0 +1,79 @@
+"""Unit tests for student clustering."""
+
+import pytest
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip('sklearn')
+
+from src.analyzer import LearningPathAnalyzer
+from src.clustering import FEATURES, StudentClusters, feature_matrix
+
+
+@pytest.fixture
+def profiles():
+    """Create three well-separated groups of student profiles."""
+    rng = np.random.default_rng(31)
+    groups = []
+    levels = [(3, 45, 1, 2), (12, 65, 3, 8), (30, 90, 5, 20)]
+    for level, (activities, grade, diversity, days) in enumerate(levels):
+        n = 3000
+        groups.append(pd.DataFrame({
+            'total_activities': rng.normal(activities, 1, n).round(),
+            'average_grade': rng.normal(grade, 3, n),
+            'activity_diversity': np.full(n, diversity),
+            'days_active': rng.normal(days, 1, n).round(),
+            'level': level,
+        }, index=[f'S{level}_{i:05d}' for i in range(n)]))
+    table = pd.concat(groups).sample(frac=1, random_state=3)
+    table.iloc[:5, table.columns.get_loc('average_grade')] = np.nan
+    return table
+
+
+@pytest.mark.parametrize('sample_size', [None, 1000])
+def test_clusters_recover_groups(profiles, sample_size):
+    """Test streamed and sample-fitted clusters find the groups in engagement order."""
+    features = feature_matrix(profiles)
+    assert list(features.columns) == FEATURES and not features.isna().any().any()
+    clusters = StudentClusters(3, batch_size=512, sample_size=sample_size,
+                               random_state=0)
+    labels = clusters.fit_predict(features)
+    assert (labels == profiles['level']).mean() > 0.99
+    assert clusters.centers()['average_grade'].is_monotonic_increasing
+
+
+def test_seeded_clusters_are_reproducible(profiles):
+    """Test the same seed gives the same assignment."""
+    features = feature_matrix(profiles)
+    first = StudentClusters(4, batch_size=256, random_state=7).fit_predict(features)
+    second = StudentClusters(4, batch_size=256, random_state=7).fit_predict(features)
+    assert first.equals(second)
+    with pytest.raises(ValueError):
+        StudentClusters(3).predict(features)
+    with pytest.raises(ValueError):
+        StudentClusters(3).fit(features.iloc[:2])
+
+
+def test_analyzer_cluster_students():
+    """Test clustering from the analyzer's profiles is cached per parameters."""
+    rng = np.random.default_rng(2)
+    n = 600
+    analyzer = LearningPathAnalyzer()
+    analyzer.df = pd.DataFrame({
+        'student_id': [f'STU{i:02d}' for i in rng.integers(0, 60, n)],
+        'activity_type': rng.choice(['quiz', 'assignment', 'reading'], n),
+        'timestamp': (pd.Timestamp('2024-01-01')
+                      + pd.to_timedelta(rng.integers(0, 900, n), unit='h')),
+        'grade': rng.uniform(30, 100, n),
+    })
+    labels = analyzer.cluster_students(n_clusters=3)
+    assert list(labels.index) == list(analyzer.student_profiles)
+    assert set(labels) == {0, 1, 2}
+    assert analyzer.cluster_students(n_clusters=3).equals(labels)
+    assert analyzer.cache.hits['clusters_3_None_0_4096'] == 1
+    frame = analyzer.cluster_students(n_clusters=3, as_frame=True)
+    assert list(frame.columns) == FEATURES + ['cluster']
@@ -0,0 +1,129 @@
+"""Unit tests for multi-file ingestion."""
+
+import pytest
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analyzer import LearningPathAnalyzer
+from src.ingest import discover, is_multi_file, iter_files
+from src.utils import create_sample_lms_data
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    """Write one CSV per course per day: <course>/<course>_<day>.csv."""
+    for seed, course in enumerate(['CS101', 'MATH200', 'PHYS150']):
+        (tmp_path / course).mkdir()
+        for day in range(3):
+            data = create_sample_lms_data(num_students=8, num_records=40,
+                                          seed=10 * seed + day)
+            data.to_csv(tmp_path / course / f'{course}_2024-03-0{day + 1}.csv',
+                        index=False)
+    (tmp_path / 'notes.txt').write_text('not a log')
+    return tmp_path
+
+
+def sequential(paths):
+    """Read files one after the other, tagging the course directory."""
+    frames = [pd.read_csv(path).assign(course=path.parent.name) for path in paths]
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_discover_directory_and_glob(log_dir):
+    """Test discovery from a directory and from a glob pattern."""
+    assert is_multi_file(log_dir) and is_multi_file(log_dir / '*' / '*.csv')
+    assert not is_multi_file(log_dir / 'CS101' / 'CS101_2024-03-01.csv')
+    root, paths = discover(log_dir)
+    assert root == log_dir and len(paths) == 9 and paths == sorted(paths)
+    root, paths = discover(log_dir / 'MATH200' / '*03-0[12].csv')
+    assert root == log_dir / 'MATH200' and len(paths) == 2
+    with pytest.raises(FileNotFoundError):
+        discover(log_dir / '*.parquet')
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_iter_files_matches_sequential_read(log_dir, executor):
+    """Test concurrent parsing keeps discovery order and tags courses."""
+    _, paths = discover(log_dir)
+    frames = list(iter_files(log_dir, workers=3, executor=executor, max_pending=2))
+    combined = pd.concat(frames, ignore_index=True)
+    expected = sequential(paths)
+    pd.testing.assert_frame_equal(combined[expected.columns], expected,
+                                  check_dtype=False)
+    assert ([frame['course'].iloc[0] for frame in frames[::3]]
+            == ['CS101', 'MATH200', 'PHYS150'])
+    with pytest.raises(ValueError):
+        next(iter_files(log_dir, executor='fork'))
+
+
+def test_iter_files_holds_at_most_max_pending(log_dir):
+    """Test no more than max_pending files are parsed ahead of the consumer."""
+    read = []
+
+    def course(path, root):
+        read.append(path)
+        return path.parent.name
+
+    files = iter_files(log_dir, course=course, workers=2, max_pending=2)
+    next(files)
+    assert len(read) == 2
+    next(files)
+    assert len(read) == 3
+    assert len(list(files)) == 7
+
+
+def test_analyzer_loads_and_slices_courses(log_dir):
+    """Test directory loads, streamed loads and per-course analysis agree."""
+    _, paths = discover(log_dir)
+    expected = sequential(paths)
+    analyzer = LearningPathAnalyzer()
+    analyzer.load_data(str(log_dir))
+    assert len(analyzer.df) == len(expected)
+    assert analyzer.courses() == ['CS101', 'MATH200', 'PHYS150']
+
+    streamed = LearningPathAnalyzer()
+    streamed.load_files(str(log_dir), workers=2, stream=True)
+    assert streamed.df is None
+    assert streamed.profile_students() == analyzer.profile_students()
+
+    course = analyzer.for_course('MATH200')
+    math = expected[expected['course'] == 'MATH200']
+    assert len(course.df) == len(math)
+    assert course.get_summary_report()['total_activities'] == len(math)
+    with pytest.raises(ValueError):
+        streamed.for_course('MATH200')
+
+
+def test_load_files_clean_dedupes_across_files(log_dir):
+    """Test cleaning sees every file, so repeats in another file are dropped."""
+    copy = log_dir / 'PHYS150' / 'PHYS150_2024-03-09.csv'
+    copy.write_bytes((log_dir / 'CS101' / 'CS101_2024-03-01.csv').read_bytes())
+    analyzer = LearningPathAnalyzer()
+    analyzer.load_data(str(log_dir), clean=True)
+    report = analyzer.cleaning_report
+    assert report['rows'] == 400 and report['duplicate'] >= 40
+    assert len(analyzer.df) == report['kept']
+    assert not analyzer.df.duplicated(
+        ['student_id', 'activity_type', 'timestamp']).any()
+
+
+@pytest.mark.parametrize('clean', [False, True])
+def test_load_files_compact_keeps_categories(log_dir, clean):
+    """Test combining compact files keeps the categorical columns."""
+    # More students than the other files, so the categories differ per file
+    extra = create_sample_lms_data(num_students=20, num_records=60, seed=99)
+    extra.to_csv(log_dir / 'CS101' / 'CS101_2024-03-09.csv', index=False)
+    analyzer = LearningPathAnalyzer()
+    df = analyzer.load_files(str(log_dir), workers=2, compact=True, clean=clean)
+    for column in ('student_id', 'activity_type', 'course'):
+        assert isinstance(df[column].dtype, pd.CategoricalDtype), column
+    assert df['grade'].dtype == 'float32'
+
+    plain = LearningPathAnalyzer()
+    plain.load_files(str(log_dir), workers=2, clean=clean)
+    assert (df['student_id'].astype(str).tolist()
+            == plain.df['student_id'].astype(str).tolist())
+    assert analyzer.profile_students() == plain.profile_students()
@@ -0,0 +1,64 @@
+"""Unit tests for per-stage instrumentation."""
+
+import json
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analyzer import LearningPathAnalyzer
+from src.instrumentation import StageProfiler
+from src.utils import create_sample_lms_data
+
+
+def test_nested_stages_and_counts():
+    """Test that nested stages are recorded with depth, counts and memory."""
+    profiler = StageProfiler(trace_memory=True)
+    with profiler.stage('outer', rows=10) as outer:
+        with profiler.stage('inner'):
+            data = [0] * 500_000
+        del data
+        outer.count(students=3)
+
+    outer, inner = profiler.to_dict()
+    assert ((outer['stage'], outer['depth'], outer['rows'], outer['students'])
+            == ('outer', 0, 10, 3))
+    assert (inner['stage'], inner['depth']) == ('inner', 1)
+    assert inner['traced_peak_mb'] > 3
+    assert outer['traced_peak_mb'] >= inner['traced_peak_mb']
+    assert outer['wall_seconds'] >= inner['wall_seconds']
+    assert 'inner' in profiler.summary_table()
+
+
+def test_stage_recorded_on_error():
+    """Test that a failing stage is still measured."""
+    profiler = StageProfiler()
+    with pytest.raises(ValueError):
+        with profiler.stage('failing'):
+            raise ValueError('boom')
+    assert profiler.to_dict()[0]['stage'] == 'failing'
+    assert profiler.to_dict()[0]['traced_peak_mb'] is None
+
+
+def test_trace_outputs(tmp_path):
+    """Test the Chrome trace and JSON-lines outputs."""
+    data_file = tmp_path / 'log.csv'
+    data = create_sample_lms_data(num_students=5, num_records=40, seed=1)
+    data.to_csv(data_file, index=False)
+    profiler = StageProfiler()
+    analyzer = LearningPathAnalyzer(profiler=profiler)
+    with profiler.stage('load'):
+        analyzer.load_data(str(data_file))
+
+    profiler.write_chrome_trace(tmp_path / 'trace.json')
+    events = json.loads((tmp_path / 'trace.json').read_text())['traceEvents']
+    assert [event['name'] for event in events] == ['load', 'read', 'validate']
+    assert all(event['ph'] == 'X' and event['dur'] >= 0 for event in events)
+    assert events[0]['ts'] <= events[1]['ts']
+
+    profiler.write_jsonl(tmp_path / 'metrics.jsonl')
+    profiler.write_jsonl(tmp_path / 'metrics.jsonl')
+    lines = (tmp_path / 'metrics.jsonl').read_text().splitlines()
+    assert len(lines) == 6
+    assert json.loads(lines[0])['run'] == profiler.started.isoformat(timespec='seconds')
@@ -0,0 +1,84 @@
+"""Unit tests for the per-student row index."""
+
+import numpy as np
+import pytest
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analyzer import LearningPathAnalyzer
+from src.lookup import StudentIndex
+from src.utils import create_sample_lms_data
+
+
+@pytest.fixture
+def log():
+    """Create a log with a few rows lacking a student_id."""
+    df = create_sample_lms_data(num_students=30, num_records=600, seed=12)
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df.loc[[5, 77], 'student_id'] = None
+    return df
+
+
+def test_history_slices_match_masks(log):
+    """Test each history is a view equal to filtering the log."""
+    index = StudentIndex(log)
+    students = log['student_id'].dropna().unique()
+    assert len(index) == len(students)
+    for student_id in students:
+        pd.testing.assert_frame_equal(index.history(student_id),
+                                      log[log['student_id'] == student_id])
+    history = index.history(students[0])
+    assert np.shares_memory(history['grade'].to_numpy(),
+                            index.frame['grade'].to_numpy())
+
+    pair = index.histories(students[:2][::-1])
+    assert list(pair) == list(students[:2][::-1])
+    rows = index.rows(students[:2][::-1])
+    pd.testing.assert_frame_equal(rows, pd.concat(pair.values()))
+    assert None not in index and students[0] in index
+    with pytest.raises(KeyError):
+        index.history('NOBODY')
+    with pytest.raises(KeyError):
+        index.history(['not', 'hashable'])
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_analyzer_lookups_match_full_results(log, compact):
+    """Test per-student profiles and recommendations equal the full run."""
+    log = log.dropna(subset=['student_id']).reset_index(drop=True)
+    if compact:
+        log = log.astype({'student_id': 'category', 'activity_type': 'category'})
+    analyzer = LearningPathAnalyzer()
+    analyzer.df = log
+    students = list(pd.unique(log['student_id']))[:6]
+
+    profiles = analyzer.get_profiles(students)
+    recommendations = {sid: analyzer.get_recommendations(sid) for sid in students}
+    assert analyzer.cache.peek('student_profiles') is None
+    assert list(profiles) == students
+    full = analyzer.profile_students()
+    assert profiles == {sid: full[sid] for sid in students}
+    expected = analyzer.generate_recommendations()
+    assert recommendations == {sid: expected[sid] for sid in students}
+    assert analyzer.get_profile(students[0]) is full[students[0]]
+    assert analyzer.get_student_histories(students[:2])[students[1]].equals(
+        log[log['student_id'] == students[1]])
+    with pytest.raises(KeyError):
+        analyzer.get_profile('NOBODY')
+
+
+def test_streaming_mode_lookups(tmp_path, log):
+    """Test profiles come from the aggregates and histories are refused."""
+    path = tmp_path / 'log.csv'
+    log.dropna(subset=['student_id']).to_csv(path, index=False)
+    analyzer = LearningPathAnalyzer()
+    analyzer.load_data(str(path), chunksize=100)
+    student_id = log['student_id'].iloc[0]
+    assert analyzer.get_profile(student_id) == analyzer.profile_students()[student_id]
+    assert (analyzer.get_recommendations(student_id)
+            == analyzer.generate_recommendations()[student_id])
+    with pytest.raises(ValueError):
+        analyzer.get_student_history(student_id)
@@ -0,0 +1,93 @@
+"""Unit tests for the memoized result cache."""
+
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analyzer import LearningPathAnalyzer
+from src.memo import ResultCache
+from src.utils import create_sample_lms_data
+
+
+def test_dependencies_and_data_version():
+    """Test results are reused until their data or dependencies change."""
+    cache = ResultCache()
+    calls = []
+
+    def compute(name, value):
+        calls.append(name)
+        return value
+
+    assert cache.get('a', lambda: compute('a', 1)) == 1
+    assert cache.get('b', lambda: compute('b', 2), ('a',)) == 2
+    assert cache.get('b', lambda: compute('b', 3), ('a',)) == 2
+    assert calls == ['a', 'b']
+
+    cache.put('a', 10)
+    assert cache.peek('b') is None
+    assert cache.get('b', lambda: compute('b', 20), ('a',)) == 20
+    assert cache.derived_from('b', 'a')
+
+    cache.invalidate()
+    assert cache.peek('a') is None and cache.peek('b', 'stale') == 'stale'
+    assert cache.stats() == {'a': {'hits': 0, 'misses': 1},
+                             'b': {'hits': 1, 'misses': 2}}
+
+
+def test_repeated_calls_are_cached(tmp_path, monkeypatch):
+    """Test reports and charts on unchanged data reuse every result."""
+    monkeypatch.chdir(tmp_path)
+    analyzer = LearningPathAnalyzer()
+    analyzer.df = create_sample_lms_data(num_students=8, num_records=80, seed=2)
+    analyzer.df['timestamp'] = pd.to_datetime(analyzer.df['timestamp'])
+    analyzer.analyze_activity_patterns()
+    analyzer.generate_recommendations()
+    first = analyzer.get_summary_report()
+    analyzer.generate_all_visualizations(preview=True)
+    misses = dict(analyzer.cache.misses)
+
+    second = analyzer.get_summary_report()
+    analyzer.generate_all_visualizations(preview=True)
+    analyzer.generate_recommendations()
+    assert dict(analyzer.cache.misses) == misses
+    assert analyzer.cache.hits['class_average'] >= 2
+    assert {k: v for k, v in second.items() if k != 'analysis_date'} == \
+        {k: v for k, v in first.items() if k != 'analysis_date'}
+
+
+def test_new_data_invalidates_results():
+    """Test assigning a new log makes cached results stale."""
+    analyzer = LearningPathAnalyzer()
+    analyzer.df = create_sample_lms_data(num_students=5, num_records=30, seed=1)
+    analyzer.df['timestamp'] = pd.to_datetime(analyzer.df['timestamp'])
+    analyzer.generate_recommendations()
+    assert len(analyzer.student_profiles) == 5
+
+    bigger = create_sample_lms_data(num_students=9, num_records=90, seed=1)
+    bigger['timestamp'] = pd.to_datetime(bigger['timestamp'])
+    analyzer.df = bigger
+    assert analyzer.student_profiles == {} and analyzer.recommendations == {}
+    assert analyzer.ranking is None
+    assert len(analyzer.generate_recommendations()) == bigger['student_id'].nunique()
+    assert len(analyzer.ranking) == bigger['student_id'].nunique()
+    assert analyzer.get_summary_report()['total_activities'] == 90
+
+
+def test_append_releases_results_of_old_data():
+    """Test appending drops indexes built over the previous log."""
+    analyzer = LearningPathAnalyzer()
+    df = create_sample_lms_data(num_students=6, num_records=60, seed=4)
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    analyzer.df = df.iloc[:50].copy()
+    analyzer.get_student_history(df['student_id'].iloc[0])
+    analyzer.transition_matrix()
+    analyzer.profile_students()
+    names = set(analyzer.cache._entries)
+    assert {'student_index', 'timeline', 'sequences'} <= names
+
+    analyzer.append(df.iloc[50:])
+    assert not {'student_index', 'timeline', 'sequences'} & set(analyzer.cache._entries)
+    assert 'student_profiles' in analyzer.cache._entries
+    assert analyzer.cache.misses['student_index'] == 1
@@ -0,0 +1,55 @@
+"""Unit tests for sharded multi-process analysis."""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analyzer import LearningPathAnalyzer
+from src.parallel import partition_rows
+
+
+def make_log(n=3000, seed=11):
+    """Create a randomized log with many students."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'student_id': [f'STU{i:03d}' for i in rng.integers(0, 200, n)],
+        'activity_type': rng.choice(['quiz', 'assignment', 'forum_post', 'reading',
+                                     'video_watch'], n),
+        'timestamp': (pd.Timestamp('2024-01-01')
+                      + pd.to_timedelta(rng.integers(0, 60 * 24, n), unit='h')),
+        'grade': rng.uniform(30, 100, n).round(1),
+    })
+
+
+def test_partition_keeps_students_together():
+    """Test every student's rows land in one shard, in order."""
+    log = make_log()
+    shards = partition_rows(log['student_id'], 4)
+    assert sorted(np.concatenate(shards).tolist()) == list(range(len(log)))
+    owners = {}
+    for shard_number, rows in enumerate(shards):
+        assert (np.diff(rows) > 0).all()
+        for student_id in log['student_id'].iloc[rows].unique():
+            assert owners.setdefault(student_id, shard_number) == shard_number
+
+
+def test_parallel_matches_serial():
+    """Test n_jobs > 1 gives exactly the serial results."""
+    log = make_log()
+    serial = LearningPathAnalyzer()
+    serial.df = log.copy()
+    parallel = LearningPathAnalyzer(n_jobs=3)
+    parallel.df = log.copy()
+
+    profiles = parallel.profile_students()
+    expected = serial.profile_students()
+    assert list(profiles) == list(expected)
+    assert profiles == expected
+    assert parallel.generate_recommendations() == serial.generate_recommendations()
+
+    stats = parallel.analyze_activity_patterns(as_frame=True)
+    pd.testing.assert_frame_equal(stats,
+                                  serial.analyze_activity_patterns(as_frame=True))
@@ -0,0 +1,68 @@
+"""Unit tests for the grade ranking index."""
+
+import numpy as np
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ranking import GradeRanking
+
+
+@pytest.fixture
+def grades():
+    """Create rounded grades with many ties."""
+    rng = np.random.default_rng(3)
+    ids = [f'STU{i:04d}' for i in rng.permutation(500)]
+    return dict(zip(ids, rng.integers(50, 60, 500).astype(float)))
+
+
+def sorted_reference(grades, descending):
+    """Full sort with student_id as tie-breaker."""
+    sign = -1 if descending else 1
+    return sorted(grades.items(), key=lambda item: (sign * item[1], item[0]))
+
+
+@pytest.mark.parametrize('k', [1, 5, 37, 500, 600])
+def test_top_and_bottom_match_full_sort(grades, k):
+    """Test partial selection equals a full sort for any k."""
+    ranking = GradeRanking(list(grades), list(grades.values()))
+    assert ranking.top(k) == sorted_reference(grades, True)[:k]
+    assert ranking.bottom(k) == sorted_reference(grades, False)[:k]
+
+
+def test_rank_percentile_and_cohort(grades):
+    """Test rank, percentile and cohort-restricted queries."""
+    ranking = GradeRanking(list(grades), list(grades.values()))
+    ordered = sorted_reference(grades, True)
+    for position in (0, 10, 250, 499):
+        student_id = ordered[position][0]
+        assert ranking.rank(student_id) == position + 1
+        lower = sum(1 for g in grades.values() if g < grades[student_id])
+        assert ranking.percentile(student_id) == pytest.approx(100 * lower / 500)
+
+    cohort = list(grades)[:50]
+    expected = sorted_reference({sid: grades[sid] for sid in cohort}, True)[:3]
+    assert ranking.top(3, cohort=cohort) == expected
+
+
+def test_ungraded_students_are_not_ranked():
+    """Test NaN grades are left out of the ranking."""
+    ranking = GradeRanking(['A', 'B', 'C'], [70.0, float('nan'), 80.0])
+    assert ranking.top(5) == [('C', 80.0), ('A', 70.0)]
+    with pytest.raises(KeyError):
+        ranking.rank('B')
+
+
+def test_updated_matches_rebuilt_ranking(grades):
+    """Test replacing and adding grades equals building the ranking anew."""
+    ranking = GradeRanking(list(grades), list(grades.values()))
+    changes = {'STU0007': 99.0, 'STU0100': 10.0, 'NEW1': 55.0, 'NEW2': float('nan')}
+    updated = ranking.updated(list(changes), list(changes.values()))
+    expected = {**grades, **changes}
+    rebuilt = GradeRanking(list(expected), list(expected.values()))
+    assert updated.top(600) == rebuilt.top(600)
+    assert updated.rank('NEW1') == rebuilt.rank('NEW1')
+    assert 'NEW2' not in updated._positions
+    assert ranking.top(1) == sorted_reference(grades, True)[:1]
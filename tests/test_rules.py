@@ -0,0 +1,102 @@
+"""Unit tests for the vectorized recommendation rules."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analyzer import LearningPathAnalyzer
+from src.rules import Recommendations, Rule, evaluate_rules
+
+
+def reference_recommendations(profile):
+    """Per-student if/else the rule engine replaced."""
+    recs = []
+    if profile['engagement_level'] == 'low':
+        recs.append("Increase participation in learning activities")
+        recs.append("Set a schedule for regular study sessions")
+    elif profile['engagement_level'] == 'medium':
+        recs.append("Explore diverse activity types to enhance learning")
+        recs.append("Aim to increase consistency in participation")
+    else:
+        recs.append("Maintain current level of engagement")
+        recs.append("Consider peer mentoring to help others")
+    if profile['average_grade'] < 60:
+        recs.append("Focus on high-effectiveness activities")
+        recs.append("Seek help from instructors or tutoring services")
+    if profile['activity_diversity'] < 3:
+        recs.append(f"Try different activities beyond {profile['preferred_activity']}")
+    return recs
+
+
+@pytest.fixture
+def profiles():
+    """Create profiles covering every rule boundary."""
+    rng = np.random.default_rng(5)
+    n = 400
+    table = pd.DataFrame({
+        'total_activities': rng.integers(1, 30, n),
+        'average_grade': rng.choice([59.99, 60.0, 60.01, 75.5, 40.0, np.nan], n),
+        'activity_diversity': rng.integers(1, 6, n),
+        'days_active': rng.integers(1, 20, n),
+        'preferred_activity': rng.choice(['quiz', 'reading', 'forum_post'], n),
+        'engagement_level': rng.choice(['low', 'medium', 'high'], n),
+    }, index=[f'STU{i:04d}' for i in range(n)])
+    return table
+
+
+def test_rules_match_reference(profiles):
+    """Test the rule engine gives exactly the old recommendation text."""
+    recommendations = Recommendations.from_table(profiles)
+    expected = {sid: reference_recommendations(row) for sid, row in profiles.iterrows()}
+    assert list(recommendations) == list(expected)
+    assert dict(recommendations) == expected
+    assert recommendations == expected
+    assert len(recommendations.messages) == 9
+
+
+def test_recommendations_mapping(profiles):
+    """Test lookups, missing keys and updates."""
+    recommendations = Recommendations.from_table(profiles.iloc[:10])
+    assert 'STU0003' in recommendations
+    assert 'STU9999' not in recommendations
+    with pytest.raises(KeyError):
+        recommendations['STU9999']
+    recommendations['STU0001'].append('changed')
+    assert 'changed' not in recommendations['STU0001']
+
+    changed = profiles.iloc[[2, 12]].copy()
+    changed['engagement_level'] = 'low'
+    changed['activity_diversity'] = 1
+    updated = recommendations.updated(Recommendations.from_table(changed))
+    assert list(updated) == list(profiles.index[:10]) + ['STU0012']
+    for sid, row in changed.iterrows():
+        assert updated[sid] == reference_recommendations(row)
+    assert updated['STU0001'] == recommendations['STU0001']
+
+
+def test_custom_rules():
+    """Test rule bitsets with a custom rule set."""
+    table = pd.DataFrame({'average_grade': [50.0, 90.0]}, index=['a', 'b'])
+    rules = (Rule('fail', lambda p: p['average_grade'] < 60, ('Retake',)),
+             Rule('pass', lambda p: p['average_grade'] >= 60,
+                  ('Well done', 'Keep going')))
+    assert evaluate_rules(table, rules).tolist() == [1, 2]
+    assert dict(Recommendations.from_table(table, rules)) == {
+        'a': ['Retake'], 'b': ['Well done', 'Keep going']}
+
+
+def test_analyzer_recommendations_from_profiles_dict():
+    """Test recommendations for profiles assigned without profile_students()."""
+    analyzer = LearningPathAnalyzer()
+    analyzer.student_profiles = {
+        'STU001': {'total_activities': 3, 'average_grade': 55.0,
+                   'activity_diversity': 1, 'days_active': 2,
+                   'preferred_activity': 'quiz', 'engagement_level': 'low'},
+    }
+    assert analyzer.generate_recommendations() == {
+        'STU001': reference_recommendations(analyzer.student_profiles['STU001'])
+    }
@@ -0,0 +1,97 @@
+"""Unit tests for learning-path sequence mining."""
+
+from collections import Counter, defaultdict
+
+import pytest
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analyzer import LearningPathAnalyzer
+from src.sequences import ActivitySequences, PATH_SEPARATOR
+
+
+@pytest.fixture
+def random_log():
+    """Create an unsorted log with timestamp ties and missing grades."""
+    rng = np.random.default_rng(29)
+    n = 1500
+    grades = rng.uniform(30, 100, n).round(1)
+    grades[rng.random(n) < 0.2] = np.nan
+    return pd.DataFrame({
+        'student_id': [f'STU{i:02d}' for i in rng.integers(0, 40, n)],
+        'activity_type': rng.choice(['quiz', 'assignment', 'forum_post', 'reading'], n),
+        'timestamp': (pd.Timestamp('2024-01-01')
+                      + pd.to_timedelta(rng.integers(0, 500, n), unit='h')),
+        'grade': grades,
+    })
+
+
+def reference_paths(df, n):
+    """Per-student loop over the time-ordered log."""
+    counts, students, outcomes = Counter(), defaultdict(set), defaultdict(list)
+    for student_id, rows in df.groupby('student_id', sort=False):
+        rows = rows.sort_values('timestamp', kind='stable')
+        activities, grades = rows['activity_type'].tolist(), rows['grade'].tolist()
+        for i in range(len(activities) - n + 1):
+            if None in activities[i:i + n]:
+                continue
+            path = PATH_SEPARATOR.join(activities[i:i + n])
+            counts[path] += 1
+            students[path].add(student_id)
+            if i + n < len(activities) and not np.isnan(grades[i + n]):
+                outcomes[path].append(grades[i + n])
+    return counts, students, outcomes
+
+
+def test_ngrams_match_reference(random_log):
+    """Test path counts, students and next grades equal a per-student loop."""
+    sequences = ActivitySequences.from_frame(random_log)
+    for n in (2, 3):
+        table = sequences.ngrams(n).set_index('path')
+        counts, students, outcomes = reference_paths(random_log, n)
+        assert table['count'].to_dict() == dict(counts)
+        assert (table['students'].to_dict()
+                == {path: len(ids) for path, ids in students.items()})
+        for path, grades in outcomes.items():
+            assert table.loc[path, 'next_grade'] == pytest.approx(np.mean(grades))
+            assert table.loc[path, 'graded'] == len(grades)
+        assert table['count'].is_monotonic_decreasing
+    assert len(sequences.ngrams(3, top=5)) == 5
+    assert (sequences.ngrams(3, min_count=40)['count'] >= 40).all()
+    with pytest.raises(ValueError):
+        sequences.ngrams(1)
+
+
+def test_transition_matrix(random_log):
+    """Test transitions are the 2-gram counts and normalize to row probabilities."""
+    analyzer = LearningPathAnalyzer()
+    analyzer.df = random_log
+    matrix = analyzer.transition_matrix()
+    pairs = analyzer.frequent_paths(n=2, top=None).set_index('path')['count']
+    for (source, target), count in matrix.stack().items():
+        assert pairs.get(f'{source}{PATH_SEPARATOR}{target}', 0) == count
+    assert (matrix.to_numpy().sum()
+            == len(random_log) - random_log['student_id'].nunique())
+    assert np.allclose(analyzer.transition_matrix(normalize=True).sum(axis=1), 1.0)
+    assert analyzer.cache.hits['sequences'] >= 1
+
+
+def test_missing_activity_types_end_paths(random_log):
+    """Test a row without an activity type splits its student's paths."""
+    log = random_log.copy()
+    log['activity_type'] = log['activity_type'].astype(object)
+    log.loc[log.index[::25], 'activity_type'] = None
+    sequences = ActivitySequences.from_frame(log)
+    for n in (2, 3):
+        table = sequences.ngrams(n).set_index('path')
+        counts, students, _ = reference_paths(log, n)
+        assert table['count'].to_dict() == dict(counts)
+        assert (table['students'].to_dict()
+                == {path: len(ids) for path, ids in students.items()})
+    matrix = sequences.transition_matrix()
+    assert matrix.to_numpy().sum() == sum(reference_paths(log, 2)[0].values())
+    assert list(matrix.index) == list(log['activity_type'].dropna().unique())
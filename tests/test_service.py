@@ -0,0 +1,114 @@
+"""Unit tests for the analysis service."""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.service import AnalysisService, make_server
+from src.utils import create_sample_lms_data
+
+
+def serve(path):
+    """Start a service for a log on a free port; return (service, server)."""
+    service = AnalysisService(str(path))
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    service.url = 'http://{}:{}'.format(*server.server_address[:2])
+    return service, server
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    """Serve a small log on a free port."""
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / 'log.csv'
+    data = create_sample_lms_data(num_students=12, num_records=150, seed=4)
+    data.to_csv(path, index=False)
+    service, server = serve(path)
+    yield service
+    server.shutdown()
+    server.server_close()
+
+
+def get(service, path, method='GET'):
+    """Return (status, decoded JSON) of a request."""
+    request = urllib.request.Request(service.url + path, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+def test_endpoints_serve_warm_results(service):
+    """Test each endpoint answers from the in-memory state."""
+    state = service.state
+    student_id = next(iter(state.profiles))
+    status, body = get(service, f'/students/{student_id}')
+    assert status == 200
+    assert body['profile'] == json.loads(json.dumps(state.profiles[student_id]))
+    assert body['recommendations'] == state.recommendations[student_id]
+    assert body['rank'] == state.ranking.rank(student_id)
+    assert (get(service, f'/students/{student_id}/recommendations')[1]
+            == state.recommendations[student_id])
+
+    assert get(service, '/top?n=3')[1] == [list(pair) for pair in state.ranking.top(3)]
+    bottom = [list(pair) for pair in state.ranking.bottom(2)]
+    assert get(service, '/bottom?n=2')[1] == bottom
+    summary = get(service, '/summary')[1]
+    assert summary['total_students'] == 12 and summary['total_activities'] == 150
+    assert get(service, '/health')[1]['students'] == 12
+
+    assert get(service, '/students/NOBODY')[0] == 404
+    assert get(service, '/nothing')[0] == 404
+    assert get(service, '/top?n=x')[0] == 400
+
+
+def test_reload_swaps_state(service):
+    """Test a reload replaces the state while the old one stays usable."""
+    old = service.state
+    data = create_sample_lms_data(num_students=20, num_records=300, seed=5)
+    data.to_csv(service.filepath, index=False)
+    status, body = get(service, '/reload', method='POST')
+    assert status == 202 and body['started']
+    service._reload_thread.join()
+
+    assert service.state is not old
+    assert len(service.state.profiles) == 20 and len(old.profiles) == 12
+    assert get(service, '/summary')[1]['total_activities'] == 300
+    assert not get(service, '/health')[1]['reloading']
+
+    Path(service.filepath).write_text('not,a,log\n1,2,3\n')
+    assert service.reload(wait=True)
+    assert service.state.summary['total_activities'] == 300
+    assert get(service, '/health')[1]['last_error'].startswith('ValueError')
+
+
+def test_numeric_student_ids(tmp_path):
+    """Test ids read back as integers are found from their URL text."""
+    path = tmp_path / 'log.csv'
+    log = create_sample_lms_data(num_students=12, num_records=150, seed=4)
+    log['student_id'] = log['student_id'].str[3:].astype(int) + 1000
+    log.to_csv(path, index=False)
+    service, server = serve(path)
+    try:
+        student_id = next(iter(service.state.profiles))
+        assert isinstance(student_id, int)
+        status, body = get(service, f'/students/{student_id}')
+        assert status == 200 and body['student_id'] == student_id
+        assert get(service, f'/students/{student_id}/recommendations')[0] == 200
+        cohort = list(service.state.profiles)[:4]
+        top = get(service, '/top?n=2&cohort=' + ','.join(map(str, cohort)))[1]
+        expected = [list(pair) for pair in service.state.ranking.top(2, cohort)]
+        assert top == expected and top
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,99 @@
+"""Unit tests for the per-student distinct-count sketches."""
+
+import pytest
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.aggregates import LogAggregator
+from src.analyzer import LearningPathAnalyzer
+from src.sketches import DayBitmap, HyperLogLog, day_numbers
+
+
+@pytest.fixture
+def random_log():
+    """Create a log spread over a 60-day term."""
+    rng = np.random.default_rng(11)
+    n = 3000
+    return pd.DataFrame({
+        'student_id': [f'STU{i:03d}' for i in rng.integers(0, 120, n)],
+        'activity_type': rng.choice(['quiz', 'assignment', 'forum_post', 'reading'], n),
+        'timestamp': (pd.Timestamp('2024-01-01')
+                      + pd.to_timedelta(rng.integers(0, 60 * 24, n), unit='h')),
+        'grade': rng.uniform(30, 100, n).round(1),
+    })
+
+
+def exact_days(df):
+    """Distinct active days per student."""
+    days = df.groupby('student_id')['timestamp']
+    return days.agg(lambda t: t.dt.normalize().nunique())
+
+
+def test_day_bitmap_is_exact_and_mergeable(random_log):
+    """Test bitmap counts equal exact counts, also when merged from halves."""
+    bitmap = DayBitmap('2024-01-01', '2024-02-29')
+    bitmap.add(random_log['student_id'], day_numbers(random_log['timestamp']))
+    expected = exact_days(random_log)
+    assert bitmap.counts(expected.index).tolist() == expected.tolist()
+    assert bitmap.bytes_per_student == 8 and bitmap.out_of_range == 0
+
+    first = DayBitmap('2024-01-01', '2024-02-29')
+    second = DayBitmap('2024-01-01', '2024-02-29')
+    first.add(random_log['student_id'][:1000],
+              day_numbers(random_log['timestamp'][:1000]))
+    second.add(random_log['student_id'][1000:],
+               day_numbers(random_log['timestamp'][1000:]))
+    assert first.merge(second).counts(expected.index).tolist() == expected.tolist()
+    assert bitmap.counts(['unknown']).tolist() == [0]
+
+    short = DayBitmap('2024-01-01', '2024-01-31')
+    short.add(random_log['student_id'], day_numbers(random_log['timestamp']))
+    assert short.out_of_range == int((random_log['timestamp'] >= '2024-02-01').sum())
+    with pytest.raises(ValueError):
+        bitmap.merge(short)
+
+
+def test_hyperloglog_error_and_merge():
+    """Test estimates stay within the error bound and merge like a union."""
+    rng = np.random.default_rng(3)
+    students = np.repeat([f'S{i}' for i in range(200)], 400)
+    days = rng.integers(0, 100_000, len(students))
+    sketch = HyperLogLog(precision=10)
+    sketch.add(students, days)
+    exact = pd.Series(days).groupby(students).nunique()
+    errors = sketch.counts(exact.index) / exact - 1
+    assert abs(errors.mean()) < sketch.relative_error
+    assert np.sqrt((errors ** 2).mean()) < 1.5 * sketch.relative_error
+
+    first, second = HyperLogLog(precision=10), HyperLogLog(precision=10)
+    first.add(students[::2], days[::2])
+    second.add(students[1::2], days[1::2])
+    merged = first.merge(second)
+    rows = merged.student_ids.get_indexer(sketch.student_ids)
+    assert np.array_equal(merged.state[rows], sketch.state)
+    with pytest.raises(ValueError):
+        first.merge(HyperLogLog(precision=8))
+
+
+def test_streaming_with_day_sketch(random_log, tmp_path):
+    """Test streaming with a bitmap gives the exact profiles and round-trips."""
+    csv_path = tmp_path / 'log.csv'
+    random_log.to_csv(csv_path, index=False)
+    exact = LearningPathAnalyzer()
+    exact.load_data(str(csv_path), chunksize=250)
+    sketched = LearningPathAnalyzer()
+    aggregator = sketched.load_data(str(csv_path), chunksize=250,
+                                    day_sketch=DayBitmap('2024-01-01', '2024-03-31'))
+    assert sketched.profile_students() == exact.profile_students()
+    with pytest.raises(ValueError):
+        aggregator.day_table()
+    with pytest.raises(ValueError):
+        aggregator.merge(LogAggregator())
+
+    aggregator.save(tmp_path / 'state.pkl')
+    restored = LogAggregator.load(tmp_path / 'state.pkl')
+    assert restored.profile_table().equals(aggregator.profile_table())
@@ -0,0 +1,73 @@
+"""Unit tests for columnar input and the snapshot cache."""
+
+import pytest
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip('pyarrow')
+
+from src import analyzer as analyzer_module
+from src.analyzer import LearningPathAnalyzer
+from src.snapshot import snapshot_path
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    """Write a small log to a temporary CSV file."""
+    path = tmp_path / 'logs.csv'
+    pd.DataFrame({
+        'student_id': ['STU001', 'STU001', 'STU002', 'STU003'],
+        'activity_type': ['quiz', 'assignment', 'quiz', 'reading'],
+        'timestamp': ['2024-01-01', '2024-01-02', '2024-01-02', '2024-01-03'],
+        'grade': [85.0, 90.0, 55.0, 70.0],
+    }).to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize('suffix', ['.parquet', '.feather'])
+def test_load_columnar_input(csv_file, suffix):
+    """Test Parquet and Feather files load like the CSV."""
+    expected = LearningPathAnalyzer()
+    expected.load_data(str(csv_file))
+    columnar_file = csv_file.with_suffix(suffix)
+    if suffix == '.parquet':
+        pd.read_csv(csv_file).to_parquet(columnar_file)
+    else:
+        pd.read_csv(csv_file).to_feather(columnar_file)
+
+    analyzer = LearningPathAnalyzer()
+    analyzer.load_data(str(columnar_file))
+    assert analyzer.profile_students() == expected.profile_students()
+
+    analyzer.load_data(str(columnar_file), chunksize=2)
+    assert analyzer.aggregates.total_rows == 4
+
+
+def test_snapshot_skips_parsing(csv_file, monkeypatch):
+    """Test a warm load reads the snapshot instead of the CSV."""
+    first = LearningPathAnalyzer().load_data(str(csv_file), cache=True)
+    assert snapshot_path(csv_file).exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("source file was parsed")
+
+    monkeypatch.setattr(analyzer_module, 'read_log', fail)
+    warm = LearningPathAnalyzer().load_data(str(csv_file), cache=True)
+    pd.testing.assert_frame_equal(warm, first)
+
+    analyzer = LearningPathAnalyzer()
+    analyzer.load_data(str(csv_file), chunksize=3, cache=True)
+    assert analyzer.aggregates.total_rows == 4
+
+
+def test_snapshot_invalidated_by_change(csv_file):
+    """Test editing the source file forces a re-parse."""
+    LearningPathAnalyzer().load_data(str(csv_file), cache=True)
+    with open(csv_file, 'a') as f:
+        f.write('STU004,quiz,2024-01-04,99.0\n')
+
+    df = LearningPathAnalyzer().load_data(str(csv_file), cache=True)
+    assert len(df) == 5
@@ -0,0 +1,54 @@
+"""Unit tests for the synthetic data generator."""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.synthetic import SemesterCalendar, generate_lms_chunks, write_lms_dataset
+from src.utils import create_sample_lms_data
+
+
+def test_generator_is_seeded_and_chunked():
+    """Test output size, chunking and reproducibility."""
+    chunks = list(generate_lms_chunks(25_000, num_students=300, seed=5,
+                                      chunk_rows=10_000))
+    assert [len(chunk) for chunk in chunks] == [10_000, 10_000, 5_000]
+    again = pd.concat(generate_lms_chunks(25_000, num_students=300, seed=5,
+                                          chunk_rows=10_000))
+    pd.testing.assert_frame_equal(pd.concat(chunks), again)
+
+    log = pd.concat(chunks)
+    assert log['grade'].between(0, 100).all()
+    assert log['student_id'].nunique() <= 300
+
+
+def test_generator_follows_calendar():
+    """Test sessions avoid breaks and stay inside the term."""
+    calendar = SemesterCalendar(start='2024-02-01', end='2024-02-29',
+                                breaks=(('2024-02-12', '2024-02-16'),))
+    log = pd.concat(generate_lms_chunks(20_000, seed=1, calendar=calendar))
+    days = log['timestamp'].dt.normalize()
+    assert days.min() >= pd.Timestamp('2024-02-01')
+    assert days.max() <= pd.Timestamp('2024-03-01')
+    session_days = days[log['timestamp'].dt.hour >= 8]
+    assert not session_days.between('2024-02-12', '2024-02-16').any()
+
+
+def test_write_dataset_csv(tmp_path):
+    """Test chunks are streamed into a single CSV with one header."""
+    path = write_lms_dataset(tmp_path / 'bench.csv', 2_500, seed=2, chunk_rows=1_000)
+    log = pd.read_csv(path)
+    assert len(log) == 2_500
+    assert list(log.columns) == ['student_id', 'activity_type', 'timestamp', 'grade']
+
+
+def test_sample_data_is_seeded():
+    """Test the small sample generator is reproducible with a seed."""
+    first = create_sample_lms_data(num_students=5, num_records=20, seed=4)
+    pd.testing.assert_frame_equal(
+        first, create_sample_lms_data(num_students=5, num_records=20, seed=4))
+    assert first['student_id'].isin([f'STU{n}' for n in range(1000, 1005)]).all()
+    assert np.all((first['grade'] >= 50) & (first['grade'] < 100))
@@ -0,0 +1,135 @@
+"""Unit tests for time-windowed engagement analytics."""
+
+import pytest
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analyzer import LearningPathAnalyzer
+from src.timeline import ActivityTimeline
+
+
+@pytest.fixture
+def random_log():
+    """Create an unsorted log over ten weeks with missing grades."""
+    rng = np.random.default_rng(23)
+    n = 3000
+    grades = rng.uniform(30, 100, n).round(1)
+    grades[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({
+        'student_id': [f'STU{i:03d}' for i in rng.integers(0, 80, n)],
+        'activity_type': rng.choice(['quiz', 'assignment', 'forum_post', 'reading'], n),
+        'timestamp': (pd.Timestamp('2024-01-03')
+                      + pd.to_timedelta(rng.integers(0, 70 * 24 * 60, n), unit='min')),
+        'grade': grades,
+    })
+
+
+def test_window_and_rolling_match_masks(random_log):
+    """Test window queries equal filtering the log."""
+    timeline = ActivityTimeline(random_log)
+    start, end = pd.Timestamp('2024-01-20 12:00'), pd.Timestamp('2024-02-05')
+    window = timeline.window(start, end)
+    in_window = (random_log['timestamp'] >= start) & (random_log['timestamp'] < end)
+    rows = random_log[in_window]
+    expected = rows.groupby('student_id')['grade'].agg(['size', 'mean'])
+    assert list(window.index) == list(random_log['student_id'].unique())
+    assert window['activities'].sum() == len(rows)
+    assert (window.loc[expected.index, 'activities'].tolist()
+            == expected['size'].tolist())
+    assert np.allclose(window.loc[expected.index, 'average_grade'], expected['mean'],
+                       equal_nan=True)
+
+    rolling = timeline.rolling(days=7, end=end, by='activity_type')
+    previous = random_log[(random_log['timestamp'] >= end - pd.Timedelta(days=14)) &
+                          (random_log['timestamp'] < end - pd.Timedelta(days=7))]
+    counts = previous['activity_type'].value_counts()
+    assert rolling.loc[counts.index, 'previous_activities'].tolist() == counts.tolist()
+
+
+def test_weekly_matrix_matches_resample(random_log):
+    """Test the student x week matrix equals a weekly groupby."""
+    timeline = ActivityTimeline(random_log)
+    matrix = timeline.weekly()
+    weeks = random_log['timestamp'].dt.to_period('W-SUN').dt.start_time
+    expected = random_log.groupby(['student_id', weeks]).size().unstack(fill_value=0)
+    expected = expected.reindex(index=matrix.index, columns=matrix.columns,
+                                fill_value=0)
+    assert (matrix.to_numpy() == expected.to_numpy()).all()
+    assert all(week.dayofweek == 0 for week in matrix.columns)
+    assert timeline._weekly_sums('student_id') is timeline._weekly_sums('student_id')
+
+    grades = timeline.weekly(by='activity_type', values='average_grade')
+    expected = random_log.groupby(['activity_type', weeks])['grade'].mean().unstack()
+    assert np.allclose(grades.loc[expected.index, expected.columns], expected,
+                       equal_nan=True)
+    assert timeline.weekly_totals()['activities'].sum() == len(random_log)
+
+
+def test_missing_activity_types_are_left_out(random_log):
+    """Test rows without an activity type count only for their student."""
+    log = random_log.copy()
+    log.loc[log.index[::50], 'activity_type'] = None
+    analyzer = LearningPathAnalyzer()
+    analyzer.df = log
+
+    weekly = analyzer.weekly_activity(by='activity_type')
+    assert weekly.to_numpy().sum() == log['activity_type'].notna().sum()
+    assert list(weekly.index) == list(log['activity_type'].dropna().unique())
+    rolling = analyzer.rolling_engagement(by='activity_type')
+    assert rolling['activities'].sum() > 0
+    assert analyzer.weekly_activity().to_numpy().sum() == len(log)
+
+
+def test_missing_timestamps_are_left_out(random_log):
+    """Test rows without a timestamp are left out of windows and weeks."""
+    log = random_log.copy()
+    log['timestamp'] = log['timestamp'].astype('datetime64[ns]')
+    log.loc[log.index[::40], 'timestamp'] = pd.NaT
+    dated = log[log['timestamp'].notna()]
+    analyzer = LearningPathAnalyzer()
+    analyzer.df = log
+
+    weekly = analyzer.weekly_activity()
+    assert weekly.to_numpy().sum() == len(dated)
+    assert weekly.columns[0] == dated['timestamp'].min().to_period('W-SUN').start_time
+    trends = analyzer.engagement_trends()
+    expected = ActivityTimeline(dated).trends()
+    assert np.allclose(trends.loc[expected.index], expected, equal_nan=True)
+    assert analyzer.timeline().window()['activities'].sum() == len(dated)
+
+
+def test_trends_flag_activity_drops(random_log):
+    """Test a student who stops in the last week is flagged and recommended."""
+    log = random_log.copy()
+    last_week = log['timestamp'].max().to_period('W-SUN').start_time
+    quiet = log['student_id'].eq('STU005') & (log['timestamp'] >= last_week)
+    log = log[~quiet]
+    analyzer = LearningPathAnalyzer()
+    analyzer.df = log
+
+    trends = analyzer.engagement_trends()
+    assert trends.loc['STU005', 'recent_activities'] == 0
+    assert trends.loc['STU005', 'activity_change'] == -1.0
+    assert 'STU005' in analyzer.activity_drops()
+    assert (analyzer.activity_drops()[0]
+            in trends.index[trends['activity_change'] == -1.0])
+
+    plain = analyzer.generate_recommendations()
+    with_trends = analyzer.generate_recommendations(trends=True)
+    assert with_trends['STU005'][:len(plain['STU005'])] == plain['STU005']
+    assert any('activity dropped' in message for message in with_trends['STU005'])
+    assert analyzer.cache.hits['timeline'] >= 1
+
+
+def test_streaming_mode_has_no_timeline(random_log, tmp_path):
+    """Test window queries need the full log."""
+    path = tmp_path / 'log.csv'
+    random_log.to_csv(path, index=False)
+    analyzer = LearningPathAnalyzer()
+    analyzer.load_data(str(path), chunksize=500)
+    with pytest.raises(ValueError):
+        analyzer.weekly_activity()